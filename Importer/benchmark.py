@@ -0,0 +1,306 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from data_import import DnDDataImporter
+from importers import data_formatter
+from importers.backends import SqliteBackend
+from importers.bulk_writer import DEFAULT_BATCH_SIZE
+from importers.metrics import CountingConnection
+from importers.spell_index import Range, SpellIndex
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak memory falls back to tracemalloc
+    resource = None
+
+REFERENCE_DATA_PATH = Path(__file__).resolve().parents[1] / "Reference Data" / "2014"
+# A case whose round trips grow by more than this factor against the baseline is a regression
+REGRESSION_FACTOR = 1.5
+# Representative SpellIndex queries, timed over QUERY_REPEAT runs each
+SPELL_QUERIES = {
+    "wizard_evocation_le3_no_concentration": {"level": Range(high=3), "school": "evocation", "concentration": False, "class": "wizard", "limit": 20},
+    "ritual_by_level": {"ritual": True, "order_by": "level", "limit": 20},
+    "fire_by_level_desc_page_2": {"damage_type": "fire", "order_by": "level", "descending": True, "offset": 10, "limit": 10},
+    "all_by_name_page_5": {"offset": 80, "limit": 20},
+}
+QUERY_REPEAT = 1000
+
+
+class StatementCounter:
+    """DB statements executed by SQLite and client calls that would each be a round trip to a server"""
+
+    def __init__(self):
+        self.statements = 0
+        self.round_trips = 0
+
+    def trace(self, statement: str):
+        self.statements += 1
+
+    def round_trip(self):
+        self.round_trips += 1
+
+    def reset(self):
+        self.statements = 0
+        self.round_trips = 0
+
+
+class BenchmarkBackend(SqliteBackend):
+    """SQLite stand-in for the production database that counts the work sent to it"""
+
+    def __init__(self, counter: StatementCounter, database_path: str = ":memory:"):
+        super().__init__(database_path)
+        self.counter = counter
+
+    def connect(self):
+        conn = super().connect()
+        conn.set_trace_callback(self.counter.trace)
+        return CountingConnection(conn, self.counter.round_trip)
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KiB, peak Python allocations where getrusage is missing"""
+    if resource is None:
+        return tracemalloc.get_traced_memory()[1] // 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def formatter_names() -> List[str]:
+    """Top-level formatters, the ones reading a reference file"""
+    return [
+        name for name in dir(data_formatter)
+        if name.startswith("create_data_for_")
+        and list(getattr(data_formatter, name).__code__.co_varnames[:1]) == ["path"]
+    ]
+
+
+def run_formatter_case(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Time one formatter over its reference file"""
+    formatter = getattr(data_formatter, name)
+    start = time.perf_counter()
+    rows = sum(1 for _ in formatter(options["reference_data_path"]))
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": seconds, "statements": 0, "round_trips": 0}
+
+
+def open_importer(options: Dict[str, Any], directory: str):
+    """Importer on a fresh counting database"""
+    database_path = os.path.join(directory, "benchmark.db") if options["on_disk"] else ":memory:"
+    counter = StatementCounter()
+    backend = BenchmarkBackend(counter, database_path)
+    importer = DnDDataImporter(
+        f"sqlite:///{database_path}",
+        options["reference_data_path"],
+        batch_size=options["batch_size"],
+        bulk_mode=options["bulk_mode"],
+        upsert_mode=options["upsert_mode"],
+        backend=backend,
+    )
+    return importer, backend, counter
+
+
+def count_rows(backend: SqliteBackend, tables: List[str]) -> int:
+    """Rows in the given tables, read outside the counted connection"""
+    conn = backend.open()
+    try:
+        return sum(conn.execute(f"SELECT COUNT(*) FROM {backend.table(t)}").fetchone()[0] for t in tables)
+    finally:
+        conn.close()
+
+
+def run_import_case(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Time one import_* path, its dependencies imported first and not measured"""
+    with tempfile.TemporaryDirectory() as directory:
+        importer, backend, counter = open_importer(options, directory)
+        tasks = {task.name: task for task in importer.import_tasks()}
+
+        done = set()
+
+        def prepare(task_name: str):
+            for dep in tasks[task_name].depends_on:
+                if dep not in done:
+                    prepare(dep)
+                    with importer.session() as session:
+                        tasks[dep].run(session)
+                    done.add(dep)
+
+        prepare(name)
+        counter.reset()
+        start = time.perf_counter()
+        with importer.session() as session:
+            tasks[name].run(session)
+        seconds = time.perf_counter() - start
+        stats = {"statements": counter.statements, "round_trips": counter.round_trips}
+        rows = count_rows(backend, [name])
+        importer.pool.close_all()
+        backend.close()
+    return {"rows": rows, "seconds": seconds, **stats}
+
+
+def run_full_case(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Time run_full_import on an empty database"""
+    with tempfile.TemporaryDirectory() as directory:
+        importer, backend, counter = open_importer(options, directory)
+        tables = [task.name for task in importer.import_tasks()]
+        counter.reset()
+        start = time.perf_counter()
+        importer.run_full_import()
+        seconds = time.perf_counter() - start
+        stats = {"statements": counter.statements, "round_trips": counter.round_trips}
+        rows = count_rows(backend, tables)
+        backend.close()
+    return {"rows": rows, "seconds": seconds, **stats}
+
+
+def run_spell_index_case(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Time building the SpellIndex and the mean latency of each representative query"""
+    start = time.perf_counter()
+    index = SpellIndex.from_reference_data(options["reference_data_path"])
+    seconds = time.perf_counter() - start
+    query_us = {}
+    for query_name, query in SPELL_QUERIES.items():
+        query_start = time.perf_counter()
+        for _ in range(QUERY_REPEAT):
+            index.query(**query)
+        query_us[query_name] = round((time.perf_counter() - query_start) / QUERY_REPEAT * 1e6, 2)
+    return {"rows": len(index), "seconds": seconds, "statements": 0, "round_trips": 0, "query_us": query_us}
+
+
+CASE_RUNNERS = {
+    "format": run_formatter_case,
+    "import": run_import_case,
+    "full": run_full_case,
+    "index": run_spell_index_case,
+}
+
+
+def run_case(kind: str, name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Entry point of the worker process measuring one case"""
+    logging.disable(logging.INFO)
+    if resource is None:
+        tracemalloc.start()
+    result = CASE_RUNNERS[kind](name, options)
+    result["peak_rss_kb"] = peak_rss_kb()
+    return result
+
+
+def measure(kind: str, name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a case in a fresh process so peak RSS belongs to that case alone"""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        try:
+            result = pool.apply(run_case, (kind, name, options))
+        except Exception as e:
+            # Keep going: a formatter failing on the current data should not hide the other numbers
+            result = {"rows": 0, "seconds": 0.0, "statements": 0, "round_trips": 0, "peak_rss_kb": 0, "error": f"{type(e).__name__}: {e}"}
+    result = {"name": f"{kind}:{name}", "kind": kind, "table": name, **result}
+    result["rows_per_sec"] = round(result["rows"] / result["seconds"], 1) if result["seconds"] else None
+    result["seconds"] = round(result["seconds"], 6)
+    return result
+
+
+def benchmark_cases(reference_data_path: str, only: Optional[List[str]] = None) -> List[tuple]:
+    """Every formatter, every import task and the full import"""
+    backend = SqliteBackend()
+    importer_tasks = [task.name for task in DnDDataImporter("sqlite:///", reference_data_path, backend=backend).import_tasks()]
+    backend.close()
+    cases = [("format", name) for name in formatter_names()]
+    cases += [("import", name) for name in importer_tasks]
+    cases.append(("full", "all"))
+    cases.append(("index", "spell"))
+    if only:
+        cases = [case for case in cases if any(pattern in f"{case[0]}:{case[1]}" for pattern in only)]
+    return cases
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> List[str]:
+    """Cases whose statement or round trip counts regressed against a previous run"""
+    previous = {case["name"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results:
+        before = previous.get(case["name"])
+        if not before or "error" in case or "error" in before:
+            continue
+        for metric in ("round_trips", "statements"):
+            if before[metric] and case[metric] > before[metric] * REGRESSION_FACTOR:
+                regressions.append(f"{case['name']}: {metric} {before[metric]} -> {case[metric]}")
+    return regressions
+
+
+def main():
+    """Run the benchmark suite and write the results as JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark the D&D 5e formatters and importers against SQLite")
+    parser.add_argument("--output", default="benchmark.json", help="JSON results file")
+    parser.add_argument("--reference-data", default=str(REFERENCE_DATA_PATH))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--row-by-row", action="store_true", help="Disable bulk inserts")
+    parser.add_argument("--upsert", action="store_true", help="Benchmark upsert mode")
+    parser.add_argument("--on-disk", action="store_true", help="Use a temporary database file instead of :memory:")
+    parser.add_argument("--only", nargs="*", help="Run cases whose name contains one of these strings")
+    parser.add_argument("--baseline", help="Previous results file to check for regressions")
+    args = parser.parse_args()
+
+    options = {
+        "reference_data_path": args.reference_data,
+        "batch_size": args.batch_size,
+        "bulk_mode": not args.row_by_row,
+        "upsert_mode": args.upsert,
+        "on_disk": args.on_disk,
+    }
+
+    results = []
+    for kind, name in benchmark_cases(args.reference_data, args.only):
+        result = measure(kind, name, options)
+        results.append(result)
+        if "error" in result:
+            print(f"{result['name']:<45} FAILED {result['error']}")
+            continue
+        print(f"{result['name']:<45} {result['rows']:>6} rows {result['seconds']:>9.4f}s "
+              f"{result['rows_per_sec'] or 0:>11.1f} rows/s {result['statements']:>6} stmts "
+              f"{result['round_trips']:>5} trips {result['peak_rss_kb']:>7} KiB")
+        for query_name, us in result.get("query_us", {}).items():
+            print(f"  {query_name:<43} {us:>9.2f} us/query")
+
+    parts = [case for case in results if case["kind"] in ("format", "import")]
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "options": options,
+        "cases": results,
+        "totals": {
+            "rows": sum(case["rows"] for case in parts if case["kind"] == "import"),
+            "seconds": round(sum(case["seconds"] for case in parts), 6),
+            "statements": sum(case["statements"] for case in parts),
+            "round_trips": sum(case["round_trips"] for case in parts),
+            "peak_rss_kb": max((case["peak_rss_kb"] for case in results), default=0),
+            "full_import": next((case for case in results if case["kind"] == "full"), None),
+        },
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
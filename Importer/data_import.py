@@ -1,24 +1,81 @@
+import argparse
+import asyncio
 import json
-import pyodbc
 import os
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional
 from datetime import datetime
 
-from importers.data_formatter import create_data_for_ability_score, create_data_for_alignment, create_data_for_damage_type, create_data_for_equipment, create_data_for_feats, create_data_for_feats_prerequisites, create_data_for_feature, create_data_for_language, create_data_for_condition, create_data_for_level, create_data_for_level_specific_features, create_data_for_magic_school, create_data_for_proficiency, create_data_for_spells
-from importers.data_formatter import create_data_for_equipment_category
+from importers.data_formatter import create_data_for_feats_prerequisites, create_data_for_level_specific_features
+from importers.data_formatter import FORMATTER_VERSION, RECORD_SOURCES
+from importers.data_formatter import ArmorClassRow, MonsterTypeRow
+from importers.data_loader import iter_data_file
+from importers.bulk_writer import BulkWriter, DEFAULT_BATCH_SIZE
+from importers.rejects import RejectLog
+from importers.checkpoint import CHECKPOINT_TABLE, Checkpoint, CheckpointJournal, CountedRows
+from importers.pipeline import map_rows
+from importers.session import ConnectionPool, ImportSession, DEFAULT_POOL_SIZE
+from importers.scheduler import ImportScheduler, ImportTask
+from importers.backends import DatabaseBackend, SqliteBackend, backend_for
+from importers.export import BulkExporter, EXPORT_FORMATS
+from importers.artifact import ArtifactBuilder, source_digest
+from importers.key_map import KeyMaps
+from importers.upsert import UpsertResult
+from importers.delta import DeltaManifest, DeltaPlan, DeltaSource, plan_delta
+from importers.metrics import ImportMetrics
+from importers.snapshot import SnapshotCache
+from importers.prepare import PreparedSources
+from importers.async_driver import AsyncImportDriver, DEFAULT_QUEUE_SIZE
+from importers.references import RESOURCE_TABLES, ReferenceIndex, reference_fields, resource_file, url_key
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain, islice
+
+# Tables written from MonsterRow.children, each in one batched write per import
+MONSTER_CHILD_TABLES = ("monster_armor_class", "monster_proficiency", "monster_damage_data", "monster_actions")
+# Natural key of a feature row: names repeat across classes, subclasses and levels
+FEATURE_KEY = ("name", "class_id", "subclass_id", "level")
+
 
 class DnDDataImporter:
     """
     D&D 5e Reference Data Importer
-    Imports JSON reference data into SQL Server database
+    Imports JSON reference data into SQL Server database (or SQLite through the backend layer)
     """
     
-    def __init__(self, connection_string: str, reference_data_path: str):
+    def __init__(self, connection_string: str, reference_data_path: str, batch_size: int = DEFAULT_BATCH_SIZE, bulk_mode: bool = True, pool_size: int = DEFAULT_POOL_SIZE, upsert_mode: bool = False, backend: Optional[DatabaseBackend] = None, metrics: Optional[ImportMetrics] = None, metrics_path: Optional[str] = None, snapshot_dir: Optional[str] = None, parallel_prepare: bool = False, commit_size: Optional[int] = None, reject_path: Optional[str] = None):
         self.connection_string = connection_string
+        # sqlite:///path connection strings select the SQLite backend
+        self.backend = backend or backend_for(connection_string)
         self.reference_data_path = Path(reference_data_path)
+        # bulk_mode=False falls back to one INSERT per row, useful for debugging bad rows
+        self.batch_size = batch_size
+        self.bulk_mode = bulk_mode
+        # upsert_mode=True stages rows and MERGEs them instead of skipping existing rows / truncating
+        self.upsert_mode = upsert_mode
+        # commit_size commits a streamed table every N rows instead of once at its end
+        self.commit_size = commit_size
+        # reject_path collects rows the writers could not insert, as JSON lines
+        self.rejects = RejectLog(reject_path) if reject_path else None
+        if self.backend.max_connections:
+            pool_size = min(pool_size, self.backend.max_connections)
+        self.pool = ConnectionPool(self.get_connection, pool_size)
+        # Metrics are off unless passed in or dumped to metrics_path (.prom for Prometheus text, JSON otherwise)
+        self.metrics = metrics or ImportMetrics(enabled=metrics_path is not None)
+        self.metrics_path = metrics_path
         self.setup_logging()
+        # snapshot_dir caches formatted rows so unchanged reference files are not parsed again
+        self.snapshots = SnapshotCache(snapshot_dir, self.logger) if snapshot_dir else None
+        # SRD (resource_type, index) -> record and id, each type loaded on first use and shared by every import
+        self.references = ReferenceIndex(self.reference_records)
+        # parallel_prepare=True formats every reference file up front across a process pool
+        self.parallel_prepare = parallel_prepare
+        self.prepared: Optional[PreparedSources] = None
+        # table -> rows an import driver feeds in place of the reference file
+        self.streams: Dict[str, Iterable] = {}
+        # Checkpoints of the journaled full import in progress, None outside of one (or without a journal table)
+        self.checkpoints: Optional[Dict[str, Checkpoint]] = None
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -34,25 +91,77 @@ class DnDDataImporter:
 
     def get_connection(self):
         """Get database connection"""
-        return pyodbc.connect(self.connection_string)
+        return self.backend.connect()
+
+    def session(self) -> ImportSession:
+        """Open an import session on a pooled connection"""
+        return ImportSession(self.pool, self.backend, self.metrics)
+
+    @contextmanager
+    def open_session(self, session: Optional[ImportSession] = None):
+        """Reuse the caller's session, or open one for the duration of this import"""
+        if session is not None:
+            yield session
+            return
+        with self.session() as session:
+            yield session
 
     def load_json_file(self, filename: str) -> List[Dict]:
         """Load JSON file and return data"""
-        file_path = self.reference_data_path / "2014" / filename
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = list(self.iter_json_file(filename))
             self.logger.info(f"Loaded {len(data)} records from {filename}")
             return data
         except Exception as e:
             self.logger.error(f"Error loading {filename}: {str(e)}")
             return []
 
+    def iter_json_file(self, filename: str) -> Iterator[Dict]:
+        """Yield records of a JSON file one at a time, streaming large files"""
+        return iter_data_file(self.reference_data_path, filename)
+
+    def source_rows(self, table_name: str) -> Iterable[Dict]:
+        """Formatted rows of a table: fed by an import driver, or read from its reference file"""
+        stream = self.streams.pop(table_name, None)
+        if stream is not None:
+            return stream
+        return self.read_source_rows(table_name)
+
+    def read_source_rows(self, table_name: str) -> Iterable[Dict]:
+        """Formatted rows of a table's reference file, load and format timed separately"""
+        filename, formatter = RECORD_SOURCES[table_name]
+        prepared = self.prepared.take(table_name) if self.prepared is not None else None
+        if prepared is not None:
+            self.metrics.count(table_name, "rows_read", len(prepared))
+            return iter(prepared)
+
+        if self.snapshots is not None:
+            with self.metrics.phase(table_name, "load"):
+                key, cached = self.snapshots.lookup(table_name, self.reference_data_path / filename, formatter)
+            if cached is not None:
+                self.metrics.count(table_name, "snapshot_hits")
+                self.metrics.count(table_name, "rows_read", len(cached))
+                return iter(cached)
+
+        records = self.metrics.timed(table_name, "load", iter_data_file(self.reference_data_path, filename), "rows_read")
+        rows = self.metrics.timed(table_name, "format", map(formatter, records))
+        if self.snapshots is not None:
+            return self.snapshots.write_through(table_name, key, rows)
+        return rows
+
+    def prepare_sources(self, tables: Iterable[str], max_workers: Optional[int] = None) -> PreparedSources:
+        """Load and format the reference files of tables in parallel, for source_rows to hand out"""
+        self.prepared = PreparedSources(self.reference_data_path, max_workers, self.logger).prepare(tables)
+        if self.metrics.enabled:
+            for table_name, seconds in self.prepared.seconds.items():
+                self.metrics.record_time(table_name, "prepare", seconds)
+        return self.prepared
+
     def extract_index_from_url(self, url: str) -> str:
         """Extract index from API URL"""
         if not url:
             return ""
-        return url.split('/')[-1]
+        return url_key(url)[1]
 
     def extract_name_from_desc(self, desc_array: List[str]) -> str:
         """Convert description array to single string"""
@@ -62,625 +171,855 @@ class DnDDataImporter:
 
     def check_if_exists(self, cursor, table: str, column: str, value: Any) -> bool:
         """Check if a record exists in the database"""
-        query = f"SELECT COUNT(*) FROM {table} WHERE {column} = ?"
+        query = f"SELECT COUNT(*) FROM {self.backend.table(table)} WHERE {column} = ?"
         cursor.execute(query, (value,))
         return cursor.fetchone()[0] > 0
     
     def get_id_if_exists(self, cursor, table: str, column: str, value: Any) -> Optional[int]:
         """Get the ID of a record if it exists in the database"""
-        query = f"SELECT id FROM {table} WHERE {column} = ?"
+        query = f"SELECT id FROM {self.backend.table(table)} WHERE {column} = ?"
         cursor.execute(query, (value,))
         result = cursor.fetchone()
         return result[0] if result else None
     
     def get_id_if_exists_case_insensitive(self, cursor, table: str, column: str, value: str) -> Optional[int]:
         """Get the ID of a record if it exists in the database (case insensitive)"""
-        query = f"SELECT id FROM {table} WHERE LOWER({column}) = LOWER(?)"
+        query = f"SELECT id FROM {self.backend.table(table)} WHERE LOWER({column}) = LOWER(?)"
         cursor.execute(query, (value,))
         result = cursor.fetchone()
         return result[0] if result else None
     
-    def import_ability_scores(self):
+    def reference_records(self, resource_type: str) -> List[Dict]:
+        """Indexed fields of one resource type's records, from its snapshot while the reference file is unchanged"""
+        filename = resource_file(resource_type)
+        file_path = self.reference_data_path / filename
+        if not file_path.exists():
+            return []
+        with self.metrics.phase("references", "load"):
+            if self.snapshots is not None:
+                # Snapshotted under their own name, next to the formatted rows of the tables
+                name = f"references.{resource_type}"
+                key, cached = self.snapshots.lookup(name, file_path, reference_fields)
+                if cached is not None:
+                    self.metrics.count("references", "snapshot_hits")
+                    return cached
+                records = list(self.snapshots.write_through(name, key, map(reference_fields, iter_data_file(self.reference_data_path, filename))))
+            else:
+                records = [reference_fields(record) for record in iter_data_file(self.reference_data_path, filename)]
+        self.logger.info(f"Indexed {len(records)} SRD {resource_type}")
+        return records
+
+    def reference_index(self) -> ReferenceIndex:
+        """The run's SRD reference index, each resource type loaded the first time it is looked up"""
+        return self.references
+
+    def bind_references(self, key_maps, *table_names: str) -> ReferenceIndex:
+        """Reference index with the ids of the given tables' records bound through their key maps"""
+        references = self.reference_index()
+        for resource_type, table in RESOURCE_TABLES.items():
+            # Feature names repeat, import_feature binds features by SRD index itself
+            if table in table_names and resource_type != "features":
+                references.bind_names(resource_type, key_maps.get(table))
+        return references
+
+    def get_writer(self, cursor, commit: Optional[Callable[[], None]] = None) -> BulkWriter:
+        """Get a batched writer for the given cursor, committing every commit_size rows through commit if given"""
+        return BulkWriter(cursor, self.backend, self.batch_size, self.bulk_mode, self.logger, self.metrics, self.commit_size, commit, self.rejects)
+
+    def upsert(self, cursor, table_name: str, rows: List[Dict], key_columns=("name",)) -> UpsertResult:
+        """Stage rows and apply them with one set-based upsert"""
+        return self.backend.upsert(cursor, table_name, rows, key_columns, self.batch_size, self.logger)
+
+    def commit(self, session: ImportSession, table_name: str):
+        """Commit a table's import, timed as its commit phase"""
+        with self.metrics.phase(table_name, "commit"):
+            session.commit()
+
+    def resume_offset(self, table_name: str) -> int:
+        """Source rows of a table already committed by the run being resumed"""
+        checkpoint = self.checkpoints.get(table_name) if self.checkpoints else None
+        return checkpoint.offset if checkpoint else 0
+
+    def commit_chunk(self, session: ImportSession, table_name: str, rows: CountedRows, offset: int):
+        """Commit a chunk of a streamed table together with its checkpoint"""
+        CheckpointJournal(session.cursor, self.backend).save(table_name, offset + rows.count)
+        self.commit(session, table_name)
+
+    def write_rows(self, session: ImportSession, table_name: str, rows: Iterable[Dict], key_columns=("name",)) -> int:
+        """Write resolved rows: MERGE them in upsert mode, otherwise stream the ones whose key is new to the writer"""
+        if self.upsert_mode:
+            with self.metrics.phase(table_name, "write"):
+                result = self.upsert(session.cursor, table_name, rows, key_columns)
+                session.key_maps.refresh(table_name)
+            self.metrics.count(table_name, "rows_inserted", result.inserted)
+            self.metrics.count(table_name, "rows_updated", result.updated)
+            return result.inserted + result.updated
+
+        with self.metrics.phase(table_name, "write"):
+            names = session.key_maps.get(table_name)
+        # Names of this stream, so a name repeated in the source is only written once
+        seen = set()
+
+        def skip_existing(item):
+            name = item.get('name')
+            # A missing name never matches a row: the writer rejects it into the reject log
+            if name is None:
+                return item
+            if name in names or name in seen:
+                self.logger.info(f"{table_name} {name} already exists. Skipping.")
+                self.metrics.count(table_name, "rows_skipped")
+                return None
+            seen.add(name)
+            return item
+
+        offset = self.resume_offset(table_name)
+        if offset:
+            # Source order is stable, so the committed rows are the first ones
+            self.logger.info(f"Resuming {table_name} after {offset} committed rows")
+            rows = islice(rows, offset, None)
+        if self.checkpoints is not None:
+            rows = CountedRows(rows)
+            commit = partial(self.commit_chunk, session, table_name, rows, offset)
+        else:
+            commit = partial(self.commit, session, table_name)
+
+        with self.metrics.phase(table_name, "write"):
+            written = self.get_writer(session.cursor, commit).write(table_name, map_rows(rows, skip_existing))
+            # Bulk inserts do not return ids; reload so later imports in the session resolve FKs
+            session.key_maps.refresh(table_name)
+        self.metrics.count(table_name, "rows_written", written)
+        return written
+
+    def import_simple_table(self, table_name: str, data: Iterable[Dict], truncate: bool = False, session: Optional[ImportSession] = None):
+        """Import rows without references through write_rows"""
+        with self.open_session(session) as session:
+            # A resumed table keeps the rows its committed chunks wrote
+            if truncate and not self.upsert_mode and not self.resume_offset(table_name):
+                with self.metrics.phase(table_name, "write"):
+                    self.backend.truncate(session.cursor, table_name)
+                    session.key_maps.refresh(table_name)
+
+            written = self.write_rows(session, table_name, data)
+            self.commit(session, table_name)
+            self.logger.info(f"{table_name} import completed ({written} rows)")
+
+    def import_ability_scores(self, session: Optional[ImportSession] = None):
         """Import ability scores data"""
         table_name = "ability_score"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_ability_score(self.reference_data_path)
-        if not data:
-            return
-            
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for item in data:
-                try:
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
+        data = self.source_rows(table_name)
+        self.import_simple_table(table_name, data, session=session)
 
-    def import_alignment(self):
+    def import_alignment(self, session: Optional[ImportSession] = None):
         """Import alignment data"""
         table_name = "alignment"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_alignment(self.reference_data_path)
-        if not data:
-            return
-            
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for item in data:
-                try:
-                    # Check if alignment already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info("Alignment import completed")
+        data = self.source_rows(table_name)
+        self.import_simple_table(table_name, data, session=session)
 
-    def import_languages(self):
+    def import_languages(self, session: Optional[ImportSession] = None):
         """Import languages data"""
         table_name = "language"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_language(self.reference_data_path)
-        if not data:
-            return
-            
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for item in data:
-                try:
-                    # Check if language already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
-        
-    def import_damage_type(self):
+        data = self.source_rows(table_name)
+        self.import_simple_table(table_name, data, session=session)
+
+    def import_damage_type(self, session: Optional[ImportSession] = None):
         """Import damage types data"""
         table_name = "damage_type"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_damage_type(self.reference_data_path)
-        if not data:
-            return
-            
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for item in data:
-                try:
-                    # Check if damage type already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
-            
-    def import_conditions(self):
+        data = self.source_rows(table_name)
+        self.import_simple_table(table_name, data, session=session)
+
+    def import_conditions(self, session: Optional[ImportSession] = None):
         """Import conditions data"""
         table_name = "condition"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_condition(self.reference_data_path)
-        if not data:
-            return
-        
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # cursor.execute(f"TRUNCATE TABLE dbo.{table_name}")
-            
-            for item in data:
-                try:
-                    # Check if condition already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
-    
-    def import_feats(self):
-        """Import feats data"""
+        data = self.source_rows(table_name)
+        self.import_simple_table(table_name, data, session=session)
+
+    def import_feats(self, session: Optional[ImportSession] = None):
+        """Import feats and their prerequisites, one batched write per table"""
         table_name = "feat"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_feats(self.reference_data_path)
-        if not data:
-            return
+        data = self.source_rows(table_name)
             
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"TRUNCATE TABLE dbo.{table_name}")
+        with self.open_session(session) as session:
+            cursor = session.cursor
+            # Prerequisites are written once every feat id is known, so keep the rows
+            feats = []
+            prerequisites = {}
             for item in data:
-                try:
-                    # Check if feat already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    prerequisites = item.pop('prerequisites')
-                                                
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys()) })
-                        OUTPUT Inserted.ID
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                    
-                    id = cursor.fetchone()[0]
-                    
-                    self.import_feats_prerequisites(id, prerequisites, item.get('name', ''))
-                    
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
+                name = item.get('name', '')
+                if name in prerequisites:
+                    self.logger.info(f"{table_name} {name} already exists. Skipping.")
+                    self.metrics.count(table_name, "rows_skipped")
+                    continue
+                prerequisites[name] = item.pop('prerequisites')
+                feats.append(item)
+
+            with self.metrics.phase(table_name, "write"):
+                if self.upsert_mode:
+                    result = self.upsert(cursor, table_name, feats)
+                    feat_ids = {name: id for (name,), id in result.ids.items()}
+                    written = result.inserted + result.updated
+                    self.metrics.count(table_name, "rows_inserted", result.inserted)
+                    self.metrics.count(table_name, "rows_updated", result.updated)
+                    session.key_maps.refresh(table_name)
+                else:
+                    self.backend.truncate(cursor, table_name)
+                    self.backend.truncate(cursor, "feat_prerequisite")
+                    written = self.get_writer(cursor).write(table_name, feats)
+                    self.metrics.count(table_name, "rows_written", written)
+                    # Bulk inserts return no ids: read all of them back in one SELECT
+                    session.key_maps.refresh(table_name)
+                    feat_ids = session.key_maps.get(table_name).ids
+
+            self.import_feats_prerequisites(feat_ids, prerequisites, session)
+            self.commit(session, table_name)
+            self.logger.info(f"{table_name} import completed ({written} rows)")
     
-    def import_feats_prerequisites(self, id, data, feat_name):
-        """Import feats prerequisites data"""
+    def import_feats_prerequisites(self, feat_ids: Dict[str, int], prerequisites: Dict[str, Any], session: Optional[ImportSession] = None):
+        """Import the prerequisites of every written feat in one batch"""
         table_name = "feat_prerequisite"
         self.logger.info(f"Starting {table_name} import...")
-    
-        if not data:
-            return
         
-        processed_data = create_data_for_feats_prerequisites(data)
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(f"TRUNCATE TABLE dbo.{table_name}")
-            for item in processed_data:
-                try:
-                    
+        with self.open_session(session) as session, self.metrics.phase(table_name, "write"):
+            cursor = session.cursor
+            references = self.bind_references(session.key_maps, "ability_score")
+            rows = []
+            for feat_name, data in prerequisites.items():
+                feat_id = feat_ids.get(feat_name)
+                if feat_id is None:
+                    self.logger.error(f"Feat {feat_name} was not written, skipping its prerequisites")
+                    continue
+                for item in create_data_for_feats_prerequisites(data or []):
                     # Get Ability Score ID
-                    ability_score_id = self.get_id_if_exists(cursor, "ability_score", "name", item.pop('ability_score', ''))
+                    ability_score = item.pop('ability_score', None)
+                    ability_score_id = references.id(ability_score)
                     
                     if ability_score_id is None:
-                        self.logger.error(f"Ability Score {item.get('ability_score', 'Unknown')} not found. Skipping prerequisite.")
+                        self.logger.error(f"Ability Score {ability_score} not found. Skipping prerequisite.")
                         continue
                     
                     item['ability_score_id'] = ability_score_id
-                    item['feat_id'] = id
-                    
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} for feat {feat_name}: {str(e)}")
+                    item['feat_id'] = feat_id
+                    rows.append(item)
+
+            if self.upsert_mode:
+                result = self.upsert(cursor, table_name, rows, ("feat_id", "ability_score_id"))
+                written = result.inserted + result.updated
+            else:
+                written = self.get_writer(cursor).write(table_name, rows)
+                self.metrics.count(table_name, "rows_written", written)
             
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
+            self.logger.info(f"{table_name} import completed ({written} rows)")
     
-    def import_magic_schools(self):
+    def import_magic_schools(self, session: Optional[ImportSession] = None):
         """Import magic schools data"""
         table_name = "magic_school"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_magic_school(self.reference_data_path)
-        if not data:
-            return
-            
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for item in data:
-                try:
-                    # Check if magic school already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
-            
-    def import_spell(self):
+        data = self.source_rows(table_name)
+        self.import_simple_table(table_name, data, session=session)
+
+    def import_spell(self, session: Optional[ImportSession] = None):
         """Import magic data"""
         table_name = "spell"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_spells(self.reference_data_path)
-        if not data:
-            return
+        data = self.source_rows(table_name)
             
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for item in data:
-                try:
-                    # Check if magic already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    
-                    magic_school_name = item.pop('magic_school', None)
-                    if magic_school_name:
-                        magic_school_id = self.get_id_if_exists(cursor, "magic_school", "name", magic_school_name)
-                        item['magic_school_id'] = magic_school_id
-                        
-                    dc_ability = item.pop('dc_ability', None)
-                    if dc_ability:
-                        dc_ability_id = self.get_id_if_exists(cursor, "ability_score", "name", dc_ability)
-                        item['dc_ability_score_id'] = dc_ability_id
-                        
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
+        with self.open_session(session) as session:
+            with self.metrics.phase(table_name, "resolve"):
+                # Loads the referenced key maps, so their queries are booked to this table
+                resolver = self.spell_resolver(session.key_maps)
+            resolve = self.metrics.stage(table_name, "resolve", resolver)
+            written = self.write_rows(session, table_name, map_rows(data, resolve))
+            self.commit(session, table_name)
+            self.logger.info(f"{table_name} import completed ({written} rows)")
+
+    def spell_resolver(self, key_maps):
+        """Row stage replacing spell reference names with ids"""
+        references = self.bind_references(key_maps, "magic_school", "ability_score")
+
+        def resolve(item):
+            # SpellRow carries both FK columns, so every row shares one column set and batch
+            item.magic_school_id = references.id(item.magic_school)
+            item.dc_ability_score_id = references.id(item.dc_ability)
+            return item
+        return resolve
     
-    def import_equipment(self):
+    def import_equipment(self, session: Optional[ImportSession] = None):
         """Import equipment data"""
         table_name = "equipment"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_equipment(self.reference_data_path)
-        if not data:
-            return
-            
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for item in data:
-                try:
-                    # Check if equipment already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                        
-                    equipment_category = item.pop('equipment_category', None)
-                    if equipment_category:
-                        equipment_category_id = self.get_id_if_exists(cursor, "equipment_category", "name", equipment_category)
-                        item['equipment_category_id'] = equipment_category_id
-                        
-                    gear_category = item.pop('gear_category', None)
-                    if gear_category:
-                        gear_category_id = self.get_id_if_exists(cursor, "equipment_category", "name", gear_category)
-                        item['gear_category_id'] = gear_category_id
-                        
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
+        data = self.source_rows(table_name)
             
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
+        with self.open_session(session) as session:
+            with self.metrics.phase(table_name, "resolve"):
+                # Loads the referenced key maps, so their queries are booked to this table
+                resolver = self.equipment_resolver(session.key_maps)
+            resolve = self.metrics.stage(table_name, "resolve", resolver)
+            written = self.write_rows(session, table_name, map_rows(data, resolve))
+            self.commit(session, table_name)
+            self.logger.info(f"{table_name} import completed ({written} rows)")
+
+    def equipment_resolver(self, key_maps):
+        """Row stage replacing equipment category names with ids"""
+        references = self.bind_references(key_maps, "equipment_category")
+
+        def resolve(item):
+            # EquipmentRow carries both FK columns, so every row shares one column set and batch
+            item.equipment_category_id = references.id(item.equipment_category)
+            item.gear_category_id = references.id(item.gear_category)
+            return item
+        return resolve
     
-    # TODO: TEST THIS, NOT YET TESTED
-    def import_feature(self):
-        """Import feature data"""
+    def import_class(self, session: Optional[ImportSession] = None):
+        """Import classes and subclasses in one batched write, then link every subclass to its class"""
+        table_name = "class"
+        self.logger.info(f"Starting {table_name} import...")
+
+        data = chain(self.source_rows(table_name), self.source_rows("subclass"))
+        references = self.reference_index()
+        # subclass name -> class name, linked once every class has its id
+        parents: Dict[str, str] = {}
+
+        def detach_parent(item):
+            parent_class = item.pop("parent_class", None)
+            if parent_class is None:
+                return item
+            parent = references.record(parent_class)
+            if parent is None:
+                self.logger.warning(f"{table_name} {item['name']}: unknown class {parent_class}. Skipping.")
+                self.metrics.count(table_name, "rows_skipped")
+                return None
+            item["hit_die"] = parent["hit_die"]
+            parents[item["name"]] = parent["name"]
+            return item
+
+        with self.open_session(session) as session:
+            written = self.write_rows(session, table_name, map_rows(data, detach_parent))
+            with self.metrics.phase(table_name, "write"):
+                class_ids = session.key_maps.get(table_name)
+                links = [
+                    (class_ids.get(name), class_ids.get(parent))
+                    for name, parent in parents.items() if class_ids.get(name) is not None
+                ]
+                self.backend.update_by_id(session.cursor, table_name, "parent_class_id", links, self.batch_size)
+            self.commit(session, table_name)
+            self.logger.info(f"{table_name} import completed ({written} rows)")
+
+    def import_feature(self, session: Optional[ImportSession] = None):
+        """Import features in two passes: bulk rows without parents, then every parent link in one UPDATE"""
         table_name = "feature"
+        child_table = "feature_prerequisite"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_feature(self.reference_data_path)
-        if not data:
-            return
-            
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        data = self.source_rows(table_name)
             
-            for item in data:
-                try:
-                    # Check if feature already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    
-                    prerequisites = item.pop('prerequisites', None)
-                    
-                    parent_feature_name = item.pop('parent_feature', None)
-                    if parent_feature_name:
-                        parent_feature_id = self.get_id_if_exists(cursor, table_name, "name", parent_feature_name)
-                        item['parent_feature_id'] = parent_feature_id
-                    
-                    className = item.pop('class', None)
-                    if className:
-                        class_id = self.get_id_if_exists(cursor, "classes", "name", className)
-                        item['class_id'] = class_id
-                        
-                    subclassName = item.pop('subclass', None)
-                    if subclassName:
-                        subclass_id = self.get_id_if_exists(cursor, "class", "name", subclassName)
-                        item['subclass_id'] = subclass_id
-                        
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        OUTPUT Inserted.ID
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                    
-                    feature_id = cursor.fetchone()[0]
-                    
-                    if prerequisites:
-                        self.import_feature_prerequisites(feature_id, prerequisites)
-                    
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
-    
-    # TODO: TEST THIS, NOT YET TESTED 
-    def import_feature_prerequisites(self, feature_id, prerequisites):
-        """Import feature prerequisites data"""
-        table_name = "feature_prerequisite"
-        self.logger.info(f"Starting {table_name} import...")
-        processed_data = create_data_for_feats_prerequisites(prerequisites)
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(f"TRUNCATE TABLE dbo.{table_name}")
-            for item in processed_data:
-                try:
-                    # Get Reference Table 
-                    refTable = item.get('reference_type', None)
-                    if refTable: 
-                        reference_id = self.get_id_if_exists_case_insensitive(cursor, refTable, "name", item.pop('reference_name', ''))
-                        item['reference_id'] = reference_id
-                    
-                    item['feature_id'] = feature_id
-                    
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} for feature ID {id}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
+        with self.open_session(session) as session:
+            cursor = session.cursor
+            # Parents and prerequisites may point anywhere in the file, so keep every row
+            features = list(data)
+            with self.metrics.phase(table_name, "resolve"):
+                # Classes and subclasses both live in the class table
+                references = self.bind_references(session.key_maps, "class", "spell")
+            for item in features:
+                item.class_id = references.id(item.class_name)
+                item.subclass_id = references.id(item.subclass)
+
+            # Pass 1: every feature in one batched write, parent_feature_id still unset
+            with self.metrics.phase(table_name, "write"):
+                if self.upsert_mode:
+                    # Stored parent links stay as they are until pass 2 sets them
+                    rows = [item.as_dict() for item in features]
+                    for row in rows:
+                        del row["parent_feature_id"]
+                    result = self.upsert(cursor, table_name, rows, FEATURE_KEY)
+                    feature_ids = result.ids
+                    written = result.inserted + result.updated
+                    self.metrics.count(table_name, "rows_inserted", result.inserted)
+                    self.metrics.count(table_name, "rows_updated", result.updated)
+                else:
+                    self.backend.truncate(cursor, child_table)
+                    self.backend.truncate(cursor, table_name)
+                    written = self.get_writer(cursor).write(table_name, features)
+                    self.metrics.count(table_name, "rows_written", written)
+                    cursor.execute(f"SELECT id, {', '.join(FEATURE_KEY)} FROM {self.backend.table(table_name)}")
+                    feature_ids = {tuple(row[1:]): row[0] for row in cursor.fetchall()}
+
+            # Every self-reference resolves against the ids bound by SRD index
+            self.bind_feature_ids(references, features, feature_ids)
+
+            # Pass 2: all parent links at once, independent of file order
+            with self.metrics.phase(table_name, "write"):
+                links = [
+                    (references.id(item.index), references.id(item.parent_feature))
+                    for item in features if item.parent_feature and references.id(item.index) is not None
+                ]
+                self.backend.update_by_id(cursor, table_name, "parent_feature_id", links, self.batch_size)
+
+            rows = []
+            for item in features:
+                feature_id = references.id(item.index)
+                for prerequisite in item.prerequisites if feature_id is not None else []:
+                    prerequisite.feature_id = feature_id
+                    if prerequisite.reference_index:
+                        prerequisite.reference_id = references.id(prerequisite.reference_index)
+                    rows.append(prerequisite)
+
+            with self.metrics.phase(child_table, "write"):
+                # Prerequisites have no natural key of their own: they are replaced as a whole
+                if self.upsert_mode:
+                    self.backend.truncate(cursor, child_table)
+                self.metrics.count(child_table, "rows_written", self.get_writer(cursor).write(child_table, rows))
+
+            self.commit(session, table_name)
+            self.logger.info(f"{table_name} import completed ({written} rows)")
+
+    def bind_feature_ids(self, references: ReferenceIndex, features: List[Any], feature_ids: Dict[tuple, int]):
+        """Bind each feature's SRD index to its id through the FEATURE_KEY columns"""
+        keys: Dict[tuple, List[Any]] = {}
+        for item in features:
+            keys.setdefault(tuple(item[column] for column in FEATURE_KEY), []).append(item.index)
+
+        for key, indexes in keys.items():
+            if len(indexes) > 1:
+                # e.g. the class table is not imported yet and every class_id is NULL
+                self.logger.error(f"feature {', '.join(index for _, index in indexes)} share the key {key}, not linking them")
+                self.metrics.count("feature", "rows_failed", len(indexes))
+                for index in indexes:
+                    references.bind(index, None)
+                continue
+            references.bind(indexes[0], feature_ids.get(key))
     
-    # TODO: TEST THIS, NOT YET TESTED
-    def import_level(self):
-        """Import level data"""
+    def import_level(self, session: Optional[ImportSession] = None):
+        """Import levels and their class data: bulk parents, one id read, bulk children, one transaction"""
         table_name = "level"
+        child_table = "level_class_data"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_level(self.reference_data_path)
-        if not data:
-            return
+        data = self.source_rows(table_name)
             
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"TRUNCATE TABLE dbo.{table_name}")
+        with self.open_session(session) as session:
+            cursor = session.cursor
+            with self.metrics.phase(table_name, "resolve"):
+                references = self.bind_references(session.key_maps, "class")
+
+            levels = []
+            children = []
             for item in data:
-                try:
-                    className = item.pop('class', None)
-                    if className:
-                        class_id = self.get_id_if_exists(cursor, "class", "name", className)
-                        item['class_id'] = class_id
-                        
-                    child_data = {}
-                    if 'class_specific' in item:
-                        child_data['class_specific'] = item.pop('class_specific')
-                    
-                    if 'spellcasting' in item:
-                        child_data['spellcasting'] = item.pop('spellcasting')
-                                                
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys()) })
-                        OUTPUT Inserted.ID
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                    
-                    id = cursor.fetchone()[0]
+                if item.pop('subclass', None):
+                    self.metrics.count(table_name, "rows_skipped")
+                    continue
+                className = item.pop('class', None)
+                item['class_id'] = references.id(className)
+                if item['class_id'] is None:
+                    self.logger.warning(f"{table_name} {item['level']}: unknown class {className}. Skipping.")
+                    self.metrics.count(table_name, "rows_skipped")
+                    continue
+                children.append({key: item.pop(key) for key in ('class_specific', 'spellcasting')})
+                levels.append(item)
 
-                    self.import_level_class_data(child_data, id)
-                    
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
-        
-    # TODO: TEST THIS, NOT YET TESTED
-    def import_level_class_data(self, rawData, levelId):
-        """Import level specific data"""
-        table_name = "level_class_data"
-        self.logger.info(f"Starting {table_name} import...")
-    
-        if not rawData:
-            return
-        
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(f"TRUNCATE TABLE dbo.{table_name}")
-            for item in rawData:
-                try:
-                    processed_data = create_data_for_level_specific_features(item, levelId)
-                    
-                    for data_item in processed_data:
-                        cursor.execute(f"""
-                            INSERT INTO dbo.{table_name} ({', '.join(data_item.keys())})
-                            VALUES ({', '.join(['?'] * len(data_item))})
-                        """, (
-                            [data_item[k] for k in data_item.keys()]
-                        ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} for level ID {item['id']}: {str(e)}")
+            # Phase 1: every level in one batched write, their ids read back in one round trip
+            with self.metrics.phase(table_name, "write"):
+                if self.upsert_mode:
+                    result = self.upsert(cursor, table_name, levels, ("class_id", "level"))
+                    level_ids = result.ids
+                    written = result.inserted + result.updated
+                    self.metrics.count(table_name, "rows_inserted", result.inserted)
+                    self.metrics.count(table_name, "rows_updated", result.updated)
+                else:
+                    self.backend.truncate(cursor, child_table)
+                    self.backend.truncate(cursor, table_name)
+                    written = self.get_writer(cursor).write(table_name, levels)
+                    self.metrics.count(table_name, "rows_written", written)
+                    cursor.execute(f"SELECT class_id, level, id FROM {self.backend.table(table_name)}")
+                    level_ids = {(class_id, level): id for class_id, level, id in cursor.fetchall()}
+
+            # Phase 2: the class_specific / spellcasting rows of every level in one batched write
+            rows = []
+            for item, child_data in zip(levels, children):
+                level_id = level_ids.get((item['class_id'], item['level']))
+                if level_id is None:
+                    self.logger.error(f"{table_name} {item['level']} of class {item['class_id']} was not written, skipping its class data")
+                    self.metrics.count(child_table, "rows_skipped")
+                    continue
+                rows.extend(create_data_for_level_specific_features([child_data], level_id))
+
+            with self.metrics.phase(child_table, "write"):
+                if self.upsert_mode:
+                    result = self.upsert(cursor, child_table, rows, ("level_id", "attribute_name"))
+                    self.metrics.count(child_table, "rows_inserted", result.inserted)
+                    self.metrics.count(child_table, "rows_updated", result.updated)
+                else:
+                    self.metrics.count(child_table, "rows_written", self.get_writer(cursor).write(child_table, rows))
+
+            # Levels and their class data are committed together
+            self.commit(session, table_name)
+            self.logger.info(f"{table_name} import completed ({written} rows)")
     
-    def import_equipment_categories(self):
+    def import_equipment_categories(self, session: Optional[ImportSession] = None):
         """Import equipment categories data"""
         table_name = "equipment_category"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_equipment_category(self.reference_data_path)
-        if not data:
-            return
-            
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for item in data:
-                try:
-                    # Check if equipment category already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
-        
-    def import_proficiencies(self):
+        data = self.source_rows(table_name)
+        self.import_simple_table(table_name, data, session=session)
+
+    def import_proficiencies(self, session: Optional[ImportSession] = None):
         """Import proficiencies data"""
         table_name = "proficiency"
         self.logger.info(f"Starting {table_name} import...")
         
-        data = create_data_for_proficiency(self.reference_data_path)
-        if not data:
+        data = self.source_rows(table_name)
+        self.import_simple_table(table_name, data, truncate=True, session=session)
+
+    def import_monster(self, session: Optional[ImportSession] = None):
+        """Import monsters and their child tables, one batched write per table"""
+        table_name = "monster"
+        self.logger.info(f"Starting {table_name} import...")
+
+        data = self.source_rows(table_name)
+
+        with self.open_session(session) as session:
+            # Children are written once every parent id is known, so keep the rows
+            monsters = list(data)
+            with self.metrics.phase(table_name, "resolve"):
+                lookups = self.monster_lookups(session, monsters)
+                resolver = self.monster_resolver(session.key_maps, *lookups)
+            resolve = self.metrics.stage(table_name, "resolve", resolver)
+            monsters = [resolve(monster) for monster in monsters]
+
+            with self.metrics.phase(table_name, "write"):
+                # Child rows have no natural key of their own: they are replaced as a whole
+                for child_table in MONSTER_CHILD_TABLES:
+                    self.backend.truncate(session.cursor, child_table)
+                if self.upsert_mode:
+                    result = self.upsert(session.cursor, table_name, monsters)
+                    monster_ids = {name: id for (name,), id in result.ids.items()}
+                    written = result.inserted + result.updated
+                    self.metrics.count(table_name, "rows_inserted", result.inserted)
+                    self.metrics.count(table_name, "rows_updated", result.updated)
+                    session.key_maps.refresh(table_name)
+                else:
+                    self.backend.truncate(session.cursor, table_name)
+                    written = self.get_writer(session.cursor).write(table_name, monsters)
+                    self.metrics.count(table_name, "rows_written", written)
+                    # Bulk inserts return no ids: read all of them back in one SELECT
+                    session.key_maps.refresh(table_name)
+                    monster_ids = session.key_maps.get(table_name).ids
+
+            for child_table, rows in self.monster_children(monsters, monster_ids).items():
+                with self.metrics.phase(child_table, "write"):
+                    child_written = self.get_writer(session.cursor).write(child_table, rows)
+                self.metrics.count(child_table, "rows_written", child_written)
+
+            self.commit(session, table_name)
+            self.logger.info(f"{table_name} import completed ({written} rows)")
+
+    def monster_lookups(self, session: ImportSession, monsters: List[Any]):
+        """Upsert the monster types and armor classes the monsters use, returning their ids"""
+        types = [MonsterTypeRow(name=m.monster_type, is_subtype=0, deleted=0) for m in monsters if m.monster_type]
+        types += [MonsterTypeRow(name=m.sub_monster_type, is_subtype=1, deleted=0) for m in monsters if m.sub_monster_type]
+        armor_classes = [
+            ArmorClassRow(type=armor.type, value=armor.value)
+            for m in monsters for armor in m.armor_classes
+        ]
+        type_ids = self.upsert(session.cursor, "monster_type", types, ("name", "is_subtype")).ids
+        armor_class_ids = self.upsert(session.cursor, "armor_class", armor_classes, ("type", "value")).ids
+        return type_ids, armor_class_ids
+
+    def monster_resolver(self, key_maps, type_ids, armor_class_ids):
+        """Row stage replacing monster and child reference names with ids"""
+        # SRD alignments are lower case ("chaotic evil") and some have no row at all ("unaligned")
+        alignments = key_maps.get("alignment", case_insensitive=True)
+        sizes = key_maps.get("size")
+        references = self.bind_references(key_maps, "proficiency", "equipment")
+
+        def resolve(item):
+            item.alignment_id = alignments.get(item.alignment) if item.alignment else None
+            item.size_id = sizes.get(item.size) if item.size else None
+            item.monster_type_id = type_ids.get((item.monster_type, 0)) if item.monster_type else None
+            item.sub_monster_type_id = type_ids.get((item.sub_monster_type, 1)) if item.sub_monster_type else None
+            for armor in item.armor_classes:
+                armor.armor_class_id = armor_class_ids.get((armor.type, armor.value))
+                armor.equipment_id = references.id(armor.equipment)
+            for proficiency in item.proficiencies:
+                proficiency.proficiency_id = references.id(proficiency.proficiency)
+            return item
+        return resolve
+
+    def monster_children(self, monsters: List[Any], monster_ids: Dict[str, int]) -> Dict[str, List[Any]]:
+        """Child rows of every monster grouped per table, linked to the parent ids"""
+        children: Dict[str, List[Any]] = {child_table: [] for child_table in MONSTER_CHILD_TABLES}
+        for monster in monsters:
+            monster_id = monster_ids.get(monster.name)
+            if monster_id is None:
+                self.logger.error(f"Monster {monster.name} was not written, skipping its child rows")
+                continue
+            rows = monster.armor_classes + monster.proficiencies + monster.actions
+            if monster.damage_data is not None:
+                rows.append(monster.damage_data)
+            for row in rows:
+                if row.table_name == "monster_proficiency" and row.proficiency_id is None:
+                    self.logger.warning(f"Monster {monster.name}: unknown proficiency {row.proficiency}. Skipping.")
+                    self.metrics.count(row.table_name, "rows_skipped")
+                    continue
+                row.monster_id = monster_id
+                children[row.table_name].append(row)
+        return children
+
+    def import_tasks(self) -> List[ImportTask]:
+        """Imports of a full run and the tables each one references"""
+        return [
+            ImportTask("ability_score", self.import_ability_scores),
+            ImportTask("alignment", self.import_alignment),
+            ImportTask("language", self.import_languages),
+            ImportTask("condition", self.import_conditions),
+            ImportTask("damage_type", self.import_damage_type),
+            ImportTask("equipment_category", self.import_equipment_categories),
+            ImportTask("proficiency", self.import_proficiencies),
+            ImportTask("magic_school", self.import_magic_schools),
+            ImportTask("feat", self.import_feats, ("ability_score",)),
+            ImportTask("spell", self.import_spell, ("magic_school", "ability_score")),
+            ImportTask("equipment", self.import_equipment, ("equipment_category",)),
+            ImportTask("monster", self.import_monster, ("alignment", "proficiency", "equipment")),
+            ImportTask("class", self.import_class),
+            ImportTask("feature", self.import_feature, ("class", "spell")),
+            ImportTask("level", self.import_level, ("class", "feature")),
+        ]
+
+    def delta_sources(self) -> Dict[str, DeltaSource]:
+        """Tables a delta import can maintain: one row per source record, keyed on name"""
+        return {
+            "ability_score": DeltaSource(*RECORD_SOURCES["ability_score"]),
+            "alignment": DeltaSource(*RECORD_SOURCES["alignment"]),
+            "language": DeltaSource(*RECORD_SOURCES["language"]),
+            "condition": DeltaSource(*RECORD_SOURCES["condition"]),
+            "damage_type": DeltaSource(*RECORD_SOURCES["damage_type"]),
+            "equipment_category": DeltaSource(*RECORD_SOURCES["equipment_category"]),
+            "proficiency": DeltaSource(*RECORD_SOURCES["proficiency"]),
+            "magic_school": DeltaSource(*RECORD_SOURCES["magic_school"]),
+            "spell": DeltaSource(*RECORD_SOURCES["spell"], self.spell_resolver),
+            "equipment": DeltaSource(*RECORD_SOURCES["equipment"], self.equipment_resolver),
+        }
+
+    def import_delta(self, table_name: str, session: Optional[ImportSession] = None) -> DeltaPlan:
+        """Apply only the records whose content hash changed since the last delta import"""
+        source = self.delta_sources()[table_name]
+        records = self.metrics.timed(table_name, "load", iter_data_file(self.reference_data_path, source.filename), "rows_read")
+
+        with self.open_session(session) as session:
+            manifest = DeltaManifest(session.cursor, self.backend)
+            entries = manifest.load(table_name)
+            plan = plan_delta(table_name, records, entries, FORMATTER_VERSION)
+            if plan.empty:
+                self.logger.info(f"{table_name} unchanged ({plan.unchanged} records)")
+                return plan
+
+            rows = []
+            row_keys = {}
+            formatter = self.metrics.stage(table_name, "format", source.formatter)
+            resolve = self.metrics.stage(table_name, "resolve", source.resolver(session.key_maps)) if source.resolver else None
+            for record in plan.new + plan.changed:
+                row = formatter(record)
+                row_keys[record["index"]] = row.get("name")
+                rows.append(resolve(row) if resolve else row)
+
+            # A changed record may have been renamed: retire the row under its old name as well
+            retired = list(plan.removed.values()) + [
+                entries[index][0] for index, key in row_keys.items()
+                if index in entries and entries[index][0] != key
+            ]
+            # Soft-delete first so a name reused by another record is revived by the upsert
+            with self.metrics.phase(table_name, "write"):
+                deleted = manifest.soft_delete(table_name, "name", retired)
+                result = self.upsert(session.cursor, table_name, rows)
+                manifest.save(plan, row_keys, self.batch_size, self.logger)
+                session.key_maps.refresh(table_name)
+            self.metrics.count(table_name, "rows_inserted", result.inserted)
+            self.metrics.count(table_name, "rows_updated", result.updated)
+            self.metrics.count(table_name, "rows_deleted", deleted)
+            self.commit(session, table_name)
+            self.logger.info(f"{table_name} delta applied: {plan}, {result}, {deleted} soft-deleted")
+            return plan
+
+    def run_delta_import(self, max_workers: Optional[int] = None):
+        """Run a delta import of every table that supports it, in dependency order"""
+        self.logger.info("Starting delta D&D 5e data import...")
+        sources = self.delta_sources()
+        tasks = [
+            ImportTask(task.name, partial(self.import_delta, task.name), task.depends_on)
+            for task in self.import_tasks() if task.name in sources
+        ]
+        try:
+            result = ImportScheduler(tasks, self.session, max_workers or self.pool.max_size, self.logger).run()
+            if not result.ok:
+                raise RuntimeError(f"Imports failed: {', '.join(result.failed)}; skipped: {', '.join(result.skipped)}")
+            self.logger.info(f"Delta import completed in {result.wall_seconds:.2f}s")
+            return result
+        except Exception as e:
+            self.logger.error(f"Error during delta import: {str(e)}")
+            raise
+        finally:
+            self.dump_metrics()
+            self.pool.close_all()
+
+    def dump_metrics(self):
+        """Write the run's metrics to metrics_path, if one was given"""
+        if not self.metrics_path:
             return
-            
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"TRUNCATE TABLE dbo.{table_name}")
-            
-            for item in data:
-                try:
-                    # Check if proficiency already exists
-                    exists = self.check_if_exists(cursor, table_name, "name", item.get('name', ''))
-                    if exists:
-                        self.logger.info(f"{table_name} {item.get('name', 'Unknown')} already exists. Skipping.")
-                        continue
-                    cursor.execute(f"""
-                        INSERT INTO dbo.{table_name} ({', '.join(item.keys())})
-                        VALUES ({', '.join(['?'] * len(item))})
-                    """, (
-                        [item[k] for k in item.keys()]
-                    ))
-                except Exception as e:
-                    self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(e)}")
-            
-            conn.commit()
-            self.logger.info(f"{table_name} import completed")
-          
-    def run_full_import(self):
-        """Run complete data import"""
+        try:
+            self.metrics.dump(self.metrics_path)
+            self.logger.info(f"Import metrics written to {self.metrics_path}")
+        except Exception as e:
+            self.logger.error(f"Error writing metrics to {self.metrics_path}: {str(e)}")
+
+    def run_async_import(self, writer_concurrency: Optional[int] = None, queue_size: int = DEFAULT_QUEUE_SIZE):
+        """Run the full import on the asyncio driver, formatting overlapping the DB writes"""
+        self.logger.info("Starting asynchronous D&D 5e data import...")
+        try:
+            driver = AsyncImportDriver(self, writer_concurrency or self.pool.max_size, queue_size, logger=self.logger)
+            result = asyncio.run(driver.run(self.import_tasks()))
+            self.logger.info(f"Critical path: {' -> '.join(result.critical_path)} ({result.critical_path_seconds:.2f}s)")
+            if not result.ok:
+                raise RuntimeError(f"Imports failed: {', '.join(result.failed)}; skipped: {', '.join(result.skipped)}")
+            self.logger.info(f"Asynchronous import completed in {result.wall_seconds:.2f}s")
+            return result
+        except Exception as e:
+            self.logger.error(f"Error during asynchronous import: {str(e)}")
+            raise
+        finally:
+            self.dump_metrics()
+            self.pool.close_all()
+
+    def load_checkpoints(self, resume: bool) -> Optional[Dict[str, Checkpoint]]:
+        """
+        Checkpoints of the run to resume, or a cleared journal for a fresh run
+        The journal is only read when resuming; a fresh run on a database without the
+        journal table runs unjournaled (None) and cannot be resumed
+        """
+        with self.session() as session:
+            journal = CheckpointJournal(session.cursor, self.backend)
+            if resume:
+                return journal.load()
+            if not self.backend.has_table(session.cursor, CHECKPOINT_TABLE):
+                self.logger.warning(f"No {CHECKPOINT_TABLE} table: this run is not journaled and cannot be resumed")
+                return None
+            journal.clear()
+            session.commit()
+            return {}
+
+    def pending_tasks(self, tasks: List[ImportTask]) -> List[ImportTask]:
+        """
+        Tasks the journal does not mark completed, journaling their own completion
+        Tables written through write_rows resume after their last committed chunk; the
+        others (feat, feature, level, monster) commit once at their end, so an interrupted
+        one left nothing behind and runs again from the start
+        """
+        if self.checkpoints is None:
+            return tasks
+        completed = {name for name, checkpoint in self.checkpoints.items() if checkpoint.completed}
+        if completed:
+            self.logger.info(f"Resuming: skipping completed imports {', '.join(sorted(completed))}")
+        for name, checkpoint in sorted(self.checkpoints.items()):
+            if not checkpoint.completed and checkpoint.offset:
+                self.logger.info(f"Resuming: {name} continues after {checkpoint.offset} committed rows")
+
+        def checkpointed(task: ImportTask) -> Callable[[ImportSession], None]:
+            def run(session: ImportSession):
+                task.run(session)
+                CheckpointJournal(session.cursor, self.backend).save(task.name, completed=True)
+                session.commit()
+            return run
+
+        return [
+            ImportTask(task.name, checkpointed(task), tuple(dep for dep in task.depends_on if dep not in completed))
+            for task in tasks if task.name not in completed
+        ]
+
+    def run_full_import(self, max_workers: Optional[int] = None, resume: bool = False):
+        """Run complete data import, independent tables in parallel; resume=True skips the work a failed run committed"""
         self.logger.info("Starting full D&D 5e data import...")
         
         start_time = datetime.now()
         
         try:
-            # self.import_ability_scores()
-            # self.import_alignment()
-            # self.import_languages()
-            # self.import_conditions()
-            # self.import_damage_type()
-            # self.import_equipment_categories()
-            # self.import_feats()
-            # self.import_proficiencies()
-            # self.import_magic_schools()
-            # self.import_spell()
-            self.import_equipment()
+            self.checkpoints = self.load_checkpoints(resume)
+            tasks = self.pending_tasks(self.import_tasks())
+            if self.parallel_prepare:
+                self.prepare_sources(task.name for task in tasks)
+            # One pooled connection per worker
+            scheduler = ImportScheduler(tasks, self.session, max_workers or self.pool.max_size, self.logger)
+            result = scheduler.run()
             end_time = datetime.now()
             duration = end_time - start_time
+            self.logger.info(f"Critical path: {' -> '.join(result.critical_path)} ({result.critical_path_seconds:.2f}s)")
+            if not result.ok:
+                raise RuntimeError(f"Imports failed: {', '.join(result.failed)}; skipped: {', '.join(result.skipped)}")
             self.logger.info(f"Full import completed in {duration}")
+            return result
             
         except Exception as e:
             self.logger.error(f"Error during full import: {str(e)}")
             raise
+        finally:
+            # Rows of tables that never ran are not kept past the run
+            self.prepared = None
+            self.checkpoints = None
+            self.dump_metrics()
+            self.pool.close_all()
+
+    @contextmanager
+    def compiled(self):
+        """Run the full import offline on the SQLite backend and yield a connection to the result"""
+        if not isinstance(self.backend, SqliteBackend):
+            raise ValueError("Offline builds compile on the SQLite backend, use a sqlite:/// connection string")
+        # Ids start at each IDENTITY seed but step by 1, whatever the increment: exports
+        # only keep their FKs when loaded with KEEPIDENTITY / IDENTITY_INSERT
+        self.run_full_import()
+        conn = self.backend.connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def export_bulk_files(self, output_dir, file_format: str = "bcp") -> Dict[str, int]:
+        """Compile the full import offline and write it as bulk-load files for an empty SQL Server database"""
+        self.logger.info(f"Compiling bulk-load files into {output_dir}...")
+        with self.compiled() as conn:
+            return BulkExporter(self.backend.table_defs, self.logger).export(conn, output_dir, file_format)
+
+    def build_artifact(self, output_path) -> Dict[str, int]:
+        """Compile the full import offline into a read-only, indexed SQLite file for services"""
+        self.logger.info(f"Building read-only artifact {output_path}...")
+        with self.compiled() as conn:
+            # Every imported record gets its SRD index, not only those some import referenced
+            tables = self.backend.table_defs
+            named = [table for table in set(RESOURCE_TABLES.values()) if table in tables and "name" in tables[table].column_names]
+            references = self.bind_references(KeyMaps(conn.cursor(), self.backend), *named)
+            info = {"source_digest": source_digest(self.reference_data_path)}
+            return ArtifactBuilder(self.backend.table_defs, self.logger).build(conn, output_path, references.indexes_by_table(), info)
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Import the D&D 5e reference data")
+    parser.add_argument("--resume", action="store_true", help="continue the last full import from its checkpoint journal")
+    parser.add_argument("--commit-size", type=int, default=None, help="commit streamed tables every N rows")
+    parser.add_argument("--export", metavar="DIR", help="write bulk-load files to DIR instead of importing into the database")
+    parser.add_argument("--export-format", choices=EXPORT_FORMATS, default="bcp", help="bcp data/format files or one batched .sql script")
+    parser.add_argument("--artifact", metavar="PATH", help="build the read-only SQLite artifact at PATH instead of importing into the database")
+    args = parser.parse_args()
     
     # Configuration
     connection_string = (
@@ -694,9 +1033,17 @@ def main():
     
     reference_data_path = r"..\\Reference Data\\2014"
     
+    if args.export:
+        # Compiled in memory, no database connection needed
+        DnDDataImporter("sqlite:///", reference_data_path).export_bulk_files(args.export, args.export_format)
+        return
+    if args.artifact:
+        DnDDataImporter("sqlite:///", reference_data_path).build_artifact(args.artifact)
+        return
+
     # Create importer and run
-    importer = DnDDataImporter(connection_string, reference_data_path)
-    importer.run_full_import()
+    importer = DnDDataImporter(connection_string, reference_data_path, commit_size=args.commit_size)
+    importer.run_full_import(resume=args.resume)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
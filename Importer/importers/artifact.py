@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import stat
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .data_formatter import FORMATTER_VERSION
+from .export import INTERNAL_TABLES, export_columns
+from .schema import TableDef, sqlite_type
+from .snapshot import file_digest
+
+ARTIFACT_INFO_TABLE = "artifact_info"
+# Column holding the SRD index of a row, e.g. "fireball"
+SRD_INDEX_COLUMN = "srd_index"
+# Lookup columns services filter on, indexed wherever a table has them (FK *_id columns are as well)
+LOOKUP_COLUMNS = (SRD_INDEX_COLUMN, "name", "level", "class_id", "subclass_id", "magic_school_id")
+ARTIFACT_PAGE_SIZE = 4096
+
+
+def source_digest(reference_data_path) -> str:
+    """SHA-256 over the names and contents of every reference file"""
+    digest = hashlib.sha256()
+    for path in sorted(Path(reference_data_path).glob("*.json")):
+        digest.update(f"{path.name}:{file_digest(path)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def indexed_columns(columns: List[str]) -> List[str]:
+    """Columns of an artifact table that get a secondary index"""
+    return [c for c in columns if c in LOOKUP_COLUMNS or (c.endswith("_id") and c != "id")]
+
+
+class ArtifactBuilder:
+    """
+    Read-only SQLite file of a compiled dataset, for services that only read it
+    Tables keep their ids and columns (load-time timestamps aside), gain the SRD
+    index of their rows and secondary indexes on the lookup columns. Built from the
+    same sources it is byte-for-byte the same file: no timestamps, rows in id order,
+    VACUUMed. Open it with file:<path>?immutable=1 and PRAGMA mmap_size to serve
+    lookups from the page cache without locking
+    """
+
+    def __init__(self, table_defs: Dict[str, TableDef], logger=None):
+        self.table_defs = table_defs
+        self.logger = logger or logging.getLogger(__name__)
+
+    def build(self, conn, output_path, srd_indexes: Dict[str, Dict[int, str]], info: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+        """Write the artifact next to output_path and swap it in. Returns rows per table"""
+        output_path = Path(output_path)
+        temp_path = output_path.with_name(output_path.name + ".tmp")
+        if temp_path.exists():
+            temp_path.unlink()
+
+        counts: Dict[str, int] = {}
+        artifact = sqlite3.connect(temp_path)
+        try:
+            artifact.execute(f"PRAGMA page_size = {ARTIFACT_PAGE_SIZE}")
+            # A lost build is simply rebuilt, so nothing needs journaling
+            artifact.execute("PRAGMA journal_mode = OFF")
+            artifact.execute("PRAGMA synchronous = OFF")
+            for name in sorted(self.table_defs):
+                if name not in INTERNAL_TABLES:
+                    counts[name] = self.copy_table(conn, artifact, self.table_defs[name], srd_indexes.get(name))
+
+            artifact.execute(f'CREATE TABLE "{ARTIFACT_INFO_TABLE}" (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID')
+            info = {"formatter_version": str(FORMATTER_VERSION), **(info or {})}
+            artifact.executemany(f'INSERT INTO "{ARTIFACT_INFO_TABLE}" VALUES (?, ?)', sorted(info.items()))
+            artifact.commit()
+            # Planner statistics, then a compact file with every table and index in contiguous pages
+            artifact.execute("ANALYZE")
+            artifact.commit()
+            artifact.execute("VACUUM")
+        finally:
+            artifact.close()
+
+        os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        if output_path.exists():
+            # The previous artifact is read-only too, which blocks replacing it on Windows
+            os.chmod(output_path, stat.S_IRUSR | stat.S_IWUSR)
+        os.replace(temp_path, output_path)
+        self.logger.info(f"Built {output_path}: {sum(counts.values())} rows in {len(counts)} tables")
+        return counts
+
+    def copy_table(self, conn, artifact, table: TableDef, srd_index: Optional[Dict[int, str]]) -> int:
+        """Create one table with its lookup indexes and copy its rows in id order"""
+        columns = [c.name for c in export_columns(table)]
+        has_id = "id" in columns
+        definitions = [
+            "id INTEGER PRIMARY KEY" if c.name == "id" else f"{c.name} {sqlite_type(c.sql_type)}"
+            for c in export_columns(table)
+        ]
+        with_srd_index = has_id and srd_index is not None
+        if with_srd_index:
+            definitions.append(f"{SRD_INDEX_COLUMN} TEXT")
+        artifact.execute(f'CREATE TABLE "{table.name}" ({", ".join(definitions)})')
+
+        rows = conn.execute(f'SELECT {", ".join(columns)} FROM "{table.name}" ORDER BY {"id" if has_id else "rowid"}').fetchall()
+        if with_srd_index:
+            rows = [row + (srd_index.get(row[0]),) for row in rows]
+            columns.append(SRD_INDEX_COLUMN)
+        artifact.executemany(f'INSERT INTO "{table.name}" ({", ".join(columns)}) VALUES ({", ".join(["?"] * len(columns))})', rows)
+
+        # Built after the load, one sorted pass per index
+        for column in indexed_columns(columns):
+            artifact.execute(f'CREATE INDEX "{table.name}_{column}" ON "{table.name}" ({column})')
+        return len(rows)
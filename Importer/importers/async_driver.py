@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from .data_formatter import RECORD_SOURCES
+from .scheduler import ImportScheduler, ImportTask, ScheduleResult
+
+# Formatted batches buffered per table before its producer has to wait
+DEFAULT_QUEUE_SIZE = 4
+
+_END = object()
+
+
+class _Failed:
+    """Queue item carrying a producer error to the consuming import"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def next_batch(rows: Iterator[Any], size: int) -> List[Any]:
+    """Pull up to size rows off a stream, an empty list once it is exhausted"""
+    return list(islice(rows, size))
+
+
+class QueueReader:
+    """Blocking row iterator over an asyncio queue of batches, for an import running on an executor thread"""
+
+    def __init__(self, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self.queue = queue
+        self.loop = loop
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            batch = asyncio.run_coroutine_threadsafe(self.queue.get(), self.loop).result()
+            if batch is _END:
+                return
+            if isinstance(batch, _Failed):
+                raise batch.error
+            yield from batch
+
+
+class AsyncImportDriver:
+    """
+    asyncio producer/consumer driver for a full import
+    A producer per table reads and formats its reference file into batches on
+    a bounded queue, starting before the table's dependencies are written; a
+    full queue makes the producer wait. Consumers are the regular import
+    methods, run on a dedicated executor of writer_concurrency threads so the
+    blocking ODBC calls never stall the event loop
+    """
+
+    def __init__(self, importer, writer_concurrency: int = 4, queue_size: int = DEFAULT_QUEUE_SIZE, read_workers: int = 1, logger=None):
+        self.importer = importer
+        self.writer_concurrency = max(1, writer_concurrency)
+        self.queue_size = max(1, queue_size)
+        # Formatting holds the GIL, more read threads mostly help with slow disks
+        self.read_workers = max(1, read_workers)
+        self.logger = logger or logging.getLogger(__name__)
+
+    async def produce(self, table_name: str, queue: asyncio.Queue, executor: ThreadPoolExecutor):
+        """Feed a table's formatted rows into its queue, batch by batch"""
+        loop = asyncio.get_running_loop()
+        metrics = self.importer.metrics
+        try:
+            rows = await loop.run_in_executor(executor, lambda: iter(self.importer.read_source_rows(table_name)))
+            while True:
+                batch = await loop.run_in_executor(executor, next_batch, rows, self.importer.batch_size)
+                if not batch:
+                    break
+                if queue.full():
+                    # Backpressure: the writer is behind, stop formatting until it catches up
+                    metrics.count(table_name, "queue_full_waits")
+                await queue.put(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(_Failed(e))
+            return
+        await queue.put(_END)
+
+    def run_task(self, task: ImportTask) -> float:
+        """Run one import on its own session and return its duration"""
+        start = time.perf_counter()
+        with self.importer.session() as session:
+            task.run(session)
+        return time.perf_counter() - start
+
+    async def run(self, tasks: List[ImportTask]) -> ScheduleResult:
+        """Run every task once its dependencies are written, formatting ahead of the writers"""
+        # Validates the graph and provides the dependency order and critical path
+        scheduler = ImportScheduler(tasks, self.importer.session, self.writer_concurrency, self.logger)
+        result = ScheduleResult()
+        loop = asyncio.get_running_loop()
+        finished: Dict[str, asyncio.Future] = {name: loop.create_future() for name in scheduler.order}
+
+        with ThreadPoolExecutor(self.read_workers, thread_name_prefix="import-read") as read_executor, \
+                ThreadPoolExecutor(self.writer_concurrency, thread_name_prefix="import-write") as write_executor:
+            queues = {name: asyncio.Queue(self.queue_size) for name in scheduler.order if name in RECORD_SOURCES}
+            producers = {name: asyncio.create_task(self.produce(name, queue, read_executor)) for name, queue in queues.items()}
+
+            async def consume(name: str):
+                task = scheduler.tasks[name]
+                try:
+                    deps_ok = [await finished[dep] for dep in task.depends_on]
+                    if not all(deps_ok):
+                        result.skipped.append(name)
+                        self.logger.error(f"Skipping {name} import: a dependency did not complete")
+                        finished[name].set_result(False)
+                        return
+                    if name in queues:
+                        self.importer.streams[name] = QueueReader(queues[name], loop)
+                    self.logger.info(f"Scheduling {name} import")
+                    try:
+                        result.durations[name] = await loop.run_in_executor(write_executor, self.run_task, task)
+                    except Exception as e:
+                        result.failed[name] = str(e)
+                        self.logger.error(f"Import {name} failed: {str(e)}")
+                        finished[name].set_result(False)
+                        return
+                    finished[name].set_result(True)
+                finally:
+                    # An import that stopped early must not leave its producer blocked on a full queue
+                    producer = producers.get(name)
+                    if producer is not None and not producer.done():
+                        producer.cancel()
+                    self.importer.streams.pop(name, None)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(consume(name) for name in scheduler.order))
+            await asyncio.gather(*producers.values(), return_exceptions=True)
+
+        result.wall_seconds = time.perf_counter() - start
+        result.critical_path, result.critical_path_seconds = scheduler.critical_path(result.durations)
+        return result
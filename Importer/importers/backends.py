@@ -0,0 +1,272 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .bulk_writer import DEFAULT_BATCH_SIZE
+from .schema import TABLES_PATH, load_table_defs, sqlite_ddl
+from .statements import InsertStatement, StatementCache
+from .upsert import MergeUpserter, SqliteUpserter, UpsertResult
+
+SQLITE_PREFIX = "sqlite:///"
+# DB-API errors caused by the values of a row (a NOT NULL, a value too long for its column),
+# as opposed to the connection or the statement; every driver names its classes the same
+ROW_ERRORS = ("IntegrityError", "DataError")
+
+
+class DatabaseBackend:
+    """
+    Database operations used by the importer
+    Subclasses implement them for one database engine
+    """
+
+    name = "base"
+    # Upper bound on concurrent connections, None for no limit
+    max_connections = None
+
+    def __init__(self):
+        self.statements = StatementCache(self.build_insert_sql)
+
+    def connect(self):
+        """Open a new DB-API connection"""
+        raise NotImplementedError
+
+    def table(self, table_name: str) -> str:
+        """Qualified table name for SQL text"""
+        raise NotImplementedError
+
+    def build_insert_sql(self, table_name: str, columns: Sequence[str], returns_id: bool = False) -> str:
+        """INSERT statement text for a table/column set"""
+        raise NotImplementedError
+
+    def insert_sql(self, table_name: str, columns: Sequence[str], returns_id: bool = False) -> str:
+        """Cached INSERT statement binding columns in the given order"""
+        return self.statements.sql(table_name, columns, returns_id)
+
+    def insert_statement(self, table_name: str, columns: Sequence[str], returns_id: bool = False) -> InsertStatement:
+        """Cached INSERT statement shared by every order of the same column set"""
+        return self.statements.insert(table_name, columns, returns_id)
+
+    def configure_cursor(self, cursor, bulk: bool = True):
+        """Tune a cursor for executemany"""
+
+    def bulk_insert(self, cursor, table_name: str, columns: Sequence[str], rows: List[Sequence[Any]]) -> int:
+        """Insert many parameter rows with one executemany"""
+        cursor.executemany(self.insert_sql(table_name, columns), rows)
+        return len(rows)
+
+    def insert_returning_id(self, cursor, table_name: str, item: Dict[str, Any]) -> int:
+        """Insert one row and return its generated id"""
+        raise NotImplementedError
+
+    def savepoint(self, cursor, table_name: str, name: str) -> Optional[str]:
+        """Mark a savepoint in the current transaction. Returns its name, None when there was no transaction to mark"""
+        raise NotImplementedError
+
+    def rollback_to_savepoint(self, cursor, name: Optional[str]):
+        """Undo everything since a savepoint, or the whole transaction for a None savepoint"""
+        raise NotImplementedError
+
+    def release_savepoint(self, cursor, name: str):
+        """Keep the work done since a savepoint"""
+
+    def is_row_error(self, error: Exception) -> bool:
+        """Whether an error was caused by the rows written, so the others can still go in"""
+        return any(cls.__name__ in ROW_ERRORS for cls in type(error).__mro__)
+
+    def insert_row(self, cursor, table_name: str, item: Dict[str, Any]):
+        """Insert one row through the shared statement of its column set"""
+        statement = self.insert_statement(table_name, tuple(item.keys()))
+        cursor.execute(statement.sql, statement.params(item))
+
+    def fetch_key_map(self, cursor, table_name: str, key_column: str = "name") -> List[Tuple[Any, int]]:
+        """All (key, id) pairs of a table in one round trip"""
+        cursor.execute(f"SELECT {key_column}, id FROM {self.table(table_name)}")
+        return cursor.fetchall()
+
+    def truncate(self, cursor, table_name: str):
+        """Remove every row and reset the identity"""
+        raise NotImplementedError
+
+    def has_table(self, cursor, table_name: str) -> bool:
+        """Check whether the database has a table"""
+        raise NotImplementedError
+
+    def upsert(self, cursor, table_name: str, rows, key_columns: Sequence[str] = ("name",), batch_size: int = DEFAULT_BATCH_SIZE, logger=None) -> UpsertResult:
+        """Set-based insert-or-update keyed on a natural key"""
+        raise NotImplementedError
+
+    def update_by_id(self, cursor, table_name: str, column: str, values: Sequence[Tuple[int, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Set one column of many rows, given as (id, value) pairs, in one set-based UPDATE"""
+        raise NotImplementedError
+
+
+class SqlServerBackend(DatabaseBackend):
+    """SQL Server / Azure SQL through pyodbc"""
+
+    name = "sqlserver"
+
+    def __init__(self, connection_string: str):
+        super().__init__()
+        self.connection_string = connection_string
+
+    def connect(self):
+        import pyodbc
+        return pyodbc.connect(self.connection_string)
+
+    def table(self, table_name: str) -> str:
+        return f"dbo.{table_name}"
+
+    def build_insert_sql(self, table_name: str, columns: Sequence[str], returns_id: bool = False) -> str:
+        return f"""
+            INSERT INTO dbo.{table_name} ({', '.join(columns)})
+            {'OUTPUT Inserted.ID' if returns_id else ''}
+            VALUES ({', '.join(['?'] * len(columns))})
+        """
+
+    def configure_cursor(self, cursor, bulk: bool = True):
+        if bulk and hasattr(cursor, "fast_executemany"):
+            # Send the whole parameter array in one round trip
+            cursor.fast_executemany = True
+
+    def insert_returning_id(self, cursor, table_name: str, item: Dict[str, Any]) -> int:
+        statement = self.insert_statement(table_name, tuple(item.keys()), returns_id=True)
+        cursor.execute(statement.sql, statement.params(item))
+        return cursor.fetchone()[0]
+
+    def truncate(self, cursor, table_name: str):
+        cursor.execute(f"TRUNCATE TABLE dbo.{table_name}")
+
+    def has_table(self, cursor, table_name: str) -> bool:
+        cursor.execute("SELECT OBJECT_ID(?, 'U')", (f"dbo.{table_name}",))
+        return cursor.fetchone()[0] is not None
+
+    def savepoint(self, cursor, table_name: str, name: str) -> Optional[str]:
+        # With autocommit off the driver runs in implicit transaction mode: the first write
+        # opens the transaction and the connection's commit ends it. A BEGIN TRANSACTION
+        # there would nest a second level that commit() leaves open, so none is issued;
+        # outside a transaction there is no earlier work to protect and no savepoint to set
+        cursor.execute(f"IF @@TRANCOUNT > 0 SAVE TRANSACTION {name}; SELECT @@TRANCOUNT")
+        return name if cursor.fetchone()[0] else None
+
+    def rollback_to_savepoint(self, cursor, name: Optional[str]):
+        cursor.execute(f"ROLLBACK TRANSACTION {name}" if name else "IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION")
+
+    def upsert(self, cursor, table_name: str, rows, key_columns: Sequence[str] = ("name",), batch_size: int = DEFAULT_BATCH_SIZE, logger=None) -> UpsertResult:
+        return MergeUpserter(cursor, batch_size, logger).upsert(table_name, rows, key_columns)
+
+    def update_by_id(self, cursor, table_name: str, column: str, values: Sequence[Tuple[int, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        return MergeUpserter(cursor, batch_size).update_by_id(table_name, column, values)
+
+
+class SqliteBackend(DatabaseBackend):
+    """
+    SQLite file (or in-memory) database
+    The schema is derived from Tables/*.sql on first connect. Ids start at the
+    IDENTITY seeds but always step by 1: AUTOINCREMENT has no increment
+    """
+
+    name = "sqlite"
+    # SQLite has a single writer: parallel imports queue for one pooled connection
+    max_connections = 1
+
+    def __init__(self, database_path: str = ":memory:", tables_path: Path = TABLES_PATH):
+        super().__init__()
+        self.database_path = str(database_path)
+        self.table_defs = load_table_defs(tables_path)
+        self.schema_lock = threading.Lock()
+        self.schema_ready = False
+        self.keeper = None
+        if self.database_path == ":memory:":
+            # Shared-cache URI so every pooled connection sees the same in-memory database
+            self.uri = f"file:dnd_{id(self)}?mode=memory&cache=shared"
+            self.keeper = self.open()
+        else:
+            self.uri = None
+
+    def open(self):
+        """Open a raw sqlite3 connection"""
+        if self.uri:
+            conn = sqlite3.connect(self.uri, uri=True, timeout=30, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.database_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def connect(self):
+        conn = self.open()
+        with self.schema_lock:
+            if not self.schema_ready:
+                self.create_schema(conn)
+                self.schema_ready = True
+        return conn
+
+    def create_schema(self, conn):
+        """Create every table and index, starting AUTOINCREMENT counters at the IDENTITY seeds"""
+        for table in self.table_defs.values():
+            for statement in sqlite_ddl(table):
+                conn.execute(statement)
+        for table in self.table_defs.values():
+            if table.identity:
+                seeded = conn.execute("SELECT 1 FROM sqlite_sequence WHERE name = ?", (table.name,)).fetchone()
+                if not seeded:
+                    conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table.name, table.identity[0] - 1))
+        conn.commit()
+
+    def table(self, table_name: str) -> str:
+        return f'"{table_name}"'
+
+    def build_insert_sql(self, table_name: str, columns: Sequence[str], returns_id: bool = False) -> str:
+        # lastrowid carries the id, no OUTPUT clause needed
+        return f'INSERT INTO "{table_name}" ({", ".join(columns)}) VALUES ({", ".join(["?"] * len(columns))})'
+
+    def insert_returning_id(self, cursor, table_name: str, item: Dict[str, Any]) -> int:
+        statement = self.insert_statement(table_name, tuple(item.keys()), returns_id=True)
+        cursor.execute(statement.sql, statement.params(item))
+        return cursor.lastrowid
+
+    def truncate(self, cursor, table_name: str):
+        cursor.execute(f'DELETE FROM "{table_name}"')
+        table = self.table_defs.get(table_name)
+        if table and table.identity:
+            cursor.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (table.identity[0] - 1, table_name))
+
+    def has_table(self, cursor, table_name: str) -> bool:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,))
+        return cursor.fetchone() is not None
+
+    def savepoint(self, cursor, table_name: str, name: str) -> Optional[str]:
+        # A SAVEPOINT outside a transaction would start one that its RELEASE commits
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN")
+        cursor.execute(f"SAVEPOINT {name}")
+        return name
+
+    def rollback_to_savepoint(self, cursor, name: str):
+        cursor.execute(f"ROLLBACK TO {name}")
+        cursor.execute(f"RELEASE {name}")
+
+    def release_savepoint(self, cursor, name: str):
+        cursor.execute(f"RELEASE {name}")
+
+    def upsert(self, cursor, table_name: str, rows, key_columns: Sequence[str] = ("name",), batch_size: int = DEFAULT_BATCH_SIZE, logger=None) -> UpsertResult:
+        table = self.table_defs.get(table_name)
+        has_updated_at = bool(table and "updated_at" in table.column_names)
+        return SqliteUpserter(cursor, batch_size, logger, has_updated_at).upsert(table_name, rows, key_columns)
+
+    def update_by_id(self, cursor, table_name: str, column: str, values: Sequence[Tuple[int, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        return SqliteUpserter(cursor, batch_size).update_by_id(table_name, column, values)
+
+    def close(self):
+        """Release the in-memory database"""
+        if self.keeper is not None:
+            self.keeper.close()
+            self.keeper = None
+
+
+def backend_for(connection_string: str) -> DatabaseBackend:
+    """Pick a backend from a connection string: sqlite:///path or an ODBC string"""
+    if connection_string.startswith(SQLITE_PREFIX):
+        return SqliteBackend(connection_string[len(SQLITE_PREFIX):] or ":memory:")
+    return SqlServerBackend(connection_string)
@@ -0,0 +1,139 @@
+import logging
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from .metrics import ImportMetrics
+from .pipeline import chunked
+from .rejects import RejectLog
+from .rows import Record
+from .statements import InsertStatement
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class BulkWriter:
+    """
+    Batched INSERT writer
+    Groups rows sharing a column set into executemany calls. Each batch is
+    written under a savepoint: a batch failing on its data (integrity or data
+    errors) is rolled back and bisected down to its bad rows, which are logged
+    (and sent to the reject log) while the rest still goes in bulk; any other
+    error, e.g. a lost connection, is raised. With a commit callable, the
+    transaction is committed every commit_size rows
+    """
+
+    def __init__(self, cursor, backend, batch_size: int = DEFAULT_BATCH_SIZE, bulk_mode: bool = True, logger=None, metrics: Optional[ImportMetrics] = None,
+                 commit_size: Optional[int] = None, commit: Optional[Callable[[], None]] = None, rejects: Optional[RejectLog] = None):
+        self.cursor = cursor
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.bulk_mode = bulk_mode
+        self.logger = logger or logging.getLogger(__name__)
+        self.metrics = metrics or ImportMetrics(enabled=False)
+        self.commit_size = commit_size if commit is not None else None
+        self.commit = commit
+        self.rejects = rejects
+        # Rows written since the last commit
+        self.pending = 0
+        self.savepoints = 0
+        backend.configure_cursor(cursor, bulk_mode)
+
+    def write(self, table_name: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Insert rows, batching those that share a column set. Returns rows written"""
+        if not self.bulk_mode:
+            return sum(self.written(self.write_row(table_name, row)) for row in rows)
+
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        rows = chain((first,), rows)
+        if isinstance(first, Record):
+            return self.write_records(table_name, type(first), rows)
+
+        written = 0
+        # Each chunk is sent as soon as it fills, while the formatter is still producing rows
+        for chunk in chunked(rows, self.batch_size):
+            # Rows with the same column set share one statement whatever their key order
+            groups: Dict[InsertStatement, List[List[Any]]] = {}
+            for row in chunk:
+                statement = self.backend.insert_statement(table_name, tuple(row.keys()))
+                groups.setdefault(statement, []).append(statement.params(row))
+            # Commits fall on chunk boundaries, so everything drawn from rows so far is committed
+            written += self.written(sum(self.flush(table_name, statement.columns, batch) for statement, batch in groups.items()))
+        return written
+
+    def write_records(self, table_name: str, record_type: Type[Record], rows: Iterable[Record]) -> int:
+        """Insert compact records: one shared column tuple, parameters read straight off the slots"""
+        written = 0
+        for chunk in chunked(rows, self.batch_size):
+            written += self.written(self.flush(table_name, record_type.columns, list(map(record_type.params, chunk))))
+        return written
+
+    def written(self, n: int) -> int:
+        """Count rows written, committing once commit_size of them are pending"""
+        self.pending += n
+        if self.commit_size and self.pending >= self.commit_size:
+            self.commit()
+            self.pending = 0
+        return n
+
+    def flush(self, table_name: str, columns: Tuple[str, ...], batch: List[Sequence[Any]]) -> int:
+        """Send one batch as a unit, isolating the failing rows if it is rejected"""
+        try:
+            return self.insert_batch(table_name, columns, batch)
+        except Exception as e:
+            if not self.backend.is_row_error(e):
+                raise
+            if len(batch) == 1:
+                self.reject(table_name, dict(zip(columns, batch[0])), e)
+                return 0
+            self.logger.warning(f"Batch insert into {table_name} failed ({str(e)}), isolating the failing rows")
+            return self.bisect(table_name, columns, batch)
+
+    def insert_batch(self, table_name: str, columns: Tuple[str, ...], batch: List[Sequence[Any]]) -> int:
+        """executemany under a savepoint, so a failure leaves none of the batch behind"""
+        self.savepoints += 1
+        savepoint = self.backend.savepoint(self.cursor, table_name, f"batch_{self.savepoints}")
+        try:
+            written = self.backend.bulk_insert(self.cursor, table_name, columns, batch)
+        except Exception:
+            self.backend.rollback_to_savepoint(self.cursor, savepoint)
+            raise
+        if savepoint is not None:
+            self.backend.release_savepoint(self.cursor, savepoint)
+        return written
+
+    def bisect(self, table_name: str, columns: Tuple[str, ...], batch: List[Sequence[Any]]) -> int:
+        """Retry the halves of a failed batch, splitting only the halves that fail again"""
+        middle = len(batch) // 2
+        written = 0
+        for half in (batch[:middle], batch[middle:]):
+            try:
+                written += self.insert_batch(table_name, columns, half)
+            except Exception as e:
+                if not self.backend.is_row_error(e):
+                    raise
+                if len(half) == 1:
+                    self.reject(table_name, dict(zip(columns, half[0])), e)
+                else:
+                    written += self.bisect(table_name, columns, half)
+        return written
+
+    def write_row(self, table_name: str, item: Dict[str, Any]) -> int:
+        """Insert a single row, rejecting it instead of raising when its data is refused"""
+        try:
+            self.backend.insert_row(self.cursor, table_name, item)
+            return 1
+        except Exception as e:
+            if not self.backend.is_row_error(e):
+                raise
+            self.reject(table_name, dict(item), e)
+            return 0
+
+    def reject(self, table_name: str, item: Dict[str, Any], error: Exception):
+        """Report a row that could not be written"""
+        self.logger.error(f"Error inserting {table_name} {item.get('name', 'Unknown')}: {str(error)}")
+        self.metrics.count(table_name, "rows_failed")
+        if self.rejects is not None:
+            self.rejects.write(table_name, item, error)
@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator
+
+CHECKPOINT_TABLE = "import_checkpoint"
+
+
+@dataclass
+class Checkpoint:
+    """Progress of one import of a full run"""
+    table_name: str
+    # Source rows consumed by the import's committed chunks
+    offset: int = 0
+    completed: bool = False
+
+
+class CountedRows:
+    """Row stream counting the rows pulled from it"""
+
+    def __init__(self, rows: Iterable[Any]):
+        self.rows = iter(rows)
+        self.count = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+class CheckpointJournal:
+    """
+    Completed imports and chunk offsets of the last full run, so a failed run can resume
+    Lives in the import_checkpoint table: an offset is saved in the transaction that
+    commits its chunk, so the journal never runs ahead of the data it describes
+    """
+
+    def __init__(self, cursor, backend):
+        self.cursor = cursor
+        self.backend = backend
+
+    def load(self) -> Dict[str, Checkpoint]:
+        """table -> checkpoint of every import the last run got to, in one round trip"""
+        self.cursor.execute(f"SELECT table_name, row_offset, completed FROM {self.backend.table(CHECKPOINT_TABLE)}")
+        return {name: Checkpoint(name, offset, bool(completed)) for name, offset, completed in self.cursor.fetchall()}
+
+    def save(self, table_name: str, offset: int = 0, completed: bool = False):
+        """Record an import's committed offset, or its completion"""
+        self.cursor.execute(f"DELETE FROM {self.backend.table(CHECKPOINT_TABLE)} WHERE table_name = ?", (table_name,))
+        self.cursor.execute(
+            f"INSERT INTO {self.backend.table(CHECKPOINT_TABLE)} (table_name, row_offset, completed) VALUES (?, ?, ?)",
+            (table_name, offset, int(completed)),
+        )
+
+    def clear(self):
+        """Forget the previous run"""
+        self.cursor.execute(f"DELETE FROM {self.backend.table(CHECKPOINT_TABLE)}")
@@ -1,463 +1,641 @@
-from .data_loader import load_data_file
+from .data_loader import iter_data_file
+from .references import RESOURCE_TABLES, reference_key, url_key
+from .rows import record_type
 import json
-
+import re
+
+# Bump when a formatter changes its output so delta imports re-apply every record
+FORMATTER_VERSION = 8
+
+
+# Compact row types of the formatted tables: columns in INSERT order, then the
+# reference names importers resolve to ids
+AbilityScoreRow = record_type("AbilityScoreRow", "ability_score", ("name", "full_name", "description", "deleted"), module=__name__)
+AlignmentRow = record_type("AlignmentRow", "alignment", ("name", "abbreviation", "description", "deleted"), module=__name__)
+LanguageRow = record_type("LanguageRow", "language", ("name", "type", "script", "description", "speakers", "deleted"), module=__name__)
+ConditionRow = record_type("ConditionRow", "condition", ("name", "description", "deleted"), module=__name__)
+DamageTypeRow = record_type("DamageTypeRow", "damage_type", ("name", "description", "deleted"), module=__name__)
+EquipmentCategoryRow = record_type("EquipmentCategoryRow", "equipment_category", ("name", "deleted"), module=__name__)
+ProficiencyRow = record_type("ProficiencyRow", "proficiency", ("name", "type", "reference", "deleted"), module=__name__)
+SpellRow = record_type(
+    "SpellRow",
+    "spell",
+    (
+        "name",
+        "description",
+        "higher_level",
+        "damage",
+        "range",
+        "attack_type",
+        "components",
+        "material",
+        "ritual",
+        "heal_at_slot_level",
+        "duration",
+        "concentration",
+        "casting_time",
+        "level",
+        "dc_success",
+        "dc_description",
+        "area_of_effect",
+        "area_of_effect_size",
+        "deleted",
+        "magic_school_id",
+        "dc_ability_score_id",
+    ),
+    # classes, subclasses and damage_type are not written, SpellIndex filters on them
+    references=("magic_school", "dc_ability", "classes", "subclasses", "damage_type"),
+    module=__name__,
+)
+MagicSchoolRow = record_type("MagicSchoolRow", "magic_school", ("name", "description", "deleted"), module=__name__)
+EquipmentRow = record_type(
+    "EquipmentRow",
+    "equipment",
+    (
+        "name",
+        "description",
+        "special",
+        "armor_category",
+        "tool_category",
+        "weapon_category",
+        "vehicle_category",
+        "armor_class_base",
+        "armor_class_dex_bonus",
+        "str_minimum",
+        "range_normal",
+        "range_long",
+        "throw_range_normal",
+        "throw_range_long",
+        "cost_quantity",
+        "cost_unit",
+        "speed_quantity",
+        "speed_unit",
+        "weight",
+        "quantity",
+        "deleted",
+        "equipment_category_id",
+        "gear_category_id",
+    ),
+    references=("equipment_category", "gear_category"),
+    module=__name__,
+)
+
+FeatureRow = record_type(
+    "FeatureRow",
+    "feature",
+    ("name", "level", "description", "deleted", "class_id", "subclass_id", "parent_feature_id"),
+    references=("index", "class_name", "subclass", "parent_feature"),
+    children=("prerequisites",),
+    module=__name__,
+)
+FeaturePrerequisiteRow = record_type(
+    "FeaturePrerequisiteRow",
+    "feature_prerequisite",
+    ("feature_id", "reference_type", "reference_id", "minimum_level", "deleted"),
+    references=("reference_index",),
+    module=__name__,
+)
+MonsterRow = record_type(
+    "MonsterRow",
+    "monster",
+    (
+        "name",
+        "description",
+        "speed_walk",
+        "speed_burrow",
+        "speed_climb",
+        "speed_fly",
+        "speed_swim",
+        "hit_points",
+        "hit_dice",
+        "hit_points_roll",
+        "strength",
+        "dexterity",
+        "constitution",
+        "intelligence",
+        "wisdom",
+        "charisma",
+        "darkvision",
+        "passive_perception",
+        "blindsight",
+        "tremorsense",
+        "truesight",
+        "languages",
+        "challenge_rating",
+        "experience_points",
+        "proficiency_bonus",
+        "image_url",
+        "deleted",
+        "alignment_id",
+        "size_id",
+        "monster_type_id",
+        "sub_monster_type_id",
+    ),
+    references=("alignment", "size", "monster_type", "sub_monster_type"),
+    children=("armor_classes", "proficiencies", "damage_data", "actions"),
+    module=__name__,
+)
+ArmorClassRow = record_type("ArmorClassRow", "armor_class", ("type", "value", "dex_bonus", "max_bonus"), module=__name__)
+MonsterTypeRow = record_type("MonsterTypeRow", "monster_type", ("name", "is_subtype", "deleted"), module=__name__)
+MonsterArmorClassRow = record_type(
+    "MonsterArmorClassRow",
+    "monster_armor_class",
+    ("monster_id", "armor_class_id", "equipment_id"),
+    references=("type", "value", "equipment"),
+    module=__name__,
+)
+MonsterProficiencyRow = record_type(
+    "MonsterProficiencyRow",
+    "monster_proficiency",
+    ("monster_id", "proficiency_id", "value"),
+    references=("proficiency",),
+    module=__name__,
+)
+MonsterDamageDataRow = record_type(
+    "MonsterDamageDataRow",
+    "monster_damage_data",
+    ("monster_id", "damage_vulnerabilities", "damage_resistances", "damage_immunities", "condition_immunities"),
+    module=__name__,
+)
+MonsterActionRow = record_type("MonsterActionRow", "monster_actions", ("monster_id", "action_type", "action_data"), module=__name__)
 
 def create_data_for_ability_score(path):
     """CREATE DATA FOR ABILITY SCORE IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Ability-Scores.json")
-    data = []
-    for item in jsonData:
-        desc = " ".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
-        data.append(
-            {
-                "name": item["name"],
-                "full_name": item["full_name"],
-                "description": desc,
-                "deleted": 0,
-            }
-        )
-    return data
+    for item in iter_data_file(path, "5e-SRD-Ability-Scores.json"):
+        yield format_ability_score(item)
+
+
+def format_ability_score(item):
+    """FORMAT ONE RECORD FOR ABILITY SCORE IMPORTER"""
+    desc = " ".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
+    return AbilityScoreRow(
+        name=item["name"],
+        full_name=item["full_name"],
+        description=desc,
+        deleted=0,
+    )
 
 
 def create_data_for_alignment(path):
     """CREATE DATA FOR ALIGNMENT IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Alignments.json")
-    data = []
-    for item in jsonData:
-        desc = " ".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
-        data.append(
-            {
-                "name": item["name"],
-                "abbreviation": item["abbreviation"],
-                "description": desc,
-                "deleted": 0,
-            }
-        )
-    return data
+    for item in iter_data_file(path, "5e-SRD-Alignments.json"):
+        yield format_alignment(item)
+
+
+def format_alignment(item):
+    """FORMAT ONE RECORD FOR ALIGNMENT IMPORTER"""
+    desc = " ".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
+    return AlignmentRow(
+        name=item["name"],
+        abbreviation=item["abbreviation"],
+        description=desc,
+        deleted=0,
+    )
 
 
 def create_data_for_language(path):
     """CREATE DATA FOR LANGUAGE IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Languages.json")
-    data = []
-    for item in jsonData:
-        raw_description = item.get("desc", "")
-        desc = (
-            " ".join(raw_description)
-            if is_list_type(raw_description)
-            else raw_description
-        )
-        data.append(
-            {
-                "name": item["name"],
-                "type": item["type"],
-                "script": item.get("script", ""),
-                "description": desc,
-                "speakers": (
-                    ", ".join(item["typical_speakers"])
-                    if is_list_type(item["typical_speakers"])
-                    else item["typical_speakers"]
-                ),
-                "deleted": 0,
-            }
-        )
-    # print(json.dumps(data, indent=4))
-    return data
+    for item in iter_data_file(path, "5e-SRD-Languages.json"):
+        yield format_language(item)
+
+
+def format_language(item):
+    """FORMAT ONE RECORD FOR LANGUAGE IMPORTER"""
+    raw_description = item.get("desc", "")
+    desc = (
+        " ".join(raw_description)
+        if is_list_type(raw_description)
+        else raw_description
+    )
+    return LanguageRow(
+        name=item["name"],
+        type=item["type"],
+        script=item.get("script", ""),
+        description=desc,
+        speakers=(
+            ", ".join(item["typical_speakers"])
+            if is_list_type(item["typical_speakers"])
+            else item["typical_speakers"]
+        ),
+        deleted=0,
+    )
 
 
 def create_data_for_background(path):
     """CREATE DATA FOR BACKGROUND IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Backgrounds.json")
-    data = []
-    for item in jsonData:
-        desc = " ".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
-        data.append({"name": item["name"], "description": desc, "deleted": 0})
-    return data
+    for item in iter_data_file(path, "5e-SRD-Backgrounds.json"):
+        yield format_background(item)
+
+
+def format_background(item):
+    """FORMAT ONE RECORD FOR BACKGROUND IMPORTER"""
+    # Backgrounds have no desc: the row holds how many of each option set to choose,
+    # the text lives in background_feature and the personality tables
+    return {
+        "name": item["name"],
+        "language_options": choose_count(item.get("language_options")),
+        "starting_equipment_options": choose_count(item.get("starting_equipment_options")),
+        "trait_options": choose_count(item.get("personality_traits")),
+        "ideal_options": choose_count(item.get("ideals")),
+        "bond_options": choose_count(item.get("bonds")),
+        "flaw_options": choose_count(item.get("flaws")),
+    }
+
+
+def choose_count(options):
+    """Number of choices an option set (or a list of them) asks for, None without one"""
+    if options is None:
+        return None
+    if is_list_type(options):
+        return sum(option.get("choose", 0) for option in options)
+    return options.get("choose")
 
 
 def create_data_for_condition(path):
     """CREATE DATA FOR CONDITION IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Conditions.json")
-    data = []
-    for item in jsonData:
-        desc = (
-            """\n\n""".join(item["desc"])
-            if is_list_type(item["desc"])
-            else item["desc"]
-        )
-        data.append({"name": item["name"], "description": desc, "deleted": 0})
-    # print(json.dumps(data, indent=4))
-    return data
+    for item in iter_data_file(path, "5e-SRD-Conditions.json"):
+        yield format_condition(item)
+
+
+def format_condition(item):
+    """FORMAT ONE RECORD FOR CONDITION IMPORTER"""
+    desc = (
+        """\n\n""".join(item["desc"])
+        if is_list_type(item["desc"])
+        else item["desc"]
+    )
+    return ConditionRow(name=item["name"], description=desc, deleted=0)
 
 
 def create_data_for_damage_type(path):
     """CREATE DATA FOR DAMAGE TYPE IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Damage-Types.json")
-    data = []
-    for item in jsonData:
-        desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
-        data.append({"name": item["name"], "description": desc, "deleted": 0})
-    return data
+    for item in iter_data_file(path, "5e-SRD-Damage-Types.json"):
+        yield format_damage_type(item)
+
+
+def format_damage_type(item):
+    """FORMAT ONE RECORD FOR DAMAGE TYPE IMPORTER"""
+    desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
+    return DamageTypeRow(name=item["name"], description=desc, deleted=0)
 
 
 def create_data_for_equipment_category(path):
     """CREATE DATA FOR EQUIPMENT CATEGORY IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Equipment-Categories.json")
-    data = []
-    for item in jsonData:
-        data.append({"name": item["name"], "deleted": 0})
-    return data
+    for item in iter_data_file(path, "5e-SRD-Equipment-Categories.json"):
+        yield format_equipment_category(item)
+
+
+def format_equipment_category(item):
+    """FORMAT ONE RECORD FOR EQUIPMENT CATEGORY IMPORTER"""
+    return EquipmentCategoryRow(name=item["name"], deleted=0)
 
 
 def create_data_for_feats(path):
     """CREATE DATA FOR FEATS IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Feats.json")
-    data = []
-    for item in jsonData:
-        desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
-        data.append(
-            {
-                "name": item["name"],
-                "description": desc,
-                "prerequisites": item.get("prerequisites", None),
-                "deleted": 0,
-            }
-        )
-    return data
+    for item in iter_data_file(path, "5e-SRD-Feats.json"):
+        yield format_feat(item)
+
+
+def format_feat(item):
+    """FORMAT ONE RECORD FOR FEATS IMPORTER"""
+    desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
+    return {
+        "name": item["name"],
+        "description": desc,
+        "prerequisites": item.get("prerequisites", None),
+        "deleted": 0,
+    }
 
 
 def create_data_for_feats_prerequisites(jsonData):
     """CREATE DATA FOR FEATS PREREQUISITES IMPORTER"""
-    data = []
     for item in jsonData:
-        data.append(
-            {
-                "ability_score": item["ability_score"]["name"],
-                "minimum_score": item["minimum_score"],
-                "deleted": 0,
-            }
-        )
-    return data
+        yield {
+            "ability_score": reference_key(item["ability_score"]),
+            "minimum_score": item["minimum_score"],
+            "deleted": 0,
+        }
 
 
 def create_data_for_feature(path):
     """CREATE DATA FOR FEATURE IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Features.json")
-    data = []
-    for item in jsonData:
-        desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
-        data.append(
-            {
-                "name": item["name"],
-                "level": item["level"],
-                "description": desc,
-                "class": item["class"]["name"],
-                "prerequisites": item.get("prerequisites", None),
-                "subclass": (
-                    item["subclass"]["name"] if item.get("subclass", None) else None
-                ),
-                "parent_feature": (
-                    item["parent"]["name"] if item.get("parent", None) else None
-                ),
-                "deleted": 0,
-            }
-        )
-    return data
+    for item in iter_data_file(path, "5e-SRD-Features.json"):
+        yield format_feature(item)
+
+
+def format_feature(item):
+    """FORMAT ONE RECORD FOR FEATURE IMPORTER"""
+    desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
+    return FeatureRow(
+        name=item["name"],
+        level=item["level"],
+        description=desc,
+        deleted=0,
+        # REFERENCE: features are linked by SRD index, names repeat across classes
+        index=reference_key(item),
+        class_name=reference_key(item["class"]),
+        subclass=reference_key(item.get("subclass", None)),
+        parent_feature=reference_key(item.get("parent", None)),
+        # CHILDREN
+        prerequisites=list(create_data_for_feature_prerequisites(item.get("prerequisites", []))),
+    )
 
 
 def create_data_for_feature_prerequisites(jsonData):
     """CREATE DATA FOR FEATURE PREREQUISITES IMPORTER"""
-    data = []
     for item in jsonData:
-        ref_type = (
-            item["prerequisite"]["type"] if item.get("prerequisite", None) else None,
-        )
-        if ref_type != "level":
-            ref_name = " ".join(
-                item.get("feature", item.get("spell", "")).split("/")[-1].split("-")
-            )
+        ref_type = item["type"]
+        if ref_type == "level":
+            # A level has no row to point at, reference_id stays NULL
+            yield FeaturePrerequisiteRow(reference_type=ref_type, minimum_level=item["level"], deleted=0)
         else:
-            ref_name = str(item.get("level", ""))
-
-        data.append(
-            {"reference_type": ref_type, "reference_name": ref_name, "deleted": 0}
-        )
-    return data
+            # "feature" / "spell": the url of the referenced record
+            yield FeaturePrerequisiteRow(reference_type=ref_type, reference_index=url_key(item[ref_type]), deleted=0)
 
 
 def create_data_for_level(path):
     """CREATE DATA FOR LEVEL IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Levels.json")
-    data = []
-    for item in jsonData:
-        data.append(
-            {
-                "class": item["class"]["name"],
-                "level": item["level"],
-                "ability_score_bonuses": item["ability_score_bonuses"],
-                "proficiency_bonus": item["prof_bonus"],
-                "class_specific": item.get("class_specific", None),
-                "spellcasting": item.get("spellcasting", None),
-                "deleted": 0,
-            }
-        )
-    return data
+    for item in iter_data_file(path, "5e-SRD-Levels.json"):
+        yield format_level(item)
+
+
+def format_level(item):
+    """FORMAT ONE RECORD FOR LEVEL IMPORTER"""
+    return {
+        "class": reference_key(item["class"]),
+        # Subclass levels only list features, the level row belongs to the class
+        "subclass": reference_key(item.get("subclass", None)),
+        "level": item["level"],
+        "ability_score_bonuses": item.get("ability_score_bonuses", None),
+        "proficiency_bonus": item.get("prof_bonus", None),
+        "class_specific": item.get("class_specific", None),
+        "spellcasting": item.get("spellcasting", None),
+        "deleted": 0,
+    }
 
 
 def create_data_for_level_specific_features(jsonData, levelId):
     """CREATE DATA FOR LEVEL SPECIFIC FEATURES IMPORTER"""
-    data = []
     for item in jsonData:
         # class_specific
         # spellcasting
         if item.get("class_specific", None):
-            data.append(
-                {
-                    "level_id": levelId,
-                    "attribute_name": "class_specific",
-                    "attribute_value": json.dumps(item["class_specific"]),
-                    "value_type": "class_specific",
-                    "deleted": 0,
-                }
-            )
+            yield {
+                "level_id": levelId,
+                "attribute_name": "class_specific",
+                "attribute_value": json.dumps(item["class_specific"]),
+                "value_type": "class_specific",
+                "deleted": 0,
+            }
         if item.get("spellcasting", None):
-            data.append(
-                {
-                    "level_id": levelId,
-                    "attribute_name": "spellcasting",
-                    "attribute_value": json.dumps(item["spellcasting"]),
-                    "value_type": "spellcasting",
-                    "deleted": 0,
-                }
-            )
-    return data
+            yield {
+                "level_id": levelId,
+                "attribute_name": "spellcasting",
+                "attribute_value": json.dumps(item["spellcasting"]),
+                "value_type": "spellcasting",
+                "deleted": 0,
+            }
 
 
 def create_data_for_proficiency(path):
     """CREATE DATA FOR PROFICIENCY IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Proficiencies.json")
-    data = []
-
-    def format_reference(ref_data):
-        if not ref_data:
-            return None
-        return json.dumps(
-            {
-                "name": ref_data["name"],
-                "table_reference": ref_data["url"].split("/")[-2].replace("-", "_"),
-            }
-        )
+    for item in iter_data_file(path, "5e-SRD-Proficiencies.json"):
+        yield format_proficiency(item)
 
-    for item in jsonData:
 
-        data.append(
-            {
-                "name": item["name"],
-                "type": item["type"],
-                "reference": format_reference(item.get("reference", None)),
-                "deleted": 0,
-            }
-        )
-    return data
+def format_proficiency(item):
+    """FORMAT ONE RECORD FOR PROFICIENCY IMPORTER"""
+    return ProficiencyRow(
+        name=item["name"],
+        type=item["type"],
+        reference=format_proficiency_reference(item.get("reference", None)),
+        deleted=0,
+    )
 
 
-def create_data_for_spells(path):
-    """CREATE DATA FOR SPELLS IMPORTER"""
+def format_proficiency_reference(ref_data):
+    if not ref_data:
+        return None
+    resource_type, index = reference_key(ref_data)
+    return json.dumps(
+        {
+            "name": ref_data["name"],
+            "table_reference": RESOURCE_TABLES.get(resource_type, None),
+            "index": index,
+        }
+    )
 
-    def format_damage(damage_data):
-        if not damage_data:
-            return None
-        return json.dumps(
-            {
-                "damage_type": (
-                    damage_data["damage_type"]["name"]
-                    if damage_data.get("damage_type", None)
-                    else None
-                ),
-                "damage_at_slot_level": json.dumps(
-                    damage_data.get("damage_at_slot_level", None)
-                ),
-            }
-        )
 
-    jsonData = load_data_file(path, "5e-SRD-Spells.json")
-    data = []
-    for item in jsonData:
-        desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
-        higher_level = ""
-        if item.get("higher_level", None):
-            higher_level = (
-                "\n\n".join(item["higher_level"])
-                if is_list_type(item["higher_level"])
-                else item["higher_level"]
-            )
-        data.append(
-            {
-                "name": item["name"],
-                "description": desc,
-                "higher_level": higher_level,
-                "damage": format_damage(item.get("damage", None)),
-                "range": item.get("range", ""),
-                "attack_type": item.get("attack_type", ""),
-                "components": (
-                    ", ".join(item["components"])
-                    if is_list_type(item["components"])
-                    else item["components"]
-                ),
-                "material": item.get("material", ""),
-                "ritual": int(item.get("ritual", False)),
-                "heal_at_slot_level": json.dumps(item.get("heal_at_slot_level", {})),
-                "duration": item.get("duration", ""),
-                "concentration": int(item.get("concentration", False)),
-                "casting_time": item.get("casting_time", ""),
-                "level": item.get("level", None),
-                "dc_ability": (
-                    item["dc"]["dc_type"]["name"] if item.get("dc", None) else None
-                ),
-                "dc_success": (
-                    item["dc"]["dc_success"] if item.get("dc", None) else None
-                ),
-                "dc_description": (
-                    item["dc"]["desc"]
-                    if item.get("dc", None) and item["dc"].get("desc", None)
-                    else None
-                ),
-                "area_of_effect": (
-                    item["area_of_effect"]["type"]
-                    if item.get("area_of_effect", None)
-                    else None
-                ),
-                "area_of_effect_size": (
-                    item["area_of_effect"]["size"]
-                    if item.get("area_of_effect", None)
-                    else None
-                ),
-                "magic_school": (
-                    item["school"]["name"] if item.get("school", None) else None
-                ),  # REFERENCE
-                "deleted": 0,
-            }
+def create_data_for_spells(path):
+    """CREATE DATA FOR SPELLS IMPORTER"""
+    for item in iter_data_file(path, "5e-SRD-Spells.json"):
+        yield format_spell(item)
+
+
+def format_spell(item):
+    """FORMAT ONE RECORD FOR SPELLS IMPORTER"""
+    desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
+    higher_level = ""
+    if item.get("higher_level", None):
+        higher_level = (
+            "\n\n".join(item["higher_level"])
+            if is_list_type(item["higher_level"])
+            else item["higher_level"]
         )
-    return data
+    return SpellRow(
+        name=item["name"],
+        description=desc,
+        higher_level=higher_level,
+        damage=format_spell_damage(item.get("damage", None)),
+        range=item.get("range", ""),
+        attack_type=item.get("attack_type", ""),
+        components=(
+            ", ".join(item["components"])
+            if is_list_type(item["components"])
+            else item["components"]
+        ),
+        material=item.get("material", ""),
+        ritual=int(item.get("ritual", False)),
+        heal_at_slot_level=json.dumps(item.get("heal_at_slot_level", {})),
+        duration=item.get("duration", ""),
+        concentration=int(item.get("concentration", False)),
+        casting_time=item.get("casting_time", ""),
+        level=item.get("level", None),
+        dc_ability=(
+            reference_key(item["dc"]["dc_type"]) if item.get("dc", None) else None
+        ),
+        dc_success=(
+            item["dc"]["dc_success"] if item.get("dc", None) else None
+        ),
+        dc_description=(
+            item["dc"]["desc"]
+            if item.get("dc", None) and item["dc"].get("desc", None)
+            else None
+        ),
+        area_of_effect=(
+            item["area_of_effect"]["type"]
+            if item.get("area_of_effect", None)
+            else None
+        ),
+        area_of_effect_size=(
+            item["area_of_effect"]["size"]
+            if item.get("area_of_effect", None)
+            else None
+        ),
+        magic_school=reference_key(item.get("school", None)),  # REFERENCE
+        classes=[reference_key(ref) for ref in item.get("classes", [])],
+        subclasses=[reference_key(ref) for ref in item.get("subclasses", [])],
+        damage_type=reference_key((item.get("damage", None) or {}).get("damage_type", None)),
+        deleted=0,
+    )
+
+
+def format_spell_damage(damage_data):
+    if not damage_data:
+        return None
+    return json.dumps(
+        {
+            "damage_type": (
+                damage_data["damage_type"]["name"]
+                if damage_data.get("damage_type", None)
+                else None
+            ),
+            "damage_at_slot_level": json.dumps(
+                damage_data.get("damage_at_slot_level", None)
+            ),
+        }
+    )
 
 
 def create_data_for_magic_school(path):
     """CREATE DATA FOR MAGIC SCHOOL IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Magic-Schools.json")
-    data = []
-    for item in jsonData:
-        desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
-        data.append({"name": item["name"], "description": desc, "deleted": 0})
-    return data
+    for item in iter_data_file(path, "5e-SRD-Magic-Schools.json"):
+        yield format_magic_school(item)
+
+
+def format_magic_school(item):
+    """FORMAT ONE RECORD FOR MAGIC SCHOOL IMPORTER"""
+    desc = "\n\n".join(item["desc"]) if is_list_type(item["desc"]) else item["desc"]
+    return MagicSchoolRow(name=item["name"], description=desc, deleted=0)
 
 
 def create_data_for_equipment(path):
     """CREATE DATA FOR EQUIPMENT IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Equipment.json")
-    data = []
-    for item in jsonData:
-        desc = (
-            "\n\n".join(item["desc"])
-            if is_list_type(item.get("desc", ""))
-            else item.get("desc", "")
-        )
-        special = (
-            "\n\n".join(item["special"])
-            if is_list_type(item.get("special", ""))
-            else item.get("special", "")
-        )
-        data.append(
-            {
-                "name": item["name"],
-                "description": desc,
-                "special": special,
-                "armor_category": item.get("armor_category", None),
-                "tool_category": item.get("tool_category", None),
-                "weapon_category": item.get("weapon_category", None),
-                "vehicle_category": item.get("vehicle_category", None),
-                # REFERENCE
-                "equipment_category": (
-                    item["equipment_category"]["name"]
-                    if item.get("equipment_category", None)
-                    else None
-                ),
-                "gear_category": (
-                    item["gear_category"]["name"]
-                    if item.get("gear_category", None)
-                    else None
-                ),
-                "armor_class_base": (
-                    item["armor_class"]["base"]
-                    if item.get("armor_class", None)
-                    else None
-                ),
-                "armor_class_dex_bonus": (
-                    int(item["armor_class"]["dex_bonus"])
-                    if item.get("armor_class", None)
-                    else None
-                ),
-                "str_minimum": parse_int(item.get("str_minimum", None)),
-                "range_normal": (
-                    parse_int(item["range"]["normal"])
-                    if item.get("range", None)
-                    else None
-                ),
-                "range_long": (
-                    parse_int(item["range"].get("long", None))
-                    if item.get("range", None)
-                    else None
-                ),
-                "throw_range_normal": (
-                    parse_int(item["throw_range"]["normal"])
-                    if item.get("throw_range", None)
-                    else None
-                ),
-                "throw_range_long": (
-                    parse_int(item["throw_range"].get("long", None))
-                    if item.get("throw_range", None)
-                    else None
-                ),
-                "cost_quantity": (
-                    item["cost"]["quantity"] if item.get("cost", None) else None
-                ),
-                "cost_unit": item["cost"]["unit"] if item.get("cost", None) else None,
-                "speed_quantity": (
-                    item["speed"]["quantity"] if item.get("speed", None) else None
-                ),
-                "speed_unit": (
-                    item["speed"]["unit"] if item.get("speed", None) else None
-                ),
-                "weight": parse_float(item.get("weight", None)),
-                "quantity": parse_int(item.get("quantity", None)),
-                "deleted": 0,
-            }
-        )
-
-    return data
+    for item in iter_data_file(path, "5e-SRD-Equipment.json"):
+        yield format_equipment(item)
+
+
+def format_equipment(item):
+    """FORMAT ONE RECORD FOR EQUIPMENT IMPORTER"""
+    desc = (
+        "\n\n".join(item["desc"])
+        if is_list_type(item.get("desc", ""))
+        else item.get("desc", "")
+    )
+    special = (
+        "\n\n".join(item["special"])
+        if is_list_type(item.get("special", ""))
+        else item.get("special", "")
+    )
+    return EquipmentRow(
+        name=item["name"],
+        description=desc,
+        special=special,
+        armor_category=item.get("armor_category", None),
+        tool_category=item.get("tool_category", None),
+        weapon_category=item.get("weapon_category", None),
+        vehicle_category=item.get("vehicle_category", None),
+        # REFERENCE
+        equipment_category=reference_key(item.get("equipment_category", None)),
+        gear_category=reference_key(item.get("gear_category", None)),
+        armor_class_base=(
+            item["armor_class"]["base"]
+            if item.get("armor_class", None)
+            else None
+        ),
+        armor_class_dex_bonus=(
+            int(item["armor_class"]["dex_bonus"])
+            if item.get("armor_class", None)
+            else None
+        ),
+        str_minimum=parse_int(item.get("str_minimum", None)),
+        range_normal=(
+            parse_int(item["range"]["normal"])
+            if item.get("range", None)
+            else None
+        ),
+        range_long=(
+            parse_int(item["range"].get("long", None))
+            if item.get("range", None)
+            else None
+        ),
+        throw_range_normal=(
+            parse_int(item["throw_range"]["normal"])
+            if item.get("throw_range", None)
+            else None
+        ),
+        throw_range_long=(
+            parse_int(item["throw_range"].get("long", None))
+            if item.get("throw_range", None)
+            else None
+        ),
+        cost_quantity=(
+            item["cost"]["quantity"] if item.get("cost", None) else None
+        ),
+        cost_unit=item["cost"]["unit"] if item.get("cost", None) else None,
+        speed_quantity=(
+            item["speed"]["quantity"] if item.get("speed", None) else None
+        ),
+        speed_unit=(
+            item["speed"]["unit"] if item.get("speed", None) else None
+        ),
+        weight=parse_float(item.get("weight", None)),
+        quantity=parse_int(item.get("quantity", None)),
+        deleted=0,
+    )
 
 
 def create_data_for_class(path):
     """CREATE DATA FOR CLASS IMPORTER"""
-    jsonData = load_data_file(path, "5e-SRD-Classes.json")
-    data = []
-    for item in jsonData:
-        data.append(
-            {
-                "name": item["name"],
-                "hit_die": item["hit_die"],
-                "is_subclass": int(item.get("is_subclass", False)),
-                "parent_class_id": None,
-                "deleted": 0,
-            }
-        )
-    return data
+    for item in iter_data_file(path, "5e-SRD-Classes.json"):
+        yield format_class(item)
+
+
+def format_class(item):
+    """FORMAT ONE RECORD FOR CLASS IMPORTER"""
+    return {
+        "name": item["name"],
+        "hit_die": item["hit_die"],
+        "is_subclass": int(item.get("is_subclass", False)),
+        "parent_class_id": None,
+        "deleted": 0,
+    }
+
+
+def create_data_for_subclass(path):
+    """CREATE DATA FOR SUBCLASS IMPORTER"""
+    for item in iter_data_file(path, "5e-SRD-Subclasses.json"):
+        yield format_subclass(item)
+
+
+def format_subclass(item):
+    """FORMAT ONE RECORD FOR SUBCLASS IMPORTER"""
+    return {
+        "name": item["name"],
+        # Subclasses have the hit die of their class, set once the class is resolved
+        "hit_die": None,
+        "is_subclass": 1,
+        "parent_class_id": None,
+        "parent_class": reference_key(item["class"]),  # REFERENCE
+        "deleted": 0,
+    }
+
 
 def create_data_for_class_proficiency_choice_group(jsonData, classId):
     """CREATE DATA FOR CLASS PROFICIENCY OPTIONS IMPORTER"""
-    data = []
     for item in jsonData:
         # proficiency_choices
-        data.append({
+        yield {
             "class_id": classId,
             "description": item.get("desc", ""),
             "choose_count": item.get("choose", 0),
@@ -465,55 +643,47 @@ def create_data_for_class_proficiency_choice_group(jsonData, classId):
             
             "option_set_type": item["from"]["option_set_type"] if "option_set_type" in item["from"] else "",
             "deleted": 0,
-        })
-    return data
+        }
 
 def create_date_for_class_proficiency_choice_options(jsonData, choiceGroupId):
     """CREATE DATA FOR CLASS PROFICIENCY OPTIONS IMPORTER"""
-    data = []
     for item in jsonData:
         # options
-        data.append({
+        yield {
             "choice_group_id": choiceGroupId,
             "proficiency_name": item.get("proficiency", {}).get("name", ""),
             "option_type": item.get("option_type", "reference"),
             "deleted": 0,
-        })
-    return data
+        }
 
 def create_data_for_class_proficiencies(jsonData, classId):
     """CREATE DATA FOR CLASS PROFICIENCY IMPORTER"""
-    data = []
     for item in jsonData:
         # proficiencies
-        data.append({
+        yield {
             "class_id": classId,
             "proficiency_name": item.get("proficiency", {}).get("name", ""),
             "deleted": 0,
-        })
-    return data
+        }
 
 def create_data_for_class_starting_equipment_choice_group(jsonData, classId):
     """CREATE DATA FOR CLASS STARTING EQUIPMENT OPTIONS IMPORTER"""
-    data = []
     for item in jsonData:
         # starting_equipment_options
-        data.append({
+        yield {
             "class_id": classId,
             "description": item.get("desc", ""),
             "choose_count": item.get("choose", 0),
             "choice_type": item.get("type", ""),
             "option_set_type": item["from"]["option_set_type"] if "option_set_type" in item["from"] else "",
             "deleted": 0,
-        })
-    return data
+        }
 # TODO: I LEFT OFF HERE, Figuring out what the fuck is going on with the choice options for starting equipments
 def create_date_for_class_starting_equipment_choice_options(jsonData, choiceGroupId):
     """CREATE DATA FOR CLASS STARTING EQUIPMENT OPTIONS IMPORTER"""
-    data = []
     for item in jsonData:
         # options
-        data.append({
+        yield {
             "choice_group_id": choiceGroupId,
             "option_type": item.get("option_type", "reference"),
             
@@ -522,8 +692,94 @@ def create_date_for_class_starting_equipment_choice_options(jsonData, choiceGrou
             
             "equipment_category_name": item.get("of", {}).get("name", ""),
             "deleted": 0,
-        })
-    return data
+        }
+
+def create_data_for_monster(path):
+    """CREATE DATA FOR MONSTER IMPORTER"""
+    for item in iter_data_file(path, "5e-SRD-Monsters.json"):
+        yield format_monster(item)
+
+
+def format_monster(item):
+    """FORMAT ONE RECORD FOR MONSTER IMPORTER"""
+    speed = item.get("speed", {})
+    senses = item.get("senses", {})
+    return MonsterRow(
+        name=item["name"],
+        description=item.get("desc", None),
+        speed_walk=parse_feet(speed.get("walk", None)),
+        speed_burrow=parse_feet(speed.get("burrow", None)),
+        speed_climb=parse_feet(speed.get("climb", None)),
+        speed_fly=parse_feet(speed.get("fly", None)),
+        speed_swim=parse_feet(speed.get("swim", None)),
+        hit_points=item.get("hit_points", None),
+        hit_dice=item.get("hit_dice", None),
+        hit_points_roll=item.get("hit_points_roll", None),
+        strength=item.get("strength", None),
+        dexterity=item.get("dexterity", None),
+        constitution=item.get("constitution", None),
+        intelligence=item.get("intelligence", None),
+        wisdom=item.get("wisdom", None),
+        charisma=item.get("charisma", None),
+        darkvision=senses.get("darkvision", None),
+        passive_perception=senses.get("passive_perception", None),
+        blindsight=senses.get("blindsight", None),
+        tremorsense=senses.get("tremorsense", None),
+        truesight=senses.get("truesight", None),
+        languages=item.get("languages", None),
+        challenge_rating=item.get("challenge_rating", None),
+        experience_points=item.get("xp", None),
+        proficiency_bonus=item.get("proficiency_bonus", None),
+        image_url=item.get("image", None),
+        deleted=0,
+        # REFERENCE
+        alignment=item.get("alignment", None),
+        size=item.get("size", None),
+        monster_type=item.get("type", None),
+        sub_monster_type=item.get("subtype", None),
+        # CHILDREN
+        armor_classes=list(format_monster_armor_classes(item.get("armor_class", []))),
+        proficiencies=[
+            MonsterProficiencyRow(proficiency=reference_key(p["proficiency"]), value=p["value"])
+            for p in item.get("proficiencies", [])
+        ],
+        damage_data=format_monster_damage_data(item),
+        actions=[
+            MonsterActionRow(action_type=action_type, action_data=json.dumps(action))
+            for key, action_type in MONSTER_ACTION_TYPES
+            for action in item.get(key, [])
+        ],
+    )
+
+
+# Source list -> monster_actions.action_type
+MONSTER_ACTION_TYPES = (
+    ("special_abilities", "special_ability"),
+    ("actions", "action"),
+    ("legendary_actions", "legendary_action"),
+    ("reactions", "reaction"),
+)
+
+
+def format_monster_armor_classes(armor_classes):
+    for armor_class in armor_classes:
+        # Worn armor gets one row per piece, every other kind a single row
+        equipment = [reference_key(armor) for armor in armor_class.get("armor", [])] or [None]
+        for key in equipment:
+            yield MonsterArmorClassRow(type=armor_class["type"], value=armor_class["value"], equipment=key)
+
+
+def format_monster_damage_data(item):
+    damage = {
+        "damage_vulnerabilities": item.get("damage_vulnerabilities", []),
+        "damage_resistances": item.get("damage_resistances", []),
+        "damage_immunities": item.get("damage_immunities", []),
+        "condition_immunities": [c["name"] for c in item.get("condition_immunities", [])],
+    }
+    if not any(damage.values()):
+        return None
+    return MonsterDamageDataRow(**{key: ", ".join(values) or None for key, values in damage.items()})
+
 
 def is_list_type(value):
     """Check if the value is a list type"""
@@ -537,6 +793,14 @@ def parse_int(value):
         return None
 
 
+def parse_feet(value):
+    """Leading number of a distance such as "30 ft.", None when there is none"""
+    if isinstance(value, str):
+        match = re.match(r"\s*(\d+)", value)
+        return int(match.group(1)) if match else None
+    return None
+
+
 def parse_float(value):
     try:
         return float(value)
@@ -544,6 +808,29 @@ def parse_float(value):
         return None
 
 
+# Reference file and per-record formatter of each table, for importers streaming records themselves
+RECORD_SOURCES = {
+    "ability_score": ("5e-SRD-Ability-Scores.json", format_ability_score),
+    "alignment": ("5e-SRD-Alignments.json", format_alignment),
+    "language": ("5e-SRD-Languages.json", format_language),
+    "background": ("5e-SRD-Backgrounds.json", format_background),
+    "condition": ("5e-SRD-Conditions.json", format_condition),
+    "damage_type": ("5e-SRD-Damage-Types.json", format_damage_type),
+    "equipment_category": ("5e-SRD-Equipment-Categories.json", format_equipment_category),
+    "feat": ("5e-SRD-Feats.json", format_feat),
+    "feature": ("5e-SRD-Features.json", format_feature),
+    "level": ("5e-SRD-Levels.json", format_level),
+    "proficiency": ("5e-SRD-Proficiencies.json", format_proficiency),
+    "spell": ("5e-SRD-Spells.json", format_spell),
+    "magic_school": ("5e-SRD-Magic-Schools.json", format_magic_school),
+    "equipment": ("5e-SRD-Equipment.json", format_equipment),
+    "class": ("5e-SRD-Classes.json", format_class),
+    # Subclasses are imported into the class table by the class import
+    "subclass": ("5e-SRD-Subclasses.json", format_subclass),
+    "monster": ("5e-SRD-Monsters.json", format_monster),
+}
+
+
 if __name__ == "__main__":
     path = r"..\Reference Data\2014"
-    create_data_for_equipment(path)
+    list(create_data_for_equipment(path))
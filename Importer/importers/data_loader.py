@@ -1,10 +1,107 @@
-import os 
-import json 
+import os
+import json
+from typing import Any, Iterator
+
+# Files below this size are parsed in one go, larger ones element by element
+STREAM_THRESHOLD = 256 * 1024
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
 
 def load_data_file(path, filename):
-    """Load data file for ability scores"""
+    """Load a whole data file in one json.load, faster than streaming for the small files"""
     file_path = os.path.join(path, filename)
-    data = json.load(open(file_path, 'r', encoding='utf-8'))
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
     return data
 
-    
\ No newline at end of file
+
+def iter_data_file(path, filename, threshold=STREAM_THRESHOLD) -> Iterator[Any]:
+    """Yield the records of a data file, streaming it when it is larger than threshold
+    Every reader of the reference files goes through here: small files are parsed
+    whole (json.load is the fastest path), large ones so only one record is in memory
+    """
+    file_path = os.path.join(path, filename)
+    if os.path.getsize(file_path) < threshold:
+        yield from load_data_file(path, filename)
+    else:
+        yield from iter_json_array(file_path)
+
+
+def iter_json_array(file_path, chunk_size=CHUNK_SIZE) -> Iterator[Any]:
+    """Incrementally parse a top-level JSON array, yielding one element at a time"""
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def read_more():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            # Drop what has already been consumed so the buffer holds about one record
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def next_token():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not read_more():
+                    return None
+
+        def separated(end):
+            """Whether the ',' or ']' after a decoded value is already in the buffer"""
+            while end < len(buffer) and buffer[end] in WHITESPACE:
+                end += 1
+            return end < len(buffer) and buffer[end] in ",]"
+
+        def expect_end():
+            """Only whitespace may follow the closing bracket"""
+            token = next_token()
+            if token is not None:
+                raise ValueError(f"Unexpected data after the array in {file_path}: {token!r}")
+
+        if next_token() != "[":
+            raise ValueError(f"{file_path} does not contain a top-level JSON array")
+        pos += 1
+
+        if next_token() == "]":
+            pos += 1
+            expect_end()
+            return
+        while True:
+            if next_token() is None:
+                raise ValueError(f"Unexpected end of file in {file_path}")
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # A value is only complete once the separator after it is in the buffer:
+                # "12" or "1.5" at the buffer edge may continue as "1234" or "1.5e3"
+                complete = eof or separated(end)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                read_more()
+                continue
+
+            pos = end
+            yield item
+
+            token = next_token()
+            if token == ",":
+                pos += 1
+            elif token == "]":
+                pos += 1
+                expect_end()
+                return
+            else:
+                raise ValueError(f"Expected ',' or ']' in {file_path}, got {token!r}")
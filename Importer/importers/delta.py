@@ -0,0 +1,109 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+MANIFEST_TABLE = "import_manifest"
+
+
+def content_hash(record: Any, version: int = 0) -> str:
+    """Stable SHA-256 of a source record, salted with the formatter version"""
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{version}:{payload}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class DeltaSource:
+    """Source file, per-record formatter and optional FK resolver of a delta-importable table"""
+    filename: str
+    formatter: Callable[[Dict[str, Any]], Dict[str, Any]]
+    # Called with the session key maps, returns a row stage
+    resolver: Optional[Callable] = None
+
+
+@dataclass
+class DeltaPlan:
+    """What a delta import has to do for one table"""
+    table_name: str
+    # Source records whose index is not in the manifest, or whose hash changed
+    new: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    # index -> row key of manifest entries whose record disappeared
+    removed: Dict[str, Any] = field(default_factory=dict)
+    # index -> hash of every current record
+    hashes: Dict[str, str] = field(default_factory=dict)
+    unchanged: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return not self.new and not self.changed and not self.removed
+
+    def __repr__(self):
+        return (f"DeltaPlan({self.table_name}: new={len(self.new)}, changed={len(self.changed)}, "
+                f"removed={len(self.removed)}, unchanged={self.unchanged})")
+
+
+def plan_delta(table_name: str, records: Iterable[Dict[str, Any]], manifest: Dict[str, Tuple[Any, str]], version: int = 0) -> DeltaPlan:
+    """Compare source records with the manifest by SRD index and content hash"""
+    plan = DeltaPlan(table_name)
+    for record in records:
+        index = record["index"]
+        digest = content_hash(record, version)
+        plan.hashes[index] = digest
+        entry = manifest.get(index)
+        if entry is None:
+            plan.new.append(record)
+        elif entry[1] != digest:
+            plan.changed.append(record)
+        else:
+            plan.unchanged += 1
+    plan.removed = {index: row_key for index, (row_key, _) in manifest.items() if index not in plan.hashes}
+    return plan
+
+
+class DeltaManifest:
+    """
+    Content hash per (table, SRD index) of the last imported source records
+    Lives in the import_manifest table so it always matches the database it describes
+    """
+
+    def __init__(self, cursor, backend):
+        self.cursor = cursor
+        self.backend = backend
+
+    def load(self, table_name: str) -> Dict[str, Tuple[Any, str]]:
+        """index -> (row key, content hash) for one table in one round trip"""
+        self.cursor.execute(
+            f"SELECT record_index, row_key, content_hash FROM {self.backend.table(MANIFEST_TABLE)} WHERE table_name = ?",
+            (table_name,),
+        )
+        return {index: (row_key, digest) for index, row_key, digest in self.cursor.fetchall()}
+
+    def save(self, plan: DeltaPlan, row_keys: Dict[str, Any], batch_size: int, logger=None):
+        """Record the hashes of new and changed records and forget removed ones"""
+        rows = [
+            {
+                "table_name": plan.table_name,
+                "record_index": record["index"],
+                "row_key": row_keys.get(record["index"]),
+                "content_hash": plan.hashes[record["index"]],
+            }
+            for record in plan.new + plan.changed
+        ]
+        if rows:
+            self.backend.upsert(self.cursor, MANIFEST_TABLE, rows, ("table_name", "record_index"), batch_size, logger)
+        if plan.removed:
+            self.cursor.executemany(
+                f"DELETE FROM {self.backend.table(MANIFEST_TABLE)} WHERE table_name = ? AND record_index = ?",
+                [(plan.table_name, index) for index in plan.removed],
+            )
+
+    def soft_delete(self, table_name: str, key_column: str, keys: Iterable[Optional[Any]]) -> int:
+        """Flag rows as deleted by natural key"""
+        params = [(key,) for key in keys if key is not None]
+        if params:
+            self.cursor.executemany(
+                f"UPDATE {self.backend.table(table_name)} SET deleted = 1 WHERE {key_column} = ?",
+                params,
+            )
+        return len(params)
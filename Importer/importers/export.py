@@ -0,0 +1,141 @@
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from .checkpoint import CHECKPOINT_TABLE
+from .delta import MANIFEST_TABLE
+from .schema import Column, TableDef
+
+EXPORT_FORMATS = ("bcp", "sql")
+# bcp character mode has no escaping and descriptions contain tabs and newlines,
+# so fields and rows end in a sequence the SRD text never uses
+FIELD_TERMINATOR = "~|~"
+ROW_TERMINATOR = "~|~\r\n"
+# Non-XML format file version understood by SQL Server 2017 and later
+FORMAT_FILE_VERSION = "14.0"
+# Rows per INSERT ... VALUES statement, the T-SQL maximum
+SQL_VALUES_ROWS = 1000
+# Bookkeeping of the importer itself, not part of the dataset
+INTERNAL_TABLES = (CHECKPOINT_TABLE, MANIFEST_TABLE)
+SERVER_DEFAULT = re.compile(r"DEFAULT\s+GETDATE", re.IGNORECASE)
+
+
+def export_columns(table: TableDef) -> List[Column]:
+    """Columns of a bulk-load file in table order: ids included, computed and load-time timestamps left to the server"""
+    return [c for c in table.columns if not c.computed and not SERVER_DEFAULT.search(c.definition)]
+
+
+def bcp_value(value: Any) -> str:
+    """Character-mode field; an empty field loads as NULL under KEEPNULLS"""
+    if value is None:
+        return ""
+    text = repr(value) if isinstance(value, float) else str(value)
+    if FIELD_TERMINATOR in text:
+        raise ValueError(f"Value contains the field terminator {FIELD_TERMINATOR!r}: {text[:50]}")
+    return text
+
+
+def sql_literal(value: Any) -> str:
+    """T-SQL literal of a column value"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, int):
+        return str(value)
+    return "N'" + str(value).replace("'", "''") + "'"
+
+
+def format_file(table: TableDef, columns: Sequence[Column]) -> str:
+    """Non-XML bcp format file mapping each file field to its table column"""
+    ordinals = {column.name: i for i, column in enumerate(table.columns, 1)}
+    lines = [FORMAT_FILE_VERSION, str(len(columns))]
+    for field, column in enumerate(columns, 1):
+        terminator = ROW_TERMINATOR if field == len(columns) else FIELD_TERMINATOR
+        terminator = terminator.replace("\r", "\\r").replace("\n", "\\n")
+        lines.append(f'{field}\tSQLCHAR\t0\t0\t"{terminator}"\t{ordinals[column.name]}\t{column.name}\t""')
+    return "\n".join(lines) + "\n"
+
+
+class BulkExporter:
+    """
+    Writes the tables of a compiled database as bulk-load files for SQL Server
+    Ids are written as compiled and must be loaded with KEEPIDENTITY / IDENTITY_INSERT:
+    they start at each IDENTITY seed but SQLite steps them by 1, not by the IDENTITY
+    increment (level is IDENTITY(70000, 7)), so ids the server generated would
+    break every FK pointing at them
+    """
+
+    def __init__(self, table_defs: Dict[str, TableDef], logger=None):
+        self.table_defs = table_defs
+        self.logger = logger or logging.getLogger(__name__)
+
+    def export(self, conn, output_dir, file_format: str = "bcp") -> Dict[str, int]:
+        """Write every non-empty table. Returns rows written per table"""
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {file_format}, expected one of {', '.join(EXPORT_FORMATS)}")
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        exported = []
+        for name in sorted(self.table_defs):
+            if name in INTERNAL_TABLES:
+                continue
+            table = self.table_defs[name]
+            columns = export_columns(table)
+            order = "id" if "id" in table.column_names else "rowid"
+            rows = conn.execute(f'SELECT {", ".join(c.name for c in columns)} FROM "{name}" ORDER BY {order}').fetchall()
+            if rows:
+                exported.append((table, columns, rows))
+
+        if file_format == "bcp":
+            for table, columns, rows in exported:
+                self.write_bcp(output_dir, table, columns, rows)
+            self.write_load_script(output_dir, [table for table, _, _ in exported])
+        else:
+            self.write_sql_script(output_dir, exported)
+
+        counts = {table.name: len(rows) for table, _, rows in exported}
+        self.logger.info(f"Exported {sum(counts.values())} rows of {len(counts)} tables to {output_dir} ({file_format})")
+        return counts
+
+    def write_bcp(self, output_dir: Path, table: TableDef, columns: Sequence[Column], rows: List[Sequence[Any]]):
+        """Data file and format file of one table"""
+        with open(output_dir / f"{table.name}.dat", "w", encoding="utf-8", newline="") as f:
+            for row in rows:
+                f.write(FIELD_TERMINATOR.join(map(bcp_value, row)) + ROW_TERMINATOR)
+        with open(output_dir / f"{table.name}.fmt", "w", encoding="utf-8") as f:
+            f.write(format_file(table, columns))
+
+    def write_load_script(self, output_dir: Path, tables: Sequence[TableDef]):
+        """sqlcmd script BULK INSERTing every data file"""
+        lines = [
+            "-- Loads the exported reference data into empty tables, keeping the exported ids:",
+            "-- sqlcmd -v ExportDir=\"<directory of this script>\" -i load.sql",
+        ]
+        for table in tables:
+            options = ["FORMATFILE = '$(ExportDir)\\" + table.name + ".fmt'", "CODEPAGE = '65001'", "KEEPNULLS", "TABLOCK"]
+            if table.identity:
+                options.append("KEEPIDENTITY")
+            lines.append(f"BULK INSERT dbo.{table.name} FROM '$(ExportDir)\\{table.name}.dat' WITH ({', '.join(options)});")
+            lines.append("GO")
+        with open(output_dir / "load.sql", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def write_sql_script(self, output_dir: Path, exported: Sequence):
+        """One T-SQL script of batched multi-row INSERTs"""
+        with open(output_dir / "import.sql", "w", encoding="utf-8") as f:
+            f.write("-- Loads the exported reference data into empty tables, keeping the exported ids\n")
+            for table, columns, rows in exported:
+                identity = table.identity and "id" in [c.name for c in columns]
+                if identity:
+                    f.write(f"SET IDENTITY_INSERT dbo.{table.name} ON;\n")
+                for start in range(0, len(rows), SQL_VALUES_ROWS):
+                    values = ",\n".join(
+                        f"({', '.join(map(sql_literal, row))})" for row in rows[start:start + SQL_VALUES_ROWS]
+                    )
+                    f.write(f"INSERT INTO dbo.{table.name} ({', '.join(c.name for c in columns)}) VALUES\n{values};\n")
+                if identity:
+                    f.write(f"SET IDENTITY_INSERT dbo.{table.name} OFF;\n")
+                f.write("GO\n")
@@ -0,0 +1,71 @@
+from typing import Any, Dict, Optional, Tuple
+
+
+class KeyMap:
+    """
+    In-memory natural key -> id map for one table
+    Loaded with a single SELECT and kept current as rows are inserted
+    """
+
+    def __init__(self, table_name: str, key_column: str = "name", case_insensitive: bool = False):
+        self.table_name = table_name
+        self.key_column = key_column
+        self.case_insensitive = case_insensitive
+        self.ids: Dict[Any, Optional[int]] = {}
+
+    def normalize(self, key: Any) -> Any:
+        """Normalize a key for lookups"""
+        if self.case_insensitive and isinstance(key, str):
+            return key.lower()
+        return key
+
+    def load(self, cursor, backend) -> "KeyMap":
+        """Load every key/id pair of the table in one round trip"""
+        pairs = backend.fetch_key_map(cursor, self.table_name, self.key_column)
+        self.ids = {self.normalize(key): id for key, id in pairs}
+        return self
+
+    def get(self, key: Any) -> Optional[int]:
+        """Get the id for a key, None if unknown"""
+        return self.ids.get(self.normalize(key))
+
+    def add(self, key: Any, id: Optional[int] = None):
+        """Record a newly inserted row. id may be None when the insert did not return it"""
+        self.ids[self.normalize(key)] = id
+
+    def __contains__(self, key: Any) -> bool:
+        return self.normalize(key) in self.ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class KeyMaps:
+    """
+    Per-import registry of key maps
+    Each table is loaded on first use and then served from memory
+    """
+
+    def __init__(self, cursor, backend):
+        self.cursor = cursor
+        self.backend = backend
+        self.maps: Dict[Tuple[str, str, bool], KeyMap] = {}
+
+    def get(self, table_name: str, key_column: str = "name", case_insensitive: bool = False) -> KeyMap:
+        """Get the key map of a table, loading it if needed"""
+        cache_key = (table_name, key_column, case_insensitive)
+        key_map = self.maps.get(cache_key)
+        if key_map is None:
+            key_map = KeyMap(table_name, key_column, case_insensitive).load(self.cursor, self.backend)
+            self.maps[cache_key] = key_map
+        return key_map
+
+    def resolve(self, table_name: str, key: Any, key_column: str = "name", case_insensitive: bool = False) -> Optional[int]:
+        """Resolve a natural key to an id"""
+        return self.get(table_name, key_column, case_insensitive).get(key)
+
+    def refresh(self, table_name: str):
+        """Reload every cached map of a table, e.g. after a bulk insert without returned ids"""
+        for (cached_table, _, _), key_map in self.maps.items():
+            if cached_table == table_name:
+                key_map.load(self.cursor, self.backend)
@@ -0,0 +1,251 @@
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# "prepare" is worker time of a parallel load+format, spent before the import starts
+PHASES = ("prepare", "load", "format", "resolve", "write", "commit")
+# Counters without an active phase (e.g. a query outside any timed block) are booked here
+UNATTRIBUTED = "_session"
+
+_NULL_PHASE = nullcontext()
+
+# hook(table, metric, value): metric is "<phase>_seconds" for timings, the counter name otherwise
+MetricHook = Callable[[str, str, float], None]
+
+
+class _Frame:
+    __slots__ = ("table", "phase", "start")
+
+    def __init__(self, table: str, phase: str, start: float):
+        self.table = table
+        self.phase = phase
+        self.start = start
+
+
+class ImportMetrics:
+    """
+    Per-table phase timers and counters of an import run
+    Phase time is exclusive: rows streamed lazily through a write are booked to
+    load/format/resolve, not to the write that pulled them. Disabled metrics
+    hand back their inputs untouched, so the import pays nothing for them
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.timings: Dict[Tuple[str, str], float] = {}
+        self.counters: Dict[Tuple[str, str], int] = {}
+        self.hooks: List[MetricHook] = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def add_hook(self, hook: MetricHook):
+        """Register a callback receiving every timing sample and counter increment"""
+        self.hooks.append(hook)
+
+    def stack(self) -> List[_Frame]:
+        """Active phases of the calling thread, innermost last"""
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def current_table(self) -> str:
+        """Table of the innermost active phase"""
+        stack = self.stack()
+        return stack[-1].table if stack else UNATTRIBUTED
+
+    def record_time(self, table: str, phase: str, seconds: float):
+        """Add seconds to a table phase"""
+        with self.lock:
+            key = (table, phase)
+            self.timings[key] = self.timings.get(key, 0.0) + seconds
+        for hook in self.hooks:
+            hook(table, f"{phase}_seconds", seconds)
+
+    def count(self, table: str, counter: str, n: int = 1):
+        """Increment a per-table counter"""
+        if not self.enabled or not n:
+            return
+        with self.lock:
+            key = (table, counter)
+            self.counters[key] = self.counters.get(key, 0) + n
+        for hook in self.hooks:
+            hook(table, counter, n)
+
+    def enter(self, table: str, phase: str):
+        """Start a phase, pausing the enclosing one"""
+        now = time.perf_counter()
+        stack = self.stack()
+        if stack:
+            outer = stack[-1]
+            self.record_time(outer.table, outer.phase, now - outer.start)
+        stack.append(_Frame(table, phase, now))
+
+    def exit(self):
+        """End the innermost phase and resume the enclosing one"""
+        now = time.perf_counter()
+        stack = self.stack()
+        frame = stack.pop()
+        self.record_time(frame.table, frame.phase, now - frame.start)
+        if stack:
+            stack[-1].start = now
+
+    @contextmanager
+    def _phase(self, table: str, phase: str):
+        self.enter(table, phase)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def phase(self, table: str, phase: str):
+        """Context manager timing a block as one phase of a table"""
+        if not self.enabled:
+            return _NULL_PHASE
+        return self._phase(table, phase)
+
+    def timed(self, table: str, phase: str, rows: Iterable[Any], counter: Optional[str] = None) -> Iterable[Any]:
+        """Time the production of each row of a lazy stream, optionally counting the rows"""
+        if not self.enabled:
+            return rows
+        return self._timed(table, phase, rows, counter)
+
+    def _timed(self, table: str, phase: str, rows: Iterable[Any], counter: Optional[str]) -> Iterator[Any]:
+        iterator = iter(rows)
+        produced = 0
+        try:
+            while True:
+                self.enter(table, phase)
+                try:
+                    row = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.exit()
+                produced += 1
+                yield row
+        finally:
+            if counter:
+                self.count(table, counter, produced)
+
+    def stage(self, table: str, phase: str, func: Callable) -> Callable:
+        """Wrap a per-row pipeline stage so its calls are timed as a phase"""
+        if not self.enabled:
+            return func
+
+        def timed_stage(row):
+            self.enter(table, phase)
+            try:
+                return func(row)
+            finally:
+                self.exit()
+        return timed_stage
+
+    def instrument_cursor(self, cursor):
+        """Cursor proxy counting queries against the active table"""
+        if not self.enabled:
+            return cursor
+        return CountingCursor(cursor, lambda: self.count(self.current_table(), "queries"))
+
+    def tables(self) -> List[str]:
+        """Every table with a timing or counter"""
+        return sorted({table for table, _ in self.timings} | {table for table, _ in self.counters})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Timings and counters per table, plus totals"""
+        tables: Dict[str, Dict[str, Any]] = {}
+        for table in self.tables():
+            tables[table] = {
+                "seconds": {phase: round(seconds, 6) for (t, phase), seconds in sorted(self.timings.items()) if t == table},
+                "counters": {name: value for (t, name), value in sorted(self.counters.items()) if t == table},
+            }
+        totals: Dict[str, Any] = {"seconds": {}, "counters": {}}
+        for (_, phase), seconds in self.timings.items():
+            totals["seconds"][phase] = round(totals["seconds"].get(phase, 0.0) + seconds, 6)
+        for (_, name), value in self.counters.items():
+            totals["counters"][name] = totals["counters"].get(name, 0) + value
+        return {"tables": tables, "totals": totals}
+
+    def to_json(self) -> str:
+        """Metrics as a JSON document"""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix: str = "dnd_import") -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_phase_seconds Exclusive time spent per table and phase",
+            f"# TYPE {prefix}_phase_seconds counter",
+        ]
+        for (table, phase), seconds in sorted(self.timings.items()):
+            lines.append(f'{prefix}_phase_seconds{{table="{table}",phase="{phase}"}} {seconds:.6f}')
+        names = sorted({name for _, name in self.counters})
+        for name in names:
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for (table, counter), value in sorted(self.counters.items()):
+                if counter == name:
+                    lines.append(f'{prefix}_{name}_total{{table="{table}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """Write the metrics to a file, Prometheus text for .prom/.txt, JSON otherwise"""
+        text = self.to_prometheus() if str(path).endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+class CountingCursor:
+    """Cursor proxy calling on_call before every execute/executemany, i.e. every round trip"""
+
+    def __init__(self, cursor, on_call: Callable[[], None]):
+        self._cursor = cursor
+        self._on_call = on_call
+
+    def execute(self, *args):
+        self._on_call()
+        self._cursor.execute(*args)
+        return self
+
+    def executemany(self, *args):
+        self._on_call()
+        self._cursor.executemany(*args)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        if name in ("_cursor", "_on_call"):
+            object.__setattr__(self, name, value)
+        else:
+            # e.g. fast_executemany has to reach the real pyodbc cursor
+            setattr(self._cursor, name, value)
+
+
+class CountingConnection:
+    """Connection proxy handing out counting cursors and counting commits as well"""
+
+    def __init__(self, conn, on_call: Callable[[], None]):
+        self._conn = conn
+        self._on_call = on_call
+
+    def cursor(self):
+        return CountingCursor(self._conn.cursor(), self._on_call)
+
+    def commit(self):
+        self._on_call()
+        self._conn.commit()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        if name in ("_conn", "_on_call"):
+            object.__setattr__(self, name, value)
+        else:
+            # e.g. autocommit has to reach the real connection
+            setattr(self._conn, name, value)
@@ -0,0 +1,25 @@
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(rows: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group a lazy row stream into lists of at most size rows"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_rows(rows: Iterable[T], *stages: Callable[[T], Optional[T]]) -> Iterator[T]:
+    """Apply per-row stages lazily. A stage returning None drops the row"""
+    for row in rows:
+        for stage in stages:
+            row = stage(row)
+            if row is None:
+                break
+        else:
+            yield row
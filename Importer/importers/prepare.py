@@ -0,0 +1,66 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .data_formatter import RECORD_SOURCES
+from .data_loader import iter_data_file
+
+
+def prepare_table(reference_data_path: str, table_name: str) -> Tuple[str, List[Any], float]:
+    """Load and format one table's reference file; runs in a worker process"""
+    start = time.perf_counter()
+    filename, formatter = RECORD_SOURCES[table_name]
+    rows = [formatter(record) for record in iter_data_file(reference_data_path, filename)]
+    return table_name, rows, time.perf_counter() - start
+
+
+def largest_first(reference_data_path: str, tables: Iterable[str]) -> List[str]:
+    """Tables ordered by the size of their reference file, biggest first"""
+    return sorted(
+        tables,
+        key=lambda table: os.path.getsize(os.path.join(reference_data_path, RECORD_SOURCES[table][0])),
+        reverse=True,
+    )
+
+
+class PreparedSources:
+    """
+    Formatted rows of several reference files, prepared across a process pool
+    Files are submitted largest first so the longest parse starts at once and
+    the small ones fill the remaining workers; wall time approaches the slowest file
+    """
+
+    def __init__(self, reference_data_path, max_workers: Optional[int] = None, logger=None):
+        self.reference_data_path = str(reference_data_path)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = logger or logging.getLogger(__name__)
+        self.rows: Dict[str, List[Any]] = {}
+        self.seconds: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+
+    def prepare(self, tables: Iterable[str]) -> "PreparedSources":
+        """Format every table with a reference file; a failing file is left to the importer"""
+        tables = largest_first(self.reference_data_path, [t for t in tables if t in RECORD_SOURCES])
+        if not tables:
+            return self
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tables))) as executor:
+            futures = {executor.submit(prepare_table, self.reference_data_path, table): table for table in tables}
+            for future in as_completed(futures):
+                table = futures[future]
+                try:
+                    _, rows, seconds = future.result()
+                except Exception as e:
+                    self.failed[table] = f"{type(e).__name__}: {e}"
+                    self.logger.error(f"Error preparing {table}: {self.failed[table]}")
+                    continue
+                self.rows[table] = rows
+                self.seconds[table] = seconds
+        self.logger.info(f"Prepared {len(self.rows)} tables in {time.perf_counter() - start:.2f}s on {self.max_workers} workers")
+        return self
+
+    def take(self, table_name: str) -> Optional[List[Any]]:
+        """Hand a table's rows over once, releasing them from the cache"""
+        return self.rows.pop(table_name, None)
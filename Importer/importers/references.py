@@ -0,0 +1,135 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# (resource_type, SRD index), e.g. ("spells", "fireball")
+ReferenceKey = Tuple[str, str]
+# Scalar values a record keeps in the index; lists and nested objects stay in the formatted rows
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# SRD resource type -> table its records are imported into
+RESOURCE_TABLES = {
+    "ability-scores": "ability_score",
+    "alignments": "alignment",
+    "backgrounds": "background",
+    "classes": "class",
+    "subclasses": "class",
+    "conditions": "condition",
+    "damage-types": "damage_type",
+    "equipment": "equipment",
+    "equipment-categories": "equipment_category",
+    "feats": "feat",
+    "features": "feature",
+    "languages": "language",
+    "magic-items": "magic_item",
+    "magic-schools": "magic_school",
+    "monsters": "monster",
+    "proficiencies": "proficiency",
+    "races": "race",
+    "rule-sections": "rule_section",
+    "rules": "rule",
+    "skills": "skill",
+    "spells": "spell",
+    "traits": "trait",
+    "weapon-properties": "weapon_property",
+}
+
+
+def resource_file(resource_type: str) -> str:
+    """Reference file holding the records of a resource type, e.g. magic-schools -> 5e-SRD-Magic-Schools.json"""
+    return f"5e-SRD-{'-'.join(word.capitalize() for word in resource_type.split('-'))}.json"
+
+
+def reference_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """The scalar fields of a record (index, name, url, hit_die, ...) that references resolve on"""
+    return {key: value for key, value in record.items() if isinstance(value, SCALAR_TYPES)}
+
+
+def url_key(url: str) -> ReferenceKey:
+    """(resource_type, index) of an SRD API url such as /api/2014/spells/fireball"""
+    parts = url.rstrip("/").split("/")
+    return parts[-2], parts[-1]
+
+
+def reference_key(ref: Optional[Dict[str, Any]]) -> Optional[ReferenceKey]:
+    """Key of an {index, name, url} reference, None for a missing one"""
+    if not ref:
+        return None
+    # Nested urls (/classes/wizard/levels/3) end in a path segment, not the index
+    return url_key(ref["url"])[0], ref["index"]
+
+
+class ReferenceIndex:
+    """
+    SRD records keyed on (resource_type, index), loaded one resource type at a time
+    A type's records are read the first time a lookup needs them, so a run only
+    parses the reference files it references; ids are bound per table once its rows
+    are written, so references resolve with dict lookups instead of name queries
+    """
+
+    def __init__(self, loader: Optional[Callable[[str], Iterable[Dict[str, Any]]]] = None):
+        # resource_type -> its records, None for an index filled through add_all only
+        self.loader = loader
+        self.records: Dict[ReferenceKey, Dict[str, Any]] = {}
+        self.by_type: Dict[str, List[ReferenceKey]] = {}
+        self.loaded: Set[str] = set()
+        self.ids: Dict[ReferenceKey, Optional[int]] = {}
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+
+    def ensure(self, resource_type: str):
+        """Load the records of a resource type unless they already are"""
+        if resource_type in self.loaded or self.loader is None:
+            return
+        with self.load_lock:
+            if resource_type not in self.loaded:
+                self.add_all(self.loader(resource_type))
+                self.loaded.add(resource_type)
+
+    def add_all(self, records: Iterable[Dict[str, Any]]):
+        """Index records by the resource type and index of their own url"""
+        for record in records:
+            key = (url_key(record["url"])[0], record["index"])
+            if key not in self.records:
+                self.by_type.setdefault(key[0], []).append(key)
+            self.records[key] = reference_fields(record)
+
+    def record(self, key: Optional[ReferenceKey]) -> Optional[Dict[str, Any]]:
+        """Scalar fields of a referenced record, None if unknown"""
+        if not key:
+            return None
+        self.ensure(key[0])
+        return self.records.get(key)
+
+    def keys(self, resource_type: str) -> List[ReferenceKey]:
+        """Keys of every record of a resource type"""
+        self.ensure(resource_type)
+        return self.by_type.get(resource_type, [])
+
+    def bind(self, key: ReferenceKey, id: Optional[int]):
+        """Record the DB id of a referenced record"""
+        with self.lock:
+            self.ids[key] = id
+
+    def bind_names(self, resource_type: str, key_map) -> int:
+        """Bind every record of a type through the name -> id key map of its table. Returns ids found"""
+        ids = {key: key_map.get(self.records[key].get("name")) for key in self.keys(resource_type)}
+        with self.lock:
+            self.ids.update(ids)
+        return sum(1 for id in ids.values() if id is not None)
+
+    def id(self, key: Optional[ReferenceKey]) -> Optional[int]:
+        """DB id of a reference, None while unknown or unwritten"""
+        return self.ids.get(key) if key else None
+
+    def indexes_by_table(self) -> Dict[str, Dict[int, str]]:
+        """table -> DB id -> SRD index of every bound record, the first key winning where two share a row"""
+        indexes: Dict[str, Dict[int, str]] = {}
+        with self.lock:
+            for key in sorted(self.ids):
+                id = self.ids[key]
+                if id is not None and key[0] in RESOURCE_TABLES:
+                    indexes.setdefault(RESOURCE_TABLES[key[0]], {}).setdefault(id, key[1])
+        return indexes
+
+    def __len__(self) -> int:
+        return len(self.records)
@@ -0,0 +1,24 @@
+import json
+import threading
+from typing import Any, Dict
+
+
+class RejectLog:
+    """
+    JSON-lines file of the rows a write had to drop, one object per row:
+    {"table": ..., "error": ..., "row": {...}}
+    Shared by every import of a run, so appends are serialized
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def write(self, table_name: str, row: Dict[str, Any], error: Exception):
+        """Append one rejected row with the error that rejected it"""
+        line = json.dumps({"table": table_name, "error": f"{type(error).__name__}: {error}", "row": row}, default=str)
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.count += 1
@@ -0,0 +1,94 @@
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, Sequence, Tuple
+
+
+class Record:
+    """
+    Compact formatted row: one __slots__ attribute per field, no per-row dict
+    `columns` are the table columns in statement order, `references` hold the
+    names an importer resolves to ids before writing and `children` the rows of
+    dependent tables; neither is ever written.
+    The small mapping API keeps dict-based consumers such as the upserter working
+    """
+
+    __slots__ = ()
+    table_name: str = ""
+    columns: Tuple[str, ...] = ()
+    references: Tuple[str, ...] = ()
+    children: Tuple[str, ...] = ()
+    fields: Tuple[str, ...] = ()
+    # record -> tuple of column values, in `columns` order
+    params: Callable[["Record"], Tuple[Any, ...]]
+
+    def __init__(self, **values):
+        for field in self.fields:
+            setattr(self, field, values.pop(field, None))
+        if values:
+            raise TypeError(f"{type(self).__name__} has no field(s) {', '.join(values)}")
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __contains__(self, key) -> bool:
+        return key in self.columns
+
+    def __getitem__(self, key: str):
+        if key not in self.fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in self.fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self.fields else default
+
+    def copy(self) -> "Record":
+        clone = object.__new__(type(self))
+        for field in self.fields:
+            setattr(clone, field, getattr(self, field))
+        return clone
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Column values as a plain dict"""
+        return dict(zip(self.columns, self.params(self)))
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.fields)
+
+    # Equal by value but mutable (importers set ids in place), so unhashable like a dict
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in self.fields)})"
+
+
+def record_type(name: str, table_name: str, columns: Sequence[str], references: Sequence[str] = (), children: Sequence[str] = (), *, module: str) -> type:
+    """Create the Record class of a table, shared by all of its rows. module is the one defining it, for pickling"""
+    columns = tuple(columns)
+    references = tuple(references)
+    children = tuple(children)
+    getter = attrgetter(*columns)
+    params = getter if len(columns) > 1 else (lambda record: (getter(record),))
+    cls = type(name, (Record,), {
+        "__slots__": columns + references + children,
+        "table_name": table_name,
+        "columns": columns,
+        "references": references,
+        "children": children,
+        "fields": columns + references + children,
+        "params": staticmethod(params),
+        # Pickle finds the class as <module>.<name>
+        "__module__": module,
+    })
+    return cls
@@ -0,0 +1,145 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class ImportTask:
+    """A table import and the imports whose rows it references"""
+    name: str
+    run: Callable[..., None]
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class ScheduleResult:
+    """Outcome of a scheduled run"""
+    durations: Dict[str, float] = field(default_factory=dict)
+    failed: Dict[str, str] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.skipped
+
+
+class ImportScheduler:
+    """
+    Runs imports as a dependency DAG on a thread pool
+    A task starts as soon as everything it depends on has finished, each
+    worker runs its task on its own session (and therefore connection)
+    """
+
+    def __init__(self, tasks: List[ImportTask], session_factory: Callable, max_workers: int = 4, logger=None):
+        self.tasks = {task.name: task for task in tasks}
+        self.session_factory = session_factory
+        self.max_workers = max(1, max_workers)
+        self.logger = logger or logging.getLogger(__name__)
+        self.order = self.topological_order()
+
+    def topological_order(self) -> List[str]:
+        """Validate the graph and return the task names in dependency order"""
+        for task in self.tasks.values():
+            for dep in task.depends_on:
+                if dep not in self.tasks:
+                    raise ValueError(f"Import {task.name} depends on unknown import {dep}")
+
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Import dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = 1
+            for dep in self.tasks[name].depends_on:
+                visit(dep, path + [name])
+            state[name] = 2
+            order.append(name)
+
+        for name in self.tasks:
+            visit(name, [])
+        return order
+
+    def run_task(self, task: ImportTask) -> float:
+        """Run one task on its own session and return its duration"""
+        start = time.perf_counter()
+        with self.session_factory() as session:
+            task.run(session)
+        return time.perf_counter() - start
+
+    def run(self) -> ScheduleResult:
+        """Run every task, independent ones concurrently"""
+        result = ScheduleResult()
+        waiting = {name: set(task.depends_on) for name, task in self.tasks.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.tasks}
+        for name, task in self.tasks.items():
+            for dep in task.depends_on:
+                dependents[dep].append(name)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="import") as executor:
+            running = {}
+
+            def submit_ready():
+                for name in [n for n in self.order if n in waiting and not waiting[n]]:
+                    del waiting[name]
+                    self.logger.info(f"Scheduling {name} import")
+                    running[executor.submit(self.run_task, self.tasks[name])] = name
+
+            def skip_dependents(name: str):
+                for child in dependents[name]:
+                    if child in waiting:
+                        del waiting[child]
+                        result.skipped.append(child)
+                        self.logger.error(f"Skipping {child} import: dependency {name} did not complete")
+                        skip_dependents(child)
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result.durations[name] = future.result()
+                    except Exception as e:
+                        result.failed[name] = str(e)
+                        self.logger.error(f"Import {name} failed: {str(e)}")
+                        skip_dependents(name)
+                        continue
+                    for child in dependents[name]:
+                        if child in waiting:
+                            waiting[child].discard(name)
+                submit_ready()
+
+        result.wall_seconds = time.perf_counter() - start
+        result.critical_path, result.critical_path_seconds = self.critical_path(result.durations)
+        return result
+
+    def critical_path(self, durations: Dict[str, float]) -> Tuple[List[str], float]:
+        """Longest chain of measured durations through the DAG"""
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in self.order:
+            if name not in durations:
+                continue
+            deps = [dep for dep in self.tasks[name].depends_on if dep in finish]
+            slowest = max(deps, key=lambda dep: finish[dep], default=None)
+            previous[name] = slowest
+            finish[name] = durations[name] + (finish[slowest] if slowest else 0.0)
+
+        if not finish:
+            return [], 0.0
+        name: Optional[str] = max(finish, key=lambda n: finish[n])
+        total = finish[name]
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return list(reversed(path)), total
@@ -0,0 +1,168 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+TABLES_PATH = Path(__file__).resolve().parents[2] / "Tables"
+
+CREATE_TABLE = re.compile(r"CREATE\s+TABLE\s+(?:dbo\.)?(\w+)\s*\(", re.IGNORECASE)
+IDENTITY = re.compile(r"IDENTITY\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)", re.IGNORECASE)
+INLINE_INDEX = re.compile(r"INDEX\s+(\w+)\s*\(([^)]*)\)", re.IGNORECASE)
+TABLE_CONSTRAINT = re.compile(r"(UNIQUE|PRIMARY\s+KEY|CONSTRAINT|FOREIGN\s+KEY|CHECK)\b", re.IGNORECASE)
+
+
+class Column:
+    """One column of a table definition"""
+
+    def __init__(self, name: str, sql_type: str, definition: str, computed: bool = False):
+        self.name = name
+        self.sql_type = sql_type
+        self.definition = definition
+        self.computed = computed
+
+    @property
+    def nullable(self) -> bool:
+        return "NOT NULL" not in self.definition.upper()
+
+    def __repr__(self):
+        return f"Column({self.name!r}, {self.sql_type!r})"
+
+
+class TableDef:
+    """A table parsed from Tables/*.sql"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.columns: List[Column] = []
+        self.identity: Optional[Tuple[int, int]] = None  # (seed, increment)
+        self.indexes: List[Tuple[str, List[str]]] = []
+        self.constraints: List[str] = []
+
+    @property
+    def column_names(self) -> List[str]:
+        return [c.name for c in self.columns]
+
+    @property
+    def insert_columns(self) -> List[str]:
+        """Columns a client supplies on INSERT: no identity, no computed columns"""
+        return [c.name for c in self.columns if not c.computed and not (self.identity and c.name == "id")]
+
+    def __repr__(self):
+        return f"TableDef({self.name!r}, {len(self.columns)} columns)"
+
+
+def strip_comments(sql: str) -> str:
+    """Remove -- line comments"""
+    return re.sub(r"--[^\n]*", "", sql)
+
+
+def split_top_level(body: str) -> List[str]:
+    """Split a CREATE TABLE body on commas that are not inside parentheses"""
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [" ".join(p.split()) for p in parts if p.strip()]
+
+
+def table_body(sql: str, start: int) -> Tuple[str, int]:
+    """Return the text between the parenthesis opened at start and its match"""
+    depth = 0
+    for i in range(start, len(sql)):
+        if sql[i] == "(":
+            depth += 1
+        elif sql[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return sql[start + 1:i], i
+    raise ValueError("Unbalanced parentheses in CREATE TABLE")
+
+
+def parse_tables(sql: str) -> List[TableDef]:
+    """Parse every CREATE TABLE statement in a T-SQL script"""
+    sql = strip_comments(sql)
+    tables = []
+    for match in CREATE_TABLE.finditer(sql):
+        body, _ = table_body(sql, match.end() - 1)
+        table = TableDef(match.group(1))
+        for part in split_top_level(body):
+            index = INLINE_INDEX.fullmatch(part)
+            if index:
+                table.indexes.append((index.group(1), [c.strip() for c in index.group(2).split(",")]))
+                continue
+            if TABLE_CONSTRAINT.match(part):
+                table.constraints.append(part)
+                continue
+
+            tokens = part.split(None, 2)
+            name = tokens[0]
+            if len(tokens) > 1 and tokens[1].upper() == "AS":
+                table.columns.append(Column(name, "", part, computed=True))
+                continue
+
+            identity = IDENTITY.search(part)
+            if identity:
+                table.identity = (int(identity.group(1)), int(identity.group(2)))
+            sql_type = re.match(r"\w+(\s*\([^)]*\))?", tokens[1]).group(0) if len(tokens) > 1 else ""
+            table.columns.append(Column(name, sql_type.replace(" ", ""), part))
+        tables.append(table)
+    return tables
+
+
+def load_table_defs(tables_path: Path = TABLES_PATH) -> Dict[str, TableDef]:
+    """Parse every Tables/*.sql file, keyed by table name"""
+    tables: Dict[str, TableDef] = {}
+    for path in sorted(Path(tables_path).glob("*.sql")):
+        for table in parse_tables(path.read_text(encoding="utf-8")):
+            tables.setdefault(table.name, table)
+    return tables
+
+
+def sqlite_type(sql_type: str) -> str:
+    """Map a T-SQL column type to its SQLite affinity"""
+    base = sql_type.split("(")[0].upper()
+    if base in ("INT", "INTEGER", "BIGINT", "SMALLINT", "TINYINT", "BIT"):
+        return "INTEGER"
+    if base in ("DECIMAL", "NUMERIC", "FLOAT", "REAL", "MONEY"):
+        return "REAL"
+    return "TEXT"
+
+
+def sqlite_ddl(table: TableDef) -> List[str]:
+    """SQLite CREATE TABLE/INDEX statements for a parsed table"""
+    columns = []
+    for column in table.columns:
+        if column.computed:
+            # Derived T-SQL expressions are not portable; readers compute them instead
+            continue
+        if table.identity and column.name == "id":
+            columns.append("id INTEGER PRIMARY KEY AUTOINCREMENT")
+            continue
+        definition = f"{column.name} {sqlite_type(column.sql_type)}"
+        upper = column.definition.upper()
+        if "PRIMARY KEY" in upper:
+            definition += " PRIMARY KEY"
+        if "NOT NULL" in upper:
+            definition += " NOT NULL"
+        default = re.search(r"DEFAULT\s+(\(?'[^']*'\)?|\(?-?[\d.]+\)?|GETDATE\s*\(\s*\))", column.definition, re.IGNORECASE)
+        if default:
+            value = default.group(1)
+            definition += " DEFAULT CURRENT_TIMESTAMP" if value.upper().startswith("GETDATE") else f" DEFAULT {value}"
+        columns.append(definition)
+    for constraint in table.constraints:
+        if constraint.upper().startswith("UNIQUE"):
+            columns.append(constraint)
+
+    statements = [f'CREATE TABLE IF NOT EXISTS "{table.name}" ({", ".join(columns)})']
+    for index_name, index_columns in table.indexes:
+        statements.append(
+            f'CREATE INDEX IF NOT EXISTS "{table.name}_{index_name}" ON "{table.name}" ({", ".join(index_columns)})'
+        )
+    return statements
@@ -0,0 +1,110 @@
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+from .key_map import KeyMaps
+from .metrics import ImportMetrics
+
+DEFAULT_POOL_SIZE = 4
+
+
+class ConnectionPool:
+    """
+    Small pool of reusable database connections
+    Connections are opened lazily up to max_size and handed back on release
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = DEFAULT_POOL_SIZE):
+        self.connect = connect
+        self.max_size = max(1, max_size)
+        self.idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self.opened: List[Any] = []
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Get an idle connection, opening a new one while under max_size"""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            if len(self.opened) < self.max_size:
+                conn = self.connect()
+                self.opened.append(conn)
+                return conn
+
+        # Pool exhausted: wait for another worker to release one
+        return self.idle.get(timeout=timeout)
+
+    def release(self, conn):
+        """Return a connection to the pool"""
+        self.idle.put(conn)
+
+    def discard(self, conn):
+        """Drop a broken connection so a fresh one can be opened"""
+        with self.lock:
+            if conn in self.opened:
+                self.opened.remove(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Close every connection opened by the pool"""
+        with self.lock:
+            for conn in self.opened:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self.opened = []
+            self.idle = queue.LifoQueue()
+
+
+class ImportSession:
+    """
+    Connection, cursor and key maps shared by a parent import and its child imports
+    Commits on a clean exit, rolls back on error and returns the connection to the pool
+    """
+
+    def __init__(self, pool: ConnectionPool, backend, metrics: Optional[ImportMetrics] = None):
+        self.pool = pool
+        self.backend = backend
+        self.conn = pool.acquire()
+        # Counts queries per table when metrics are enabled, the plain cursor otherwise
+        self.cursor = (metrics or ImportMetrics(enabled=False)).instrument_cursor(self.conn.cursor())
+        self.key_maps = KeyMaps(self.cursor, backend)
+
+    def commit(self):
+        """Commit the current transaction"""
+        self.conn.commit()
+
+    def rollback(self):
+        """Roll back the current transaction"""
+        self.conn.rollback()
+
+    def close(self):
+        """Release the connection back to the pool"""
+        if self.conn is None:
+            return
+        try:
+            self.cursor.close()
+        except Exception:
+            pass
+        self.pool.release(self.conn)
+        self.conn = None
+
+    def __enter__(self) -> "ImportSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self.close()
+        return False
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .data_formatter import FORMATTER_VERSION
+
+# Bump when the snapshot file layout changes
+SNAPSHOT_VERSION = 2
+
+
+def file_digest(file_path: Path) -> str:
+    """SHA-256 of a file's bytes, read without decoding the JSON"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """
+    On-disk pickle of the formatted rows of each reference file
+    A snapshot is only used while the source size, mtime and content hash and the
+    formatter version all match, so warm runs skip JSON decoding and formatting
+    """
+
+    def __init__(self, cache_dir, logger=None):
+        self.cache_dir = Path(cache_dir)
+        self.logger = logger or logging.getLogger(__name__)
+
+    def path(self, table_name: str) -> Path:
+        """Snapshot file of a table"""
+        return self.cache_dir / f"{table_name}.pickle"
+
+    def key(self, file_path: Path, formatter: Callable) -> Tuple[Any, ...]:
+        """Everything a snapshot depends on"""
+        stat = os.stat(file_path)
+        return (
+            SNAPSHOT_VERSION,
+            FORMATTER_VERSION,
+            f"{formatter.__module__}.{formatter.__qualname__}",
+            file_path.name,
+            stat.st_size,
+            stat.st_mtime_ns,
+            file_digest(file_path),
+        )
+
+    def load(self, table_name: str, key: Tuple[Any, ...]) -> Optional[List[Dict[str, Any]]]:
+        """Rows of a snapshot whose key matches, None on a miss"""
+        path = self.path(table_name)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                # The key is pickled first so a stale snapshot is rejected without reading its rows
+                if pickle.load(f) != key:
+                    return None
+                rows = []
+                while True:
+                    try:
+                        rows.append(pickle.load(f))
+                    except EOFError:
+                        return rows
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable snapshot {path}: {str(e)}")
+            return None
+
+    def save(self, table_name: str, key: Tuple[Any, ...], rows: Iterable[Dict[str, Any]]):
+        """Atomically replace a table's snapshot"""
+        for _ in self.write_through(table_name, key, rows):
+            pass
+
+    def lookup(self, table_name: str, file_path, formatter: Callable) -> Tuple[Tuple[Any, ...], Optional[List[Dict[str, Any]]]]:
+        """(key, rows) for a reference file, rows None when there is no valid snapshot"""
+        key = self.key(Path(file_path), formatter)
+        return key, self.load(table_name, key)
+
+    def write_through(self, table_name: str, key: Tuple[Any, ...], rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Pass rows through, pickling each one as it goes by
+        The snapshot replaces the previous one once the stream has been fully
+        consumed; a stream abandoned halfway leaves the previous one in place
+        """
+        path = self.path(table_name)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        f = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            f = open(tmp_path, "wb")
+            pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self.discard(table_name, f, tmp_path, e)
+            f = None
+
+        complete = False
+        try:
+            for row in rows:
+                if f is not None:
+                    try:
+                        # Dumped before the importer resolves references on the row in place
+                        pickle.dump(row, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    except Exception as e:
+                        self.discard(table_name, f, tmp_path, e)
+                        f = None
+                yield row
+            complete = True
+        finally:
+            if f is not None and complete:
+                try:
+                    f.close()
+                    os.replace(tmp_path, path)
+                except Exception as e:
+                    self.discard(table_name, f, tmp_path, e)
+            elif f is not None:
+                self.discard(table_name, f, tmp_path)
+
+    def discard(self, table_name: str, f, tmp_path: Path, error: Optional[Exception] = None):
+        """Drop a snapshot being written, warning about the error that stopped it"""
+        if error is not None:
+            self.logger.warning(f"Could not write snapshot {self.path(table_name)}: {str(error)}")
+        if f is not None:
+            f.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    def clear(self):
+        """Delete every snapshot"""
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.pickle"):
+                path.unlink()
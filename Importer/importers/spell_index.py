@@ -0,0 +1,204 @@
+import bisect
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .data_formatter import create_data_for_spells
+
+
+@dataclass(frozen=True)
+class Range:
+    """Inclusive bounds of a numeric filter, either end open when None"""
+    low: Optional[int] = None
+    high: Optional[int] = None
+
+
+@dataclass
+class SpellPage:
+    """One page of query results and the number of spells matching in total"""
+    spells: List[Any] = field(default_factory=list)
+    total: int = 0
+    offset: int = 0
+
+
+def srd_index(key) -> Optional[str]:
+    """SRD index of a (resource_type, index) reference key"""
+    return key[1] if key else None
+
+
+def components(spell) -> List[str]:
+    """"V, S, M" -> ["v", "s", "m"]"""
+    return [c.strip().lower() for c in (spell.components or "").split(",") if c.strip()]
+
+
+# attribute -> values of a spell, indexed as one bitmap per value; a spell matches any of its values
+CATEGORICAL: Dict[str, Callable[[Any], Iterable[Any]]] = {
+    "school": lambda spell: [srd_index(spell.magic_school)],
+    "ritual": lambda spell: [spell.ritual],
+    "concentration": lambda spell: [spell.concentration],
+    "components": components,
+    "casting_time": lambda spell: [spell.casting_time],
+    "attack_type": lambda spell: [spell.attack_type],
+    "area_of_effect": lambda spell: [spell.area_of_effect],
+    "damage_type": lambda spell: [srd_index(spell.damage_type)],
+    "dc_ability": lambda spell: [srd_index(spell.dc_ability)],
+    "class": lambda spell: [srd_index(key) for key in spell.classes or ()],
+    "subclass": lambda spell: [srd_index(key) for key in spell.subclasses or ()],
+}
+# attribute -> numeric value of a spell, indexed as a sorted array for Range filters
+NUMERIC: Dict[str, Callable[[Any], Optional[int]]] = {
+    "level": lambda spell: spell.level,
+    "area_of_effect_size": lambda spell: spell.area_of_effect_size,
+}
+# Single-valued attributes results can be ordered by, name breaking ties
+ORDERABLE = ("name", "level", "school", "casting_time", "damage_type")
+
+
+def normalize(value: Any) -> Any:
+    """
+    Filter key of a value: booleans as the stored 0/1, empty text as missing and text
+    as an SRD index, so a display name ("Open Hand") matches its slug ("open-hand")
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str):
+        return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or None
+    return value
+
+
+def iter_bits(mask: int, descending: bool = False) -> Iterator[int]:
+    """Positions of the set bits of a bitmap"""
+    if descending:
+        while mask:
+            position = mask.bit_length() - 1
+            yield position
+            mask ^= 1 << position
+        return
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class SpellIndex:
+    """
+    In-memory query index over formatted SpellRows
+    Spells are numbered in name order. Each categorical value has a bitmap (an int)
+    of the spells having it and each numeric attribute a sorted array with prefix
+    bitmaps, so a conjunctive query is a handful of integer ANDs; results are read
+    off the final bitmap in name order or through a precomputed sort order
+    """
+
+    def __init__(self, spells: Iterable[Any]):
+        self.spells: List[Any] = sorted(spells, key=lambda spell: (spell.name or "").lower())
+        self.all = (1 << len(self.spells)) - 1
+
+        self.bitmaps: Dict[str, Dict[Any, int]] = {attribute: {} for attribute in CATEGORICAL}
+        for position, spell in enumerate(self.spells):
+            bit = 1 << position
+            for attribute, values in CATEGORICAL.items():
+                bitmaps = self.bitmaps[attribute]
+                for value in values(spell):
+                    value = normalize(value)
+                    if value is not None:
+                        bitmaps[value] = bitmaps.get(value, 0) | bit
+
+        # attribute -> (sorted values, bitmap of the spells holding the first i of them)
+        self.sorted: Dict[str, Tuple[List[int], List[int]]] = {}
+        for attribute, value_of in NUMERIC.items():
+            pairs = sorted((value, position) for position, spell in enumerate(self.spells)
+                           if (value := value_of(spell)) is not None)
+            prefix = [0]
+            for _, position in pairs:
+                prefix.append(prefix[-1] | 1 << position)
+            self.sorted[attribute] = ([value for value, _ in pairs], prefix)
+
+        # attribute -> (ascending, descending) positions; spells without a value sort last either way
+        self.orders: Dict[str, Tuple[List[int], List[int]]] = {}
+        for attribute in ORDERABLE[1:]:
+            key = self.sort_key(attribute)
+            # Positions are in name order and the sorts are stable, so name breaks ties ascending both ways
+            ordered = sorted((p for p in range(len(self.spells)) if key(p) is not None), key=key)
+            missing = [p for p in range(len(self.spells)) if key(p) is None]
+            self.orders[attribute] = (ordered + missing, sorted(ordered, key=key, reverse=True) + missing)
+
+    @classmethod
+    def from_reference_data(cls, reference_data_path) -> "SpellIndex":
+        """Index the spells of a reference data directory"""
+        return cls(create_data_for_spells(reference_data_path))
+
+    def sort_key(self, attribute: str) -> Callable[[int], Any]:
+        """Sort value of the spell at a position"""
+        if attribute in NUMERIC:
+            value_of = NUMERIC[attribute]
+        else:
+            values = CATEGORICAL[attribute]
+            value_of = lambda spell: next(iter(values(spell)), None)
+        return lambda position: normalize(value_of(self.spells[position]))
+
+    def match(self, attribute: str, condition: Any) -> int:
+        """Bitmap of the spells satisfying one filter"""
+        if attribute in NUMERIC:
+            values, prefix = self.sorted[attribute]
+            if isinstance(condition, Range):
+                start = 0 if condition.low is None else bisect.bisect_left(values, condition.low)
+                end = len(values) if condition.high is None else bisect.bisect_right(values, condition.high)
+                return prefix[end] & ~prefix[start] if end > start else 0
+            wanted = condition if isinstance(condition, (list, tuple, set, frozenset, range)) else [condition]
+            mask = 0
+            for value in wanted:
+                mask |= prefix[bisect.bisect_right(values, value)] & ~prefix[bisect.bisect_left(values, value)]
+            return mask
+        if attribute not in CATEGORICAL:
+            raise ValueError(f"Unknown spell attribute {attribute}")
+        bitmaps = self.bitmaps[attribute]
+        if isinstance(condition, (list, tuple, set, frozenset)):
+            mask = 0
+            for value in condition:
+                mask |= bitmaps.get(normalize(value), 0)
+            return mask
+        return bitmaps.get(normalize(condition), 0)
+
+    def filter(self, **filters: Any) -> int:
+        """Bitmap of the spells matching every filter"""
+        mask = self.all
+        for attribute, condition in filters.items():
+            mask &= self.match(attribute, condition)
+            if not mask:
+                break
+        return mask
+
+    def query(self, order_by: str = "name", descending: bool = False, offset: int = 0, limit: Optional[int] = None, **filters: Any) -> SpellPage:
+        """
+        Spells matching every filter, ordered and paginated
+        A filter is a value, a list of values (any of them) or a Range for level/area_of_effect_size,
+        e.g. query(level=Range(high=3), school="Evocation", concentration=False, **{"class": "Wizard"})
+        """
+        if order_by not in ORDERABLE:
+            raise ValueError(f"Cannot order spells by {order_by}, expected one of {', '.join(ORDERABLE)}")
+        mask = self.filter(**filters)
+        page = SpellPage(total=mask.bit_count(), offset=offset)
+        if limit == 0 or offset >= page.total:
+            return page
+
+        if order_by == "name":
+            positions = iter_bits(mask, descending)
+        else:
+            order = self.orders[order_by][1 if descending else 0]
+            positions = (p for p in order if mask >> p & 1)
+        for i, position in enumerate(positions):
+            if i < offset:
+                continue
+            if limit is not None and len(page.spells) >= limit:
+                break
+            page.spells.append(self.spells[position])
+        return page
+
+    def values(self, attribute: str) -> List[Any]:
+        """Distinct indexed values of an attribute"""
+        if attribute in NUMERIC:
+            return sorted(set(self.sorted[attribute][0]))
+        return sorted(self.bitmaps[attribute], key=str)
+
+    def __len__(self) -> int:
+        return len(self.spells)
@@ -0,0 +1,67 @@
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Mapping, NamedTuple, Sequence, Tuple
+
+
+class InsertStatement(NamedTuple):
+    """INSERT text and the column order its parameters are bound in"""
+    sql: str
+    columns: Tuple[str, ...]
+
+    def params(self, item: Mapping[str, Any]) -> list:
+        """Parameter values of a row, in statement order"""
+        return [item[column] for column in self.columns]
+
+
+class StatementCache:
+    """
+    INSERT statements built once per (table, column set, returns_id)
+    A column set's statement binds its columns in sorted order, so rows whose keys
+    come out in a different order, on any thread, send identical SQL text and the
+    driver can reuse its prepared plan. The lock guards the maps and counters
+    """
+
+    def __init__(self, build: Callable[[str, Sequence[str], bool], str]):
+        self.build = build
+        self.exact: Dict[Tuple[str, Tuple[str, ...], bool], InsertStatement] = {}
+        self.canonical: Dict[Tuple[str, FrozenSet[str], bool], InsertStatement] = {}
+        self.texts: Dict[Tuple[str, Tuple[str, ...], bool], str] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def insert(self, table_name: str, columns: Sequence[str], returns_id: bool = False) -> InsertStatement:
+        """Statement for a column set, its columns in sorted order"""
+        columns = tuple(columns)
+        key = (table_name, columns, returns_id)
+        with self.lock:
+            statement = self.exact.get(key)
+            if statement is not None:
+                self.hits += 1
+                return statement
+
+            self.misses += 1
+            set_key = (table_name, frozenset(columns), returns_id)
+            statement = self.canonical.get(set_key)
+            if statement is None:
+                ordered = tuple(sorted(columns))
+                statement = InsertStatement(self.build(table_name, ordered, returns_id), ordered)
+                self.canonical[set_key] = statement
+            self.exact[key] = statement
+        return statement
+
+    def sql(self, table_name: str, columns: Sequence[str], returns_id: bool = False) -> str:
+        """Statement text for exactly this column order, for callers binding values in their own order"""
+        key = (table_name, tuple(columns), returns_id)
+        with self.lock:
+            text = self.texts.get(key)
+            if text is None:
+                statement = self.exact.get(key)
+                if statement is not None and statement.columns == key[1]:
+                    text = statement.sql
+                else:
+                    text = self.build(table_name, key[1], returns_id)
+                self.texts[key] = text
+        return text
+
+    def __len__(self) -> int:
+        return len(self.canonical)
@@ -0,0 +1,240 @@
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .bulk_writer import DEFAULT_BATCH_SIZE
+
+
+class UpsertResult:
+    """Counts and ids produced by one MERGE"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        # natural key tuple -> id of every row in the source set
+        self.ids: Dict[Tuple[Any, ...], int] = {}
+
+    def __repr__(self):
+        return f"UpsertResult(inserted={self.inserted}, updated={self.updated})"
+
+
+def ordered_columns(rows: Sequence[Dict[str, Any]]) -> List[str]:
+    """Union of the row keys, in first-seen order"""
+    columns: Dict[str, None] = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def unique_rows(rows: Iterable[Dict[str, Any]], key_columns: Sequence[str]) -> List[Dict[str, Any]]:
+    """First row per natural key: a source may not match the same target row twice"""
+    unique: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for row in rows:
+        unique.setdefault(tuple(row.get(k) for k in key_columns), row)
+    return list(unique.values())
+
+
+class MergeUpserter:
+    """
+    Set-based upsert for SQL Server
+    Bulk-loads rows into a #staging copy of the target table and applies
+    them with one MERGE keyed on a natural key
+    """
+
+    def __init__(self, cursor, batch_size: int = DEFAULT_BATCH_SIZE, logger=None):
+        self.cursor = cursor
+        self.batch_size = max(1, batch_size)
+        self.logger = logger or logging.getLogger(__name__)
+
+    @contextmanager
+    def fast_executemany(self):
+        """Bind staging inserts as arrays where the driver can, restoring the shared cursor's setting after"""
+        if not hasattr(self.cursor, "fast_executemany"):
+            yield
+            return
+        previous = self.cursor.fast_executemany
+        self.cursor.fast_executemany = True
+        try:
+            yield
+        finally:
+            self.cursor.fast_executemany = previous
+
+    def has_column(self, table_name: str, column: str) -> bool:
+        """Check whether the target table has a column"""
+        self.cursor.execute("SELECT COL_LENGTH(?, ?)", (f"dbo.{table_name}", column))
+        return self.cursor.fetchone()[0] is not None
+
+    def upsert(self, table_name: str, rows: Iterable[Dict[str, Any]], key_columns: Sequence[str] = ("name",)) -> UpsertResult:
+        """Insert new rows and update changed ones in a single MERGE"""
+        result = UpsertResult()
+        data = unique_rows(rows, key_columns)
+        if not data:
+            return result
+
+        columns = ordered_columns(data)
+        stage = f"#stage_{table_name}"
+
+        self.cursor.execute(f"SELECT TOP 0 {', '.join(columns)} INTO {stage} FROM dbo.{table_name}")
+        try:
+            insert = f"INSERT INTO {stage} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+            with self.fast_executemany():
+                for start in range(0, len(data), self.batch_size):
+                    batch = data[start:start + self.batch_size]
+                    self.cursor.executemany(insert, [[row.get(c) for c in columns] for row in batch])
+
+            self.cursor.execute(self.build_merge(table_name, stage, columns, key_columns))
+            for (action,) in self.cursor.fetchall():
+                if action == "INSERT":
+                    result.inserted += 1
+                elif action == "UPDATE":
+                    result.updated += 1
+
+            # Unchanged rows are not in the MERGE output, read every id back in one join
+            on = self.match(key_columns)
+            self.cursor.execute(
+                f"SELECT target.id, {', '.join(f'source.{k}' for k in key_columns)} "
+                f"FROM dbo.{table_name} AS target JOIN {stage} AS source ON {on}"
+            )
+            for row in self.cursor.fetchall():
+                result.ids[tuple(row[1:])] = row[0]
+        finally:
+            self.cursor.execute(f"DROP TABLE {stage}")
+
+        self.logger.info(f"{table_name} merged: {result.inserted} inserted, {result.updated} updated")
+        return result
+
+    def match(self, key_columns: Sequence[str]) -> str:
+        """Join condition on the natural key, a NULL key part matching NULL"""
+        return " AND ".join(
+            f"(target.{k} = source.{k} OR (target.{k} IS NULL AND source.{k} IS NULL))" for k in key_columns
+        )
+
+    def update_by_id(self, table_name: str, column: str, values: Sequence[Tuple[int, Any]]) -> int:
+        """Set one column of many rows with a single UPDATE joined to a staged (id, value) map"""
+        if not values:
+            return 0
+        stage = f"#stage_{table_name}_{column}"
+        self.cursor.execute(f"SELECT TOP 0 id, {column} AS value INTO {stage} FROM dbo.{table_name}")
+        try:
+            insert = f"INSERT INTO {stage} (id, value) VALUES (?, ?)"
+            with self.fast_executemany():
+                for start in range(0, len(values), self.batch_size):
+                    self.cursor.executemany(insert, [list(pair) for pair in values[start:start + self.batch_size]])
+            self.cursor.execute(
+                f"UPDATE target SET target.{column} = source.value "
+                f"FROM dbo.{table_name} AS target JOIN {stage} AS source ON target.id = source.id"
+            )
+            updated = max(self.cursor.rowcount, 0)
+        finally:
+            self.cursor.execute(f"DROP TABLE {stage}")
+        return updated
+
+    def build_merge(self, table_name: str, stage: str, columns: Sequence[str], key_columns: Sequence[str]) -> str:
+        """Build the MERGE statement for a staged table"""
+        on = self.match(key_columns)
+        value_columns = [c for c in columns if c not in key_columns]
+        insert_columns = ", ".join(columns)
+        insert_values = ", ".join(f"source.{c}" for c in columns)
+
+        when_changed = ""
+        if value_columns:
+            sets = [f"target.{c} = source.{c}" for c in value_columns]
+            if self.has_column(table_name, "updated_at"):
+                sets.append("target.updated_at = GETDATE()")
+            # EXCEPT compares NULLs as equal, unlike <>
+            changed = (
+                f"EXISTS (SELECT {', '.join(f'source.{c}' for c in value_columns)} "
+                f"EXCEPT SELECT {', '.join(f'target.{c}' for c in value_columns)})"
+            )
+            when_changed = f"WHEN MATCHED AND {changed} THEN UPDATE SET {', '.join(sets)}"
+
+        return f"""
+            MERGE dbo.{table_name} AS target
+            USING {stage} AS source
+            ON {on}
+            {when_changed}
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT ({insert_columns}) VALUES ({insert_values})
+            OUTPUT $action;
+        """
+
+
+class SqliteUpserter:
+    """
+    Set-based upsert for SQLite
+    Stages rows in a temp table, then applies one UPDATE ... FROM for changed
+    rows and one INSERT ... SELECT for new ones
+    """
+
+    def __init__(self, cursor, batch_size: int = DEFAULT_BATCH_SIZE, logger=None, has_updated_at: bool = False):
+        self.cursor = cursor
+        self.batch_size = max(1, batch_size)
+        self.logger = logger or logging.getLogger(__name__)
+        self.has_updated_at = has_updated_at
+
+    def upsert(self, table_name: str, rows: Iterable[Dict[str, Any]], key_columns: Sequence[str] = ("name",)) -> UpsertResult:
+        """Insert new rows and update changed ones"""
+        result = UpsertResult()
+        data = unique_rows(rows, key_columns)
+        if not data:
+            return result
+
+        columns = ordered_columns(data)
+        value_columns = [c for c in columns if c not in key_columns]
+        stage = f"stage_{table_name}"
+        # IS matches a NULL key part against NULL
+        match = " AND ".join(f"t.{k} IS s.{k}" for k in key_columns)
+
+        self.cursor.execute(f'CREATE TEMP TABLE {stage} AS SELECT {", ".join(columns)} FROM "{table_name}" WHERE 0')
+        try:
+            insert = f"INSERT INTO {stage} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+            for start in range(0, len(data), self.batch_size):
+                batch = data[start:start + self.batch_size]
+                self.cursor.executemany(insert, [[row.get(c) for c in columns] for row in batch])
+
+            if value_columns:
+                sets = [f"{c} = s.{c}" for c in value_columns]
+                if self.has_updated_at:
+                    sets.append("updated_at = CURRENT_TIMESTAMP")
+                # IS NOT treats two NULLs as equal
+                changed = " OR ".join(f"t.{c} IS NOT s.{c}" for c in value_columns)
+                self.cursor.execute(
+                    f'UPDATE "{table_name}" AS t SET {", ".join(sets)} FROM {stage} AS s WHERE {match} AND ({changed})'
+                )
+                result.updated = max(self.cursor.rowcount, 0)
+
+            self.cursor.execute(
+                f'INSERT INTO "{table_name}" ({", ".join(columns)}) '
+                f"SELECT {', '.join(f's.{c}' for c in columns)} FROM {stage} AS s "
+                f'WHERE NOT EXISTS (SELECT 1 FROM "{table_name}" AS t WHERE {match})'
+            )
+            result.inserted = max(self.cursor.rowcount, 0)
+
+            self.cursor.execute(
+                f"SELECT t.id, {', '.join(f's.{k}' for k in key_columns)} "
+                f'FROM "{table_name}" AS t JOIN {stage} AS s ON {match}'
+            )
+            for row in self.cursor.fetchall():
+                result.ids[tuple(row[1:])] = row[0]
+        finally:
+            self.cursor.execute(f"DROP TABLE temp.{stage}")
+
+        self.logger.info(f"{table_name} merged: {result.inserted} inserted, {result.updated} updated")
+        return result
+
+    def update_by_id(self, table_name: str, column: str, values: Sequence[Tuple[int, Any]]) -> int:
+        """Set one column of many rows with a single UPDATE ... FROM a staged (id, value) map"""
+        if not values:
+            return 0
+        stage = f"stage_{table_name}_{column}"
+        self.cursor.execute(f'CREATE TEMP TABLE {stage} AS SELECT id, {column} AS value FROM "{table_name}" WHERE 0')
+        try:
+            insert = f"INSERT INTO {stage} (id, value) VALUES (?, ?)"
+            for start in range(0, len(values), self.batch_size):
+                self.cursor.executemany(insert, [list(pair) for pair in values[start:start + self.batch_size]])
+            self.cursor.execute(f'UPDATE "{table_name}" AS t SET {column} = s.value FROM {stage} AS s WHERE t.id = s.id')
+            updated = max(self.cursor.rowcount, 0)
+        finally:
+            self.cursor.execute(f"DROP TABLE temp.{stage}")
+        return updated
@@ -0,0 +1,55 @@
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+IMPORTER_PATH = Path(__file__).resolve().parents[1]
+# data_import.py imports the importers package as a top-level one
+sys.path.insert(0, str(IMPORTER_PATH))
+
+from data_import import DnDDataImporter  # noqa: E402
+
+REFERENCE_DATA_PATH = IMPORTER_PATH.parent / "Reference Data" / "2014"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def quiet_import(tmp_path_factory):
+    """Keep data_import.log out of the working tree and INFO logs out of the output"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("logs"))
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+    os.chdir(cwd)
+
+
+@pytest.fixture(scope="session")
+def reference_data_path() -> Path:
+    return REFERENCE_DATA_PATH
+
+
+@pytest.fixture
+def importer():
+    """Importer on an empty in-memory SQLite database"""
+    importer = DnDDataImporter("sqlite:///", str(REFERENCE_DATA_PATH))
+    yield importer
+    importer.pool.close_all()
+    importer.backend.close()
+
+
+@pytest.fixture(scope="session")
+def full_import():
+    """Connection to an in-memory database after one full import, shared by read-only tests"""
+    importer = DnDDataImporter("sqlite:///", str(REFERENCE_DATA_PATH))
+    importer.run_full_import()
+    conn = importer.backend.open()
+    yield conn
+    conn.close()
+    importer.backend.close()
+
+
+def count(conn, table_name: str) -> int:
+    """Rows of a table"""
+    return conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
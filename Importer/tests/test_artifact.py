@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+
+from conftest import count
+from data_import import DnDDataImporter
+
+EXPECTED_ROWS = {"class": 24, "feature": 407, "feature_prerequisite": 24, "level": 240, "level_class_data": 400}
+
+
+@pytest.fixture(scope="module")
+def artifact(tmp_path_factory, reference_data_path):
+    """Path of a built artifact and its rows per table"""
+    path = tmp_path_factory.mktemp("artifact") / "srd.db"
+    importer = DnDDataImporter("sqlite:///", str(reference_data_path))
+    counts = importer.build_artifact(path)
+    importer.backend.close()
+    return path, counts
+
+
+def test_artifact_has_class_feature_and_level_rows(artifact):
+    path, counts = artifact
+    conn = sqlite3.connect(f"file:{path}?immutable=1", uri=True)
+    try:
+        for table, expected in EXPECTED_ROWS.items():
+            assert counts[table] == expected
+            assert count(conn, table) == expected
+        # Named records carry their SRD index
+        assert conn.execute("SELECT name FROM class WHERE srd_index = 'wizard'").fetchone() == ("Wizard",)
+        assert conn.execute("SELECT COUNT(*) FROM feature WHERE srd_index IS NULL").fetchone()[0] == 0
+        orphans = conn.execute(
+            "SELECT COUNT(*) FROM level l LEFT JOIN class c ON c.id = l.class_id WHERE c.id IS NULL"
+        ).fetchone()[0]
+        assert orphans == 0
+    finally:
+        conn.close()
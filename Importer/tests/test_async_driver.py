@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import count
+from importers.async_driver import AsyncImportDriver, QueueReader
+from importers.metrics import ImportMetrics
+
+
+def run(importer, **options):
+    """Run the importer's full task graph on the async driver"""
+    driver = AsyncImportDriver(importer, writer_concurrency=4, **options)
+    return asyncio.run(driver.run(importer.import_tasks()))
+
+
+def test_async_import_writes_every_table(importer):
+    result = run(importer, queue_size=2)
+    assert result.ok
+    conn = importer.backend.open()
+    assert count(conn, "spell") == 319
+    assert count(conn, "class") == 24
+    assert count(conn, "feature") == 407
+    assert count(conn, "level") == 240
+    assert count(conn, "feat") == 1
+    assert importer.streams == {}
+
+
+def test_a_producer_error_fails_its_import(importer):
+    read_source_rows = importer.read_source_rows
+
+    def broken_spells(table_name):
+        rows = read_source_rows(table_name)
+        if table_name != "spell":
+            return rows
+
+        def fail_midway():
+            for i, row in enumerate(rows):
+                if i == 120:
+                    raise ValueError("bad spell file")
+                yield row
+        return fail_midway()
+
+    importer.batch_size = 50
+    importer.read_source_rows = broken_spells
+    result = run(importer)
+    assert result.failed == {"spell": "bad spell file"}
+    assert sorted(result.skipped) == ["feature", "level"]
+    conn = importer.backend.open()
+    # The failed import rolled back its written batches, independent imports completed
+    assert count(conn, "spell") == 0
+    assert count(conn, "class") == 24
+
+
+def test_a_failed_import_releases_its_producer(importer):
+    def fail(session):
+        raise RuntimeError("spell table missing")
+
+    importer.import_spell = fail
+    importer.batch_size = 5
+    # Spells fill a one-batch queue long before the writer gives up on them
+    result = run(importer, queue_size=1)
+    assert result.failed == {"spell": "spell table missing"}
+    assert sorted(result.skipped) == ["feature", "level"]
+
+
+def test_full_queues_hold_the_producer_back(importer):
+    importer.metrics = ImportMetrics()
+    importer.batch_size = 2
+    driver = AsyncImportDriver(importer, queue_size=1)
+
+    async def consume_slowly():
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(1)
+        with ThreadPoolExecutor(1) as executor:
+            producer = asyncio.create_task(driver.produce("magic_school", queue, executor))
+            await asyncio.sleep(0.05)
+            # One batch queued, the producer waits for room before formatting more
+            assert queue.full() and not producer.done()
+            rows = await loop.run_in_executor(None, list, QueueReader(queue, loop))
+            await producer
+        return rows
+
+    rows = asyncio.run(consume_slowly())
+    assert len(rows) == 8
+    assert importer.metrics.counters[("magic_school", "queue_full_waits")] >= 1
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from importers.data_loader import iter_data_file, iter_json_array
+
+
+def parse(tmp_path, text, chunk_size):
+    path = tmp_path / "data.json"
+    path.write_text(text, encoding="utf-8")
+    return list(iter_json_array(path, chunk_size))
+
+
+def parse_at_every_edge(tmp_path, text):
+    """Parse with every chunk size, so a buffer edge falls at every position of the text"""
+    expected = json.loads(text)
+    for chunk_size in range(1, len(text) + 1):
+        assert parse(tmp_path, text, chunk_size) == expected, chunk_size
+
+
+@pytest.mark.parametrize("text", [
+    "[1234, 5678]",
+    "[-12.5e-3, 1.5E+10, 0]",
+    '["split string", "another"]',
+    '["escapes \\" \\\\ \\n \\u00e9 \\ud83d\\ude00", "x"]',
+    "[true, false, null]",
+    '[{"name": "Fireball", "level": 3, "desc": ["A bright streak"]}, {"name": "Shield"}]',
+    '  \n[ 1 ,\n\t2 , 3 ]\n ',
+])
+def test_values_split_across_buffer_edges(tmp_path, text):
+    parse_at_every_edge(tmp_path, text)
+
+
+@pytest.mark.parametrize("text", ["[]", "[ ]", " [\n] \n"])
+def test_empty_array(tmp_path, text):
+    for chunk_size in (1, 2, 64):
+        assert parse(tmp_path, text, chunk_size) == []
+
+
+@pytest.mark.parametrize("text", ['[1, 2] x', "[] []", '[{"a": 1}],'])
+def test_trailing_garbage_is_an_error(tmp_path, text):
+    for chunk_size in (1, 3, 64):
+        with pytest.raises(ValueError):
+            parse(tmp_path, text, chunk_size)
+
+
+@pytest.mark.parametrize("text", ["[", "[1, 2", '[{"a": 1}, {"b":', '["unterminated', "[1,", "[1 2]", '{"a": 1}'])
+def test_truncated_or_malformed_file_is_an_error(tmp_path, text):
+    for chunk_size in (1, 3, 64):
+        with pytest.raises(ValueError):
+            parse(tmp_path, text, chunk_size)
+
+
+def test_streaming_matches_json_load(reference_data_path):
+    filename = "5e-SRD-Spells.json"
+    with open(reference_data_path / filename, encoding="utf-8") as f:
+        expected = json.load(f)
+    assert list(iter_data_file(reference_data_path, filename, threshold=0)) == expected
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from conftest import REFERENCE_DATA_PATH
+from data_import import DnDDataImporter
+
+CONDITIONS = "5e-SRD-Conditions.json"
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Writable copy of the SRD conditions, the reference directory of a delta importer"""
+    records = json.loads((REFERENCE_DATA_PATH / CONDITIONS).read_text(encoding="utf-8"))
+
+    def write(records):
+        (tmp_path / CONDITIONS).write_text(json.dumps(records), encoding="utf-8")
+        return records
+
+    write(records)
+    return tmp_path, records, write
+
+
+@pytest.fixture
+def delta_importer(source):
+    importer = DnDDataImporter("sqlite:///", str(source[0]))
+    yield importer
+    importer.pool.close_all()
+    importer.backend.close()
+
+
+def rows(importer):
+    """name -> (description, deleted) of every condition row"""
+    conn = importer.backend.open()
+    return {name: (description, deleted) for name, description, deleted in conn.execute("SELECT name, description, deleted FROM condition")}
+
+
+def test_delta_import_soft_deletes_and_revives(source, delta_importer):
+    _, records, write = source
+    plan = delta_importer.import_delta("condition")
+    assert len(plan.new) == 15
+    assert delta_importer.import_delta("condition").empty
+
+    blinded = records[0]
+    assert blinded["name"] == "Blinded"
+    charmed = dict(records[1], desc=["Changed text"])
+    write([charmed] + records[2:])
+    plan = delta_importer.import_delta("condition")
+    assert (len(plan.new), len(plan.changed), list(plan.removed), plan.unchanged) == (0, 1, ["blinded"], 13)
+    current = rows(delta_importer)
+    assert current["Blinded"][1] == 1
+    assert current["Charmed"] == ("Changed text", 0)
+
+    # The record comes back: its soft-deleted row is revived, not duplicated
+    write([blinded, charmed] + records[2:])
+    plan = delta_importer.import_delta("condition")
+    assert [record["index"] for record in plan.new] == ["blinded"]
+    current = rows(delta_importer)
+    assert len(current) == 15
+    assert current["Blinded"][1] == 0
+
+
+def test_delta_import_retires_renamed_rows(source, delta_importer):
+    _, records, write = source
+    delta_importer.import_delta("condition")
+    write([dict(records[0], name="Sightless")] + records[1:])
+    plan = delta_importer.import_delta("condition")
+    assert [record["index"] for record in plan.changed] == ["blinded"]
+    current = rows(delta_importer)
+    assert current["Blinded"][1] == 1
+    assert current["Sightless"][1] == 0
+    assert sum(1 for _, deleted in current.values() if not deleted) == 15
@@ -0,0 +1,48 @@
+import pytest
+
+from data_import import DnDDataImporter
+from importers.export import FIELD_TERMINATOR, ROW_TERMINATOR
+
+EXPECTED_ROWS = {"class": 24, "feature": 407, "feature_prerequisite": 24, "level": 240, "level_class_data": 400}
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory, reference_data_path):
+    """Directory of a bcp export and its rows per table"""
+    output_dir = tmp_path_factory.mktemp("export")
+    importer = DnDDataImporter("sqlite:///", str(reference_data_path))
+    counts = importer.export_bulk_files(output_dir)
+    importer.backend.close()
+    return output_dir, counts
+
+
+def data_rows(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return [row.split(FIELD_TERMINATOR) for row in f.read().split(ROW_TERMINATOR) if row]
+
+
+def test_export_writes_class_feature_and_level_files(exported):
+    output_dir, counts = exported
+    for table, expected in EXPECTED_ROWS.items():
+        assert counts[table] == expected
+        assert len(data_rows(output_dir / f"{table}.dat")) == expected
+
+
+def test_identity_tables_load_with_their_exported_ids(exported):
+    output_dir, _ = exported
+    load = (output_dir / "load.sql").read_text(encoding="utf-8")
+    statements = {line.split()[2]: line for line in load.splitlines() if line.startswith("BULK INSERT")}
+    for table in ("class", "feature", "level", "level_class_data"):
+        assert "KEEPIDENTITY" in statements[f"dbo.{table}"]
+    # level is IDENTITY(70000, 7): compiled ids start at the seed but step by 1
+    level_ids = [int(row[0]) for row in data_rows(output_dir / "level.dat")]
+    assert level_ids == list(range(70000, 70000 + len(level_ids)))
+
+
+def test_sql_export_inserts_identity_values(tmp_path, reference_data_path):
+    importer = DnDDataImporter("sqlite:///", str(reference_data_path))
+    counts = importer.export_bulk_files(tmp_path, "sql")
+    importer.backend.close()
+    script = (tmp_path / "import.sql").read_text(encoding="utf-8")
+    assert counts["level"] == EXPECTED_ROWS["level"]
+    assert "SET IDENTITY_INSERT dbo.level ON;\nINSERT INTO dbo.level (" in script
@@ -0,0 +1,47 @@
+import pytest
+
+from conftest import count
+from importers.data_formatter import format_feat
+
+
+def feat(name, *minimums):
+    """Formatted feat requiring a minimum score of each (ability, score) pair"""
+    prerequisites = [
+        {"ability_score": {"index": ability, "url": f"/api/2014/ability-scores/{ability}"}, "minimum_score": score}
+        for ability, score in minimums
+    ]
+    return format_feat({"name": name, "desc": [f"{name} text"], "prerequisites": prerequisites})
+
+
+@pytest.fixture
+def feats():
+    return [feat(f"Feat {i}", ("str", 13), ("dex", 13)) for i in range(40)] + [feat("Lucky"), feat("Lucky", ("cha", 15))]
+
+
+def test_full_import_links_feat_prerequisites(full_import):
+    assert count(full_import, "feat") == 1
+    row = full_import.execute(
+        "SELECT f.name, a.name, p.minimum_score FROM feat_prerequisite p "
+        "JOIN feat f ON f.id = p.feat_id JOIN ability_score a ON a.id = p.ability_score_id"
+    ).fetchall()
+    assert row == [("Grappler", "STR", 13)]
+
+
+@pytest.mark.parametrize("upsert_mode", [False, True])
+def test_feats_are_written_in_batches(importer, feats, upsert_mode, monkeypatch):
+    importer.upsert_mode = upsert_mode
+    importer.import_ability_scores()
+
+    def per_row(*args, **kwargs):
+        raise AssertionError("feats are written in batches")
+
+    monkeypatch.setattr(importer.backend, "insert_returning_id", per_row)
+    importer.streams["feat"] = feats
+    importer.import_feats()
+
+    conn = importer.backend.open()
+    # The repeated Lucky is skipped, with its prerequisites
+    assert count(conn, "feat") == 41
+    assert count(conn, "feat_prerequisite") == 80
+    unlinked = conn.execute("SELECT COUNT(*) FROM feat_prerequisite p LEFT JOIN feat f ON f.id = p.feat_id WHERE f.id IS NULL")
+    assert unlinked.fetchone()[0] == 0
@@ -0,0 +1,37 @@
+from conftest import count
+
+
+def test_full_import_writes_features_and_prerequisites(full_import):
+    assert count(full_import, "feature") == 407
+    assert count(full_import, "feature_prerequisite") == 24
+    linked = full_import.execute("SELECT COUNT(*) FROM feature WHERE parent_feature_id IS NOT NULL").fetchone()[0]
+    assert linked == 84
+
+
+def test_feature_references_resolve(full_import):
+    dangling = full_import.execute(
+        "SELECT COUNT(*) FROM feature f LEFT JOIN feature p ON p.id = f.parent_feature_id "
+        "WHERE f.parent_feature_id IS NOT NULL AND p.id IS NULL"
+    ).fetchone()[0]
+    assert dangling == 0
+    # Every feature belongs to a class; subclass features to one of its subclasses
+    unresolved = full_import.execute("SELECT COUNT(*) FROM feature WHERE class_id IS NULL").fetchone()[0]
+    assert unresolved == 0
+    mismatched = full_import.execute(
+        "SELECT COUNT(*) FROM feature f JOIN class s ON s.id = f.subclass_id WHERE s.parent_class_id <> f.class_id"
+    ).fetchone()[0]
+    assert mismatched == 0
+
+
+def test_level_prerequisites_store_the_level(full_import):
+    rows = full_import.execute(
+        "SELECT reference_id, minimum_level FROM feature_prerequisite WHERE reference_type = 'level'"
+    ).fetchall()
+    assert len(rows) == 16
+    assert all(reference_id is None and minimum_level for reference_id, minimum_level in rows)
+    # Feature and spell prerequisites point at their row and carry no level
+    unresolved = full_import.execute(
+        "SELECT COUNT(*) FROM feature_prerequisite WHERE reference_type <> 'level' "
+        "AND (reference_id IS NULL OR minimum_level IS NOT NULL)"
+    ).fetchone()[0]
+    assert unresolved == 0
@@ -0,0 +1,23 @@
+import pytest
+
+from conftest import REFERENCE_DATA_PATH
+from importers.data_formatter import RECORD_SOURCES, create_data_for_background
+from importers.data_loader import iter_data_file
+
+
+@pytest.mark.parametrize("table_name", sorted(RECORD_SOURCES))
+def test_formatters_format_every_record(table_name):
+    filename, formatter = RECORD_SOURCES[table_name]
+    rows = [formatter(item) for item in iter_data_file(REFERENCE_DATA_PATH, filename)]
+    assert rows
+
+
+def test_backgrounds_format_their_option_counts():
+    rows = {row["name"]: row for row in create_data_for_background(REFERENCE_DATA_PATH)}
+    assert len(rows) == 13
+    assert rows["Acolyte"] == {
+        "name": "Acolyte", "language_options": 2, "starting_equipment_options": 1,
+        "trait_options": 2, "ideal_options": 1, "bond_options": 1, "flaw_options": 1,
+    }
+    # Charlatan offers no languages to choose
+    assert rows["Charlatan"]["language_options"] is None
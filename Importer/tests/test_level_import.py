@@ -0,0 +1,66 @@
+import json
+
+from conftest import count
+from data_import import DnDDataImporter
+from importers.data_formatter import create_data_for_level
+from importers.schema import load_table_defs
+
+CLASS_DATA = ("class_specific", "spellcasting")
+
+
+def test_full_import_writes_classes_levels_and_class_data(full_import):
+    assert count(full_import, "class") == 24
+    assert count(full_import, "level") == 240
+    assert count(full_import, "level_class_data") == 400
+    # Subclass levels only list features: every level row belongs to a class
+    orphans = full_import.execute(
+        "SELECT COUNT(*) FROM level l LEFT JOIN class c ON c.id = l.class_id WHERE c.id IS NULL OR c.is_subclass = 1"
+    ).fetchone()[0]
+    assert orphans == 0
+
+
+def test_subclasses_are_linked_to_their_class(full_import):
+    rows = full_import.execute(
+        "SELECT s.name, s.hit_die, c.name, c.hit_die FROM class s JOIN class c ON c.id = s.parent_class_id WHERE s.is_subclass = 1"
+    ).fetchall()
+    assert len(rows) == 12
+    assert ("Berserker", 12, "Barbarian", 12) in rows
+    assert all(subclass_die == class_die for _, subclass_die, _, class_die in rows)
+
+
+def test_level_class_data_keeps_the_whole_json(full_import, reference_data_path):
+    expected = {}
+    for level in create_data_for_level(reference_data_path):
+        if level["subclass"]:
+            continue
+        for attribute in CLASS_DATA:
+            if level[attribute]:
+                expected[(level["class"][1], level["level"], attribute)] = level[attribute]
+
+    rows = full_import.execute(
+        "SELECT c.name, l.level, d.attribute_name, d.attribute_value FROM level_class_data d "
+        "JOIN level l ON l.id = d.level_id JOIN class c ON c.id = l.class_id"
+    ).fetchall()
+    assert {(name.lower(), level, attribute): json.loads(value) for name, level, attribute, value in rows} == expected
+    # Longer than the NVARCHAR(100) the column used to be
+    assert max(len(value) for *_, value in rows) > 100
+
+
+def test_attribute_value_is_nvarchar_max():
+    column = next(c for c in load_table_defs()["level_class_data"].columns if c.name == "attribute_value")
+    assert "NVARCHAR(MAX)" in "".join(column.definition.upper().split())
+
+
+def test_level_upsert_rerun_keeps_the_rows(importer, reference_data_path):
+    importer.import_class()
+    importer.import_level()
+    upserter = DnDDataImporter("sqlite:///", str(reference_data_path), upsert_mode=True, backend=importer.backend)
+    upserter.import_class()
+    upserter.import_level()
+    conn = importer.backend.open()
+    try:
+        assert count(conn, "class") == 24
+        assert count(conn, "level") == 240
+        assert count(conn, "level_class_data") == 400
+    finally:
+        conn.close()
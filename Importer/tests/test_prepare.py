@@ -0,0 +1,52 @@
+import shutil
+
+from conftest import REFERENCE_DATA_PATH, count
+from data_import import DnDDataImporter
+from importers.data_formatter import RECORD_SOURCES
+from importers.data_loader import iter_data_file
+from importers.metrics import ImportMetrics
+from importers.prepare import PreparedSources, largest_first
+
+
+def formatted(table_name):
+    """Rows of a table formatted in this process"""
+    filename, formatter = RECORD_SOURCES[table_name]
+    return [formatter(record) for record in iter_data_file(REFERENCE_DATA_PATH, filename)]
+
+
+def test_worker_rows_match_serial_formatting():
+    prepared = PreparedSources(REFERENCE_DATA_PATH, max_workers=2).prepare(["spell", "feature", "condition", "no_such_table"])
+    assert set(prepared.rows) == {"spell", "feature", "condition"} and not prepared.failed
+    assert set(prepared.seconds) == set(prepared.rows)
+    for table_name in ("spell", "feature", "condition"):
+        assert prepared.take(table_name) == formatted(table_name)
+    # Rows are handed out once
+    assert prepared.take("spell") is None
+
+
+def test_a_failing_file_is_left_to_the_importer(tmp_path):
+    shutil.copy(REFERENCE_DATA_PATH / RECORD_SOURCES["condition"][0], tmp_path)
+    (tmp_path / RECORD_SOURCES["spell"][0]).write_text('[{"name": "Fireball",', encoding="utf-8")
+    prepared = PreparedSources(tmp_path, max_workers=2).prepare(["spell", "condition"])
+    assert list(prepared.rows) == ["condition"]
+    assert list(prepared.failed) == ["spell"]
+
+
+def test_largest_files_are_submitted_first():
+    assert largest_first(REFERENCE_DATA_PATH, ["condition", "monster", "spell"]) == ["monster", "spell", "condition"]
+
+
+def test_full_import_on_prepared_sources():
+    metrics = ImportMetrics()
+    importer = DnDDataImporter("sqlite:///", str(REFERENCE_DATA_PATH), metrics=metrics, parallel_prepare=True)
+    try:
+        importer.run_full_import()
+        conn = importer.backend.open()
+        assert count(conn, "spell") == 319
+        assert count(conn, "feature") == 407
+        assert count(conn, "level") == 240
+        # Every table was formatted by the pool, and the cache released after the run
+        assert ("spell", "prepare") in metrics.timings and ("spell", "format") not in metrics.timings
+        assert importer.prepared is None
+    finally:
+        importer.backend.close()
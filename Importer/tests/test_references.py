@@ -0,0 +1,35 @@
+from importers.references import ReferenceIndex, reference_fields, resource_file
+
+RECORDS = {
+    "classes": [{"index": "wizard", "name": "Wizard", "hit_die": 6, "url": "/api/2014/classes/wizard", "spells": "/api/2014/classes/wizard/spells", "proficiencies": [{"index": "daggers"}]}],
+    "spells": [{"index": "fireball", "name": "Fireball", "level": 3, "url": "/api/2014/spells/fireball", "desc": ["A bright streak"]}],
+}
+
+
+def test_resource_types_load_on_first_lookup_only():
+    loaded = []
+
+    def loader(resource_type):
+        loaded.append(resource_type)
+        return RECORDS.get(resource_type, [])
+
+    references = ReferenceIndex(loader)
+    assert loaded == []
+    assert references.record(("classes", "wizard"))["hit_die"] == 6
+    assert references.record(("classes", "druid")) is None
+    assert references.keys("classes") == [("classes", "wizard")]
+    assert loaded == ["classes"]
+
+    references.bind_names("spells", {"Fireball": 7})
+    assert references.id(("spells", "fireball")) == 7
+    assert loaded == ["classes", "spells"]
+
+
+def test_records_keep_their_scalar_fields_only():
+    record = reference_fields(RECORDS["classes"][0])
+    assert record == {"index": "wizard", "name": "Wizard", "hit_die": 6, "url": "/api/2014/classes/wizard", "spells": "/api/2014/classes/wizard/spells"}
+
+
+def test_resource_file_names():
+    assert resource_file("magic-schools") == "5e-SRD-Magic-Schools.json"
+    assert resource_file("equipment") == "5e-SRD-Equipment.json"
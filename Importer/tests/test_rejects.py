@@ -0,0 +1,91 @@
+import json
+import sqlite3
+
+import pytest
+
+from conftest import count
+from data_import import DnDDataImporter
+from importers.backends import SqlServerBackend
+from importers.metrics import ImportMetrics
+
+
+def language(name):
+    return {"name": name, "type": "Standard", "script": "Common", "description": "", "speakers": None, "deleted": 0}
+
+
+def test_rejected_rows_reach_the_reject_log(tmp_path, reference_data_path):
+    reject_path = tmp_path / "rejects.jsonl"
+    importer = DnDDataImporter("sqlite:///", str(reference_data_path), batch_size=4, reject_path=str(reject_path), metrics=ImportMetrics())
+    # Three nameless rows violate NOT NULL; the repeated Elvish is skipped as a duplicate
+    rows = [language(name) for name in ("Common", None, "Elvish", None, "Dwarvish", "Elvish", None, "Giant")]
+    with importer.session() as session:
+        written = importer.write_rows(session, "language", rows)
+        session.commit()
+
+    assert written == 4
+    rejected = [json.loads(line) for line in reject_path.read_text(encoding="utf-8").splitlines()]
+    assert [r["row"]["name"] for r in rejected] == [None, None, None]
+    assert all(r["table"] == "language" for r in rejected)
+    assert importer.metrics.counters.get(("language", "rows_skipped")) == 1
+    conn = importer.backend.open()
+    assert count(conn, "language") == 4
+    conn.close()
+    importer.backend.close()
+
+
+def test_connection_errors_stop_the_bisect(tmp_path, reference_data_path, monkeypatch):
+    reject_path = tmp_path / "rejects.jsonl"
+    importer = DnDDataImporter("sqlite:///", str(reference_data_path), batch_size=4, reject_path=str(reject_path), metrics=ImportMetrics())
+    bulk_insert = importer.backend.bulk_insert
+    calls = []
+
+    def drop_connection(cursor, table_name, columns, rows):
+        calls.append(len(rows))
+        if len(calls) > 1:
+            raise sqlite3.OperationalError("disk I/O error")
+        return bulk_insert(cursor, table_name, columns, rows)
+
+    monkeypatch.setattr(importer.backend, "bulk_insert", drop_connection)
+    rows = [language(name) for name in ("Common", None, "Elvish", "Dwarvish")]
+    with importer.session() as session:
+        with pytest.raises(sqlite3.OperationalError):
+            importer.write_rows(session, "language", rows)
+
+    # The NOT NULL failure started a bisect, the lost connection ended it without rejecting anything
+    assert calls == [4, 2]
+    assert not reject_path.exists()
+    assert importer.metrics.counters.get(("language", "rows_failed")) is None
+    importer.backend.close()
+
+
+class TranCountCursor:
+    """Cursor answering SELECT @@TRANCOUNT with a fixed count"""
+
+    def __init__(self, trancount):
+        self.trancount = trancount
+        self.statements = []
+
+    def execute(self, sql, *params):
+        self.statements.append(sql)
+        return self
+
+    def fetchone(self):
+        return (self.trancount,)
+
+
+def test_sql_server_savepoint_uses_the_drivers_transaction():
+    backend = SqlServerBackend("DRIVER=test")
+
+    # Before the driver opened its implicit transaction there is nothing to save
+    cursor = first = TranCountCursor(0)
+    assert backend.savepoint(cursor, "language", "batch_1") is None
+    backend.rollback_to_savepoint(cursor, None)
+    assert cursor.statements[-1] == "IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION"
+
+    cursor = TranCountCursor(1)
+    assert backend.savepoint(cursor, "language", "batch_2") == "batch_2"
+    backend.rollback_to_savepoint(cursor, "batch_2")
+    assert cursor.statements[-1] == "ROLLBACK TRANSACTION batch_2"
+
+    # BEGIN TRANSACTION in implicit transaction mode nests a level that commit() leaves open
+    assert not any("BEGIN" in statement for statement in first.statements + cursor.statements)
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from conftest import REFERENCE_DATA_PATH, count
+from data_import import DnDDataImporter
+from importers.backends import SqliteBackend
+from importers.checkpoint import CHECKPOINT_TABLE, CheckpointJournal
+
+
+def file_importer(path, **options) -> DnDDataImporter:
+    """Importer on an SQLite database file that outlives it"""
+    return DnDDataImporter(f"sqlite:///{path}", str(REFERENCE_DATA_PATH), batch_size=50, commit_size=100, **options)
+
+
+def fail_table(importer: DnDDataImporter, table_name: str, after: int):
+    """Make the backend lose its connection on a table's bulk insert number after + 1"""
+    bulk_insert = importer.backend.bulk_insert
+    calls = []
+
+    def failing(cursor, name, columns, batch):
+        if name == table_name:
+            calls.append(len(batch))
+            if len(calls) > after:
+                raise sqlite3.OperationalError("connection lost")
+        return bulk_insert(cursor, name, columns, batch)
+
+    importer.backend.bulk_insert = failing
+
+
+def checkpoints(path):
+    """Journal left in a database file"""
+    with sqlite3.connect(path) as conn:
+        return CheckpointJournal(conn.cursor(), SqliteBackend(str(path))).load()
+
+
+def test_interrupted_run_resumes(tmp_path):
+    path = tmp_path / "dnd.db"
+    importer = file_importer(path)
+    fail_table(importer, "spell", after=4)
+    with pytest.raises(RuntimeError, match="spell"):
+        importer.run_full_import()
+    importer.backend.close()
+
+    # Two chunks of 100 spells committed with their offset before the connection was lost
+    journal = checkpoints(path)
+    assert journal["spell"].offset == 200 and not journal["spell"].completed
+    assert journal["language"].completed
+
+    resumed = file_importer(path)
+    resumed.run_full_import(resume=True)
+    resumed.backend.close()
+
+    with sqlite3.connect(path) as conn:
+        assert count(conn, "spell") == 319
+        assert conn.execute("SELECT COUNT(DISTINCT name) FROM spell").fetchone()[0] == 319
+        assert count(conn, "class") == 24
+        assert count(conn, "feature") == 407
+        assert count(conn, "level") == 240
+    assert all(checkpoint.completed for checkpoint in checkpoints(path).values())
+
+
+def test_fresh_run_without_journal_table(tmp_path):
+    path = tmp_path / "dnd.db"
+    importer = file_importer(path)
+    importer.run_full_import()
+    with sqlite3.connect(path) as conn:
+        conn.execute(f"DROP TABLE {CHECKPOINT_TABLE}")
+
+    # A fresh run never reads the journal, so it does not need its table
+    importer.run_full_import()
+    with sqlite3.connect(path) as conn:
+        assert count(conn, "spell") == 319
+
+    with pytest.raises(sqlite3.OperationalError):
+        importer.run_full_import(resume=True)
+    importer.backend.close()
@@ -0,0 +1,16 @@
+import pickle
+
+import pytest
+
+from importers.data_formatter import FeatureRow
+
+
+def test_records_pickle_by_their_defining_module():
+    assert FeatureRow.__module__ == "importers.data_formatter"
+    row = FeatureRow(name="Rage", level=1, class_name="barbarian")
+    assert pickle.loads(pickle.dumps(row)) == row
+
+
+def test_records_are_unhashable():
+    with pytest.raises(TypeError):
+        hash(FeatureRow(name="Rage"))
@@ -0,0 +1,93 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from importers.scheduler import ImportScheduler, ImportTask
+
+
+@contextmanager
+def no_session():
+    """Session factory for tasks that do not touch a database"""
+    yield None
+
+
+class Recorder:
+    """Task bodies logging when each one starts and ends"""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def task(self, name, depends_on=(), seconds=0.0, error=None):
+        def run(session):
+            with self.lock:
+                self.events.append(("start", name))
+            time.sleep(seconds)
+            if error:
+                raise error
+            with self.lock:
+                self.events.append(("end", name))
+        return ImportTask(name, run, tuple(depends_on))
+
+    def index(self, event, name):
+        return self.events.index((event, name))
+
+
+def test_tasks_start_after_their_dependencies():
+    recorder = Recorder()
+    tasks = [
+        recorder.task("spell", ("magic_school", "ability_score"), 0.01),
+        recorder.task("magic_school", seconds=0.02),
+        recorder.task("ability_score", seconds=0.01),
+        recorder.task("feat", ("ability_score",)),
+    ]
+    scheduler = ImportScheduler(tasks, no_session, max_workers=4)
+    assert scheduler.order.index("spell") > scheduler.order.index("magic_school")
+
+    result = scheduler.run()
+    assert result.ok and set(result.durations) == {"spell", "magic_school", "ability_score", "feat"}
+    for task in tasks:
+        for dep in task.depends_on:
+            assert recorder.index("end", dep) < recorder.index("start", task.name)
+    # The two roots ran side by side
+    assert recorder.index("start", "ability_score") < recorder.index("end", "magic_school")
+    assert result.critical_path == ["magic_school", "spell"]
+
+
+def test_a_failure_skips_its_dependents_only():
+    recorder = Recorder()
+    tasks = [
+        recorder.task("class", error=RuntimeError("connection lost")),
+        recorder.task("feature", ("class",)),
+        recorder.task("level", ("class", "feature")),
+        recorder.task("spell"),
+    ]
+    result = ImportScheduler(tasks, no_session, max_workers=2).run()
+    assert not result.ok
+    assert result.failed == {"class": "connection lost"}
+    assert sorted(result.skipped) == ["feature", "level"]
+    # Skipped imports never start; independent ones still complete
+    assert ("start", "feature") not in recorder.events and ("start", "level") not in recorder.events
+    assert "spell" in result.durations
+
+
+def test_session_errors_fail_the_task():
+    @contextmanager
+    def broken_session():
+        raise ConnectionError("pool exhausted")
+        yield
+
+    recorder = Recorder()
+    result = ImportScheduler([recorder.task("spell"), recorder.task("monster", ("spell",))], broken_session).run()
+    assert result.failed == {"spell": "pool exhausted"}
+    assert result.skipped == ["monster"]
+
+
+def test_invalid_graphs_are_rejected():
+    recorder = Recorder()
+    with pytest.raises(ValueError, match="unknown import"):
+        ImportScheduler([recorder.task("spell", ("magic_school",))], no_session)
+    with pytest.raises(ValueError, match="cycle"):
+        ImportScheduler([recorder.task("a", ("b",)), recorder.task("b", ("a",))], no_session)
@@ -0,0 +1,74 @@
+import json
+
+from conftest import count
+from importers import data_loader
+from data_import import DnDDataImporter
+from importers.metrics import ImportMetrics
+from importers.snapshot import SnapshotCache
+
+KEY = ("test", 1)
+
+
+def test_write_through_snapshots_rows_as_they_stream(tmp_path):
+    cache = SnapshotCache(tmp_path)
+    rows = [{"name": "Fireball", "level": 3}, {"name": "Shield", "level": 1}]
+    for row in cache.write_through("spell", KEY, iter(rows)):
+        # Importers resolve references in place once they have a row
+        row["level_id"] = 42
+
+    assert cache.load("spell", KEY) == [{"name": "Fireball", "level": 3}, {"name": "Shield", "level": 1}]
+    assert cache.load("spell", ("test", 2)) is None
+
+
+def test_abandoned_stream_keeps_the_previous_snapshot(tmp_path):
+    cache = SnapshotCache(tmp_path)
+    cache.save("spell", KEY, [{"name": "Shield"}])
+
+    stream = cache.write_through("spell", KEY, iter([{"name": "Fireball"}, {"name": "Light"}]))
+    next(stream)
+    stream.close()
+
+    assert cache.load("spell", KEY) == [{"name": "Shield"}]
+    assert [path.name for path in tmp_path.iterdir()] == ["spell.pickle"]
+
+
+def test_warm_import_reads_the_snapshots(tmp_path, reference_data_path):
+    counts = []
+    for _ in range(2):
+        metrics = ImportMetrics()
+        importer = DnDDataImporter("sqlite:///", str(reference_data_path), metrics=metrics, snapshot_dir=str(tmp_path))
+        importer.run_full_import()
+        conn = importer.backend.open()
+        counts.append({table: count(conn, table) for table in ("spell", "class", "feature", "level", "monster")})
+        conn.close()
+        importer.backend.close()
+
+    assert counts[0] == counts[1]
+    assert metrics.counters.get(("spell", "snapshot_hits")) == 1
+
+
+def test_warm_import_parses_no_json(tmp_path, reference_data_path, monkeypatch):
+    importer = DnDDataImporter("sqlite:///", str(reference_data_path), snapshot_dir=str(tmp_path))
+    importer.run_full_import()
+    importer.backend.close()
+
+    parsed = []
+    load = json.load
+    iter_json_array = data_loader.iter_json_array
+    monkeypatch.setattr(json, "load", lambda f, *args, **kwargs: parsed.append(f.name) or load(f, *args, **kwargs))
+    monkeypatch.setattr(data_loader, "iter_json_array", lambda path, *args: parsed.append(path) or iter_json_array(path, *args))
+    monkeypatch.setattr(DnDDataImporter, "iter_json_file", lambda self, filename: parsed.append(filename) or iter([]))
+
+    metrics = ImportMetrics()
+    importer = DnDDataImporter("sqlite:///", str(reference_data_path), metrics=metrics, snapshot_dir=str(tmp_path))
+    importer.run_full_import()
+    conn = importer.backend.open()
+    try:
+        assert count(conn, "feature") == 407
+        assert count(conn, "level") == 240
+    finally:
+        conn.close()
+        importer.backend.close()
+
+    assert parsed == []
+    assert metrics.counters.get(("references", "snapshot_hits")) == 8
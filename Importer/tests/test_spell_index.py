@@ -0,0 +1,76 @@
+import pytest
+
+from conftest import REFERENCE_DATA_PATH
+from importers.data_formatter import SpellRow
+from importers.spell_index import Range, SpellIndex
+
+
+def spell(name, level, school="evocation", classes=(), subclasses=(), **fields):
+    """SpellRow referencing its school, classes and subclasses by SRD index"""
+    return SpellRow(
+        name=name, level=level, magic_school=("magic-schools", school),
+        classes=[("classes", c) for c in classes], subclasses=[("subclasses", s) for s in subclasses], **fields
+    )
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SpellIndex([
+        spell("Fireball", 3, classes=["wizard", "sorcerer"], concentration=0, components="V, S, M"),
+        spell("Burning Hands", 1, classes=["wizard"], concentration=0, components="V, S"),
+        spell("Flaming Sphere", 2, school="conjuration", classes=["wizard", "druid"], concentration=1, components="V, S, M"),
+        spell("Stillness of Mind", 2, school="abjuration", subclasses=["open-hand"], concentration=1),
+        spell("Aid", 2, school="abjuration", classes=["cleric"], subclasses=["open-hand"], concentration=0),
+        spell("Wish", 9, school="conjuration", classes=["wizard"], concentration=0, components="V"),
+    ])
+
+
+def names(page):
+    """Spell names of a page, in order"""
+    return [spell.name for spell in page.spells]
+
+
+def test_filters_match_display_names_and_slugs(index):
+    assert names(index.query(subclass="Open Hand")) == ["Aid", "Stillness of Mind"]
+    assert index.query(subclass="open-hand").total == 2
+    assert index.query(**{"class": "Wizard"}).total == 4
+    assert index.query(**{"class": ["Druid", "cleric"]}).total == 2
+    assert names(index.query(school="Evocation", components="m")) == ["Fireball"]
+    assert names(index.query(concentration=True)) == ["Flaming Sphere", "Stillness of Mind"]
+    assert index.query(subclass="Lore").total == 0
+
+
+def test_level_filters(index):
+    assert names(index.query(level=Range(high=2), **{"class": "wizard"})) == ["Burning Hands", "Flaming Sphere"]
+    assert names(index.query(level=Range(low=3))) == ["Fireball", "Wish"]
+    assert names(index.query(level=[1, 9])) == ["Burning Hands", "Wish"]
+    assert index.query(level=Range(low=4, high=8)).total == 0
+
+
+def test_ordering_breaks_ties_by_ascending_name(index):
+    ascending = names(index.query(order_by="level"))
+    assert ascending == ["Burning Hands", "Aid", "Flaming Sphere", "Stillness of Mind", "Fireball", "Wish"]
+    descending = names(index.query(order_by="level", descending=True))
+    assert descending == ["Wish", "Fireball", "Aid", "Flaming Sphere", "Stillness of Mind", "Burning Hands"]
+    assert names(index.query(order_by="school", descending=True))[:2] == ["Burning Hands", "Fireball"]
+    assert names(index.query(descending=True))[0] == "Wish"
+    with pytest.raises(ValueError):
+        index.query(order_by="components")
+
+
+def test_paging(index):
+    page = index.query(order_by="level", offset=2, limit=3)
+    assert page.total == 6
+    assert names(page) == ["Flaming Sphere", "Stillness of Mind", "Fireball"]
+    assert names(index.query(order_by="level", offset=5, limit=3)) == ["Wish"]
+    assert index.query(offset=6).spells == []
+    assert index.query(limit=0).total == 6
+
+
+def test_reference_data_index():
+    index = SpellIndex.from_reference_data(REFERENCE_DATA_PATH)
+    assert len(index) == 319
+    page = index.query(order_by="level", descending=True, limit=5)
+    assert [spell.level for spell in page.spells] == [9] * 5
+    assert names(page) == sorted(names(page))
+    assert index.query(subclass="Lore").total == index.query(subclass="lore").total > 0
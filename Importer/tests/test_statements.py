@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import permutations
+
+from importers.backends import SqliteBackend
+from importers.statements import StatementCache
+
+
+def test_column_orders_share_one_sorted_statement():
+    cache = SqliteBackend(":memory:").statements
+    first = cache.insert("spell", ("name", "level", "ritual"))
+    second = cache.insert("spell", ("ritual", "name", "level"))
+    assert first is second
+    assert first.columns == ("level", "name", "ritual")
+    assert first.params({"ritual": 0, "name": "Aid", "level": 2}) == [2, "Aid", 0]
+    # Callers binding in their own order get that order's text
+    assert cache.sql("spell", ("ritual", "name", "level")).startswith('INSERT INTO "spell" (ritual, name, level)')
+    assert len(cache) == 1
+
+
+def test_counts_every_lookup_across_threads():
+    cache = StatementCache(lambda table, columns, returns_id: ",".join(columns))
+    orders = list(permutations(("a", "b", "c", "d")))
+
+    def look_up(i):
+        cache.sql("t", orders[i % len(orders)])
+        return cache.insert("t", orders[i % len(orders)])
+
+    with ThreadPoolExecutor(8) as pool:
+        statements = set(pool.map(look_up, range(2000)))
+    assert len(statements) == 1
+    assert cache.hits + cache.misses == 2000
+    assert cache.misses == len(orders)
+    assert len(cache.texts) == len(orders)
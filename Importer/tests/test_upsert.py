@@ -0,0 +1,35 @@
+from importers.upsert import MergeUpserter
+
+
+class RecordingCursor:
+    """pyodbc-like cursor recording the fast_executemany setting of every executemany"""
+
+    def __init__(self):
+        self.fast_executemany = False
+        self.bulk_flags = []
+        self.rowcount = 0
+
+    def execute(self, sql, *params):
+        self.last = sql
+        return self
+
+    def executemany(self, sql, rows):
+        self.bulk_flags.append(self.fast_executemany)
+
+    def fetchone(self):
+        return (None,)
+
+    def fetchall(self):
+        return []
+
+
+def test_staging_inserts_restore_fast_executemany():
+    cursor = RecordingCursor()
+    upserter = MergeUpserter(cursor, batch_size=1)
+    assert cursor.fast_executemany is False
+
+    upserter.upsert("spell", [{"name": "Fireball", "level": 3}, {"name": "Shield", "level": 1}])
+    upserter.update_by_id("feature", "parent_feature_id", [(1, 2)])
+
+    assert cursor.bulk_flags == [True, True, True]
+    assert cursor.fast_executemany is False
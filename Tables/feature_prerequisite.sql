@@ -3,6 +3,7 @@ CREATE TABLE feature_prerequisite (
     feature_id INT NOT NULL,
     reference_type NVARCHAR(50) NOT NULL,
     reference_id INT NULL,
+    minimum_level INT NULL,
     created_at DATETIME DEFAULT GETDATE(),
     updated_at DATETIME DEFAULT GETDATE(),
     deleted BIT NULL,
@@ -0,0 +1,10 @@
+CREATE TABLE import_checkpoint (
+    id INT PRIMARY KEY IDENTITY(1,1),
+    table_name NVARCHAR(100) NOT NULL,
+    -- Source rows of the import consumed by its committed chunks
+    row_offset INT NOT NULL DEFAULT 0,
+    completed BIT NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT GETDATE(),
+    updated_at DATETIME DEFAULT GETDATE(),
+    INDEX idx_import_checkpoint_table (table_name)
+);
@@ -0,0 +1,11 @@
+CREATE TABLE import_manifest (
+    id INT PRIMARY KEY IDENTITY(1,1),
+    table_name NVARCHAR(100) NOT NULL,
+    record_index NVARCHAR(255) NOT NULL,
+    -- Natural key of the imported row, used to soft-delete it when the record disappears
+    row_key NVARCHAR(255) NULL,
+    content_hash CHAR(64) NOT NULL,
+    created_at DATETIME DEFAULT GETDATE(),
+    updated_at DATETIME DEFAULT GETDATE(),
+    INDEX idx_import_manifest_table (table_name)
+);
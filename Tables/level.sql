@@ -26,7 +26,8 @@ CREATE TABLE level_class_data
     id INT PRIMARY KEY IDENTITY (90000, 9),
     level_id INT NOT NULL,
     attribute_name NVARCHAR (100) NOT NULL,
-    attribute_value NVARCHAR (100) NOT NULL,
+    attribute_value NVARCHAR (MAX) NOT NULL,
+    -- JSON of the level's class_specific / spellcasting data
     value_type NVARCHAR (50) NOT NULL DEFAULT 'INT',
     created_at DATETIME DEFAULT GETDATE (),
     updated_at DATETIME DEFAULT GETDATE (),
@@ -3,8 +3,10 @@ CREATE TABLE monster
     id BIGINT PRIMARY KEY IDENTITY (3000000, 1),
     name NVARCHAR (100) NOT NULL,
     description NVARCHAR (MAX) NULL,
-    alignment_id INT NOT NULL,
-    size_id BIGINT NOT NULL,
+    alignment_id INT NULL,
+    -- NULL for SRD alignments without an alignment row, e.g. "unaligned"
+    size_id BIGINT NULL,
+    -- NULL until sizes are imported
     monster_type_id BIGINT NOT NULL,
     -- References Monster Type
     sub_monster_type_id BIGINT NULL,